@@ -1,9 +1,13 @@
 import datetime
+import hashlib
+import json
 import logging
+import os
 import platform
 import sys
 from logging import FileHandler, Formatter, Logger, StreamHandler
-from typing import Any
+from pathlib import Path
+from typing import Any, Callable
 
 from PySide6.QtCore import QTimer
 from PySide6.QtWidgets import QMessageBox, QWidget
@@ -115,6 +119,149 @@ class DatetimeTools:
         return dt.strftime(f"D\072%Y%m%d%H%M%S{utc}")
 
 
+class ManifestTools:
+    """
+    変換済みのファイルを変換先のフォルダのマニフェストに記録します
+    変換元のファイルと変換先のファイルが変わっていなければ、再変換を省略できます
+    """
+
+    def __init__(self, converter: str, version: str):
+        """初期化します"""
+        # 変換したクラスの名前
+        self.converter: str = converter
+        # 変換処理のバージョン
+        self.version: str = version
+        # マニフェストのファイル名
+        self.FILE_NAME: str = "__manifest__.json"
+        # マニフェストのファイルパス
+        self.file_path: str = ""
+        # 変換元のファイルパスをキーとする記録の辞書
+        self.entries: dict = {}
+        # 保存していない記録の数
+        self.number_of_unsaved: int = 0
+        # 変換済みのためスキップしたファイルの数
+        self.number_of_skip: int = 0
+        # 自動で保存する間隔(記録の数)
+        self.SAVE_INTERVAL: int = 100
+
+    def _get_hash(self, file_path: str) -> str:
+        """ファイルの内容のハッシュ値を取得します"""
+        with open(file_path, "rb") as f:
+            return hashlib.file_digest(f, "sha256").hexdigest()
+
+    def _load(self, folder_path_to: str) -> bool:
+        """変換先のフォルダのマニフェストを読み込みます"""
+        result: bool = False
+        try:
+            file_p: Path = Path(folder_path_to) / self.FILE_NAME
+            self.file_path = str(file_p)
+            self.entries = {}
+            self.number_of_unsaved = 0
+            if file_p.exists():
+                self.entries = json.loads(file_p.read_text(encoding="utf-8")).get("entries", {})
+        except (OSError, ValueError):
+            # 壊れたマニフェストは、無視して作り直す
+            self.entries = {}
+        else:
+            result = True
+        finally:
+            pass
+        return result
+
+    def _save(self) -> bool:
+        """マニフェストを保存します"""
+        result: bool = False
+        try:
+            if not self.file_path:
+                raise Exception("マニフェストが読み込まれていません。")
+            file_p: Path = Path(self.file_path)
+            tmp_p: Path = file_p.with_name(f"{file_p.name}.tmp")
+            tmp_p.write_text(json.dumps({"entries": self.entries}, indent=4, ensure_ascii=False), encoding="utf-8")
+            # 書き込み途中で中断されても壊れないように、置き換える
+            os.replace(tmp_p, file_p)
+        except Exception:
+            raise
+        else:
+            result = True
+            self.number_of_unsaved = 0
+        finally:
+            pass
+        return result
+
+    def _is_up_to_date(self, file_path_from: str, file_path_to: str) -> bool:
+        """変換先のファイルが最新の状態かどうかを判定します"""
+        result: bool = False
+        try:
+            entry: dict | None = self.entries.get(str(Path(file_path_from).resolve()))
+            if entry is None:
+                return result
+            if entry.get("converter") != self.converter or entry.get("version") != self.version:
+                return result
+            if entry.get("output_path") != str(Path(file_path_to).resolve()) or not Path(file_path_to).exists():
+                return result
+            stat: os.stat_result = Path(file_path_from).stat()
+            if stat.st_size != entry.get("size"):
+                return result
+            if stat.st_mtime_ns != entry.get("mtime_ns"):
+                # 更新日時だけが変わった場合は、内容のハッシュ値で判定する
+                if self._get_hash(file_path_from) != entry.get("hash"):
+                    return result
+                entry["mtime_ns"] = stat.st_mtime_ns
+                self.number_of_unsaved += 1
+        except OSError:
+            pass
+        else:
+            result = True
+        finally:
+            pass
+        return result
+
+    def _filter_outdated(self, lst_of_f: list, get_file_path_to: Callable[[str], str]) -> list:
+        """変換が必要なファイルだけを抽出します"""
+        # 変換元のファイルが削除された記録は、取り除く
+        for key in [key for key in self.entries if not Path(key).exists()]:
+            del self.entries[key]
+            self.number_of_unsaved += 1
+        lst_of_outdated: list = [f for f in lst_of_f if not self._is_up_to_date(f, get_file_path_to(f))]
+        if self.number_of_unsaved:
+            self._save()
+        return lst_of_outdated
+
+    def _exclude_converted(self, folder_path_to: str, lst_of_f: list, get_file_path_to: Callable[[str], str], skip_unchanged: bool) -> list:
+        """変換先のフォルダのマニフェストを読み込んで、変換済みのファイルを除外します"""
+        self._load(folder_path_to)
+        self.number_of_skip = 0
+        if not skip_unchanged or not lst_of_f:
+            return lst_of_f
+        lst_of_outdated: list = self._filter_outdated(lst_of_f, get_file_path_to)
+        self.number_of_skip = len(lst_of_f) - len(lst_of_outdated)
+        return lst_of_outdated
+
+    def _record(self, file_path_from: str, file_path_to: str) -> bool:
+        """変換したファイルを記録します"""
+        result: bool = False
+        try:
+            stat: os.stat_result = Path(file_path_from).stat()
+            self.entries[str(Path(file_path_from).resolve())] = {
+                "size": stat.st_size,
+                "mtime_ns": stat.st_mtime_ns,
+                "hash": self._get_hash(file_path_from),
+                "output_path": str(Path(file_path_to).resolve()),
+                "converter": self.converter,
+                "version": self.version,
+            }
+            self.number_of_unsaved += 1
+            if self.number_of_unsaved >= self.SAVE_INTERVAL:
+                self._save()
+        except Exception:
+            raise
+        else:
+            result = True
+        finally:
+            pass
+        return result
+
+
 class GUITools:
     def __init__(self, parent: QWidget | None = None):
         """初期化します"""
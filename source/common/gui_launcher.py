@@ -1,3 +1,4 @@
+import multiprocessing
 import sys
 from dataclasses import dataclass
 from typing import Callable
@@ -240,4 +241,6 @@ def main() -> bool:
 
 
 if __name__ == "__main__":
+    # exe化した場合に、プロセスプールのワーカーがmainを再実行しないようにする
+    multiprocessing.freeze_support()
     main()
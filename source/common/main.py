@@ -1,5 +1,6 @@
 import asyncio
 import inspect
+import multiprocessing
 import sys
 
 
@@ -128,4 +129,6 @@ def print_usage():
 
 
 if __name__ == "__main__":
+    # exe化した場合に、プロセスプールのワーカーがmainを再実行しないようにする
+    multiprocessing.freeze_support()
     main()
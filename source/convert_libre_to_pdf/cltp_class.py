@@ -1,6 +1,247 @@
+import os
+import queue
+import shutil
+import socket
 import subprocess
+import tempfile
+import threading
+import time
+from concurrent.futures import Future, ThreadPoolExecutor, as_completed
 from logging import Logger
 from pathlib import Path
+from typing import Any, Callable
+
+from source.common.common import ManifestTools
+
+
+class SofficeListener:
+    """
+    常駐させたLibreOfficeにUNOで変換を依頼します
+    LibreOfficeのPythonのUNOブリッジ(uno)が必要です
+    """
+
+    # 接続先のホスト
+    HOST: str = "127.0.0.1"
+    # 起動を待つ秒数
+    STARTUP_TIMEOUT: float = 60.0
+    # 停止を待つ秒数
+    STOP_TIMEOUT: float = 10.0
+
+    def __init__(self, logger: Logger, timeout: float):
+        """初期化します"""
+        self.log: Logger = logger
+        # 1ファイルあたりの変換の制限時間(秒)
+        self.timeout: float = timeout
+        # 接続先のポート番号
+        self.port: int = 0
+        # 専用のユーザープロファイルのフォルダパス
+        self.folder_path_of_profile: str = ""
+        # sofficeのプロセス
+        self.process: subprocess.Popen | None = None
+        # UNOのDesktopオブジェクト
+        self.desktop: Any = None
+
+    @staticmethod
+    def _import_uno() -> Any:
+        """unoをインポートします"""
+        try:
+            import uno
+        except ImportError:
+            raise ImportError("LibreOfficeに同梱のPython、またはpython3-unoなどでunoを使えるようにしてください。")
+        return uno
+
+    def _find_free_port(self) -> int:
+        """空いているポート番号を取得します"""
+        with socket.socket(socket.AF_INET, socket.SOCK_STREAM) as s:
+            s.bind((self.HOST, 0))
+            return s.getsockname()[1]
+
+    def _connect(self) -> Any:
+        """UNOで接続して、Desktopオブジェクトを取得します"""
+        uno: Any = self._import_uno()
+        local_ctx: Any = uno.getComponentContext()
+        resolver: Any = local_ctx.ServiceManager.createInstanceWithContext("com.sun.star.bridge.UnoUrlResolver", local_ctx)
+        ctx: Any = resolver.resolve(f"uno:socket,host={self.HOST},port={self.port};urp;StarOffice.ComponentContext")
+        return ctx.ServiceManager.createInstanceWithContext("com.sun.star.frame.Desktop", ctx)
+
+    def is_alive(self) -> bool:
+        """リスナーが応答するかどうかを確認します"""
+        result: bool = False
+        try:
+            if self.process is None or self.process.poll() is not None or self.desktop is None:
+                return result
+            # UNOブリッジ越しに軽い呼び出しをして、応答を確認する
+            self.desktop.getFrames().getCount()
+        except Exception:
+            pass
+        else:
+            result = True
+        finally:
+            pass
+        return result
+
+    def start(self) -> bool:
+        """リスナーを起動します"""
+        result: bool = False
+        try:
+            self._import_uno()
+            self.port = self._find_free_port()
+            self.folder_path_of_profile = tempfile.mkdtemp(prefix="cltp_listener_")
+            self.process = subprocess.Popen(
+                [
+                    "soffice",
+                    "--headless",
+                    "--invisible",
+                    "--nologo",
+                    "--norestore",
+                    "--nodefault",
+                    f"-env:UserInstallation={Path(self.folder_path_of_profile).as_uri()}",
+                    f"--accept=socket,host={self.HOST},port={self.port};urp;StarOffice.ComponentContext",
+                ],
+                stdout=subprocess.DEVNULL,
+                stderr=subprocess.DEVNULL,
+            )
+            # 接続できるようになるまで待つ
+            deadline: float = time.monotonic() + self.STARTUP_TIMEOUT
+            while True:
+                try:
+                    self.desktop = self._connect()
+                except ImportError:
+                    raise
+                except Exception:
+                    if self.process.poll() is not None:
+                        raise Exception("LibreOfficeのリスナーが起動直後に終了しました。")
+                    if time.monotonic() > deadline:
+                        raise Exception("LibreOfficeのリスナーの起動がタイムアウトしました。")
+                    time.sleep(0.5)
+                else:
+                    break
+                finally:
+                    pass
+        except Exception:
+            self.stop()
+            raise
+        else:
+            result = True
+            self.log.info(f"LibreOfficeのリスナーを起動しました。: port={self.port}")
+        finally:
+            pass
+        return result
+
+    def stop(self, force: bool = False) -> bool:
+        """リスナーを停止します"""
+        result: bool = False
+        try:
+            # 応答しないリスナーには、UNOで終了を依頼せずにプロセスを止める
+            if self.desktop is not None and not force:
+                try:
+                    self.desktop.terminate()
+                except Exception:
+                    pass
+            if self.process is not None and self.process.poll() is None:
+                self.process.terminate()
+                try:
+                    self.process.wait(timeout=self.STOP_TIMEOUT)
+                except subprocess.TimeoutExpired:
+                    self.process.kill()
+                    self.process.wait()
+        except Exception:
+            raise
+        else:
+            result = True
+        finally:
+            self.desktop = None
+            self.process = None
+            if self.folder_path_of_profile:
+                shutil.rmtree(self.folder_path_of_profile, ignore_errors=True)
+                self.folder_path_of_profile = ""
+        return result
+
+    def restart(self, force: bool = False) -> bool:
+        """リスナーを再起動します"""
+        self.log.warning(f"LibreOfficeのリスナーを再起動します。: port={self.port}")
+        self.stop(force)
+        return self.start()
+
+    def _convert_with_uno(self, desktop: Any, file_path_from: str, file_path_to: str, filter_name: str):
+        """UNOでPDFに変換します"""
+        uno: Any = self._import_uno()
+        from com.sun.star.beans import PropertyValue
+
+        def _prop(name: str, value: Any) -> Any:
+            """UNOのプロパティを作成します"""
+            prop: Any = PropertyValue()
+            prop.Name = name
+            prop.Value = value
+            return prop
+
+        url_from: str = uno.systemPathToFileUrl(str(Path(file_path_from).resolve()))
+        url_to: str = uno.systemPathToFileUrl(str(Path(file_path_to).resolve()))
+        doc: Any = desktop.loadComponentFromURL(url_from, "_blank", 0, (_prop("Hidden", True), _prop("ReadOnly", True)))
+        if doc is None:
+            raise Exception("ファイルを読み込めませんでした。")
+        try:
+            doc.storeToURL(url_to, (_prop("FilterName", filter_name),))
+        finally:
+            doc.close(True)
+
+    @staticmethod
+    def _get_mtime(file_path: str) -> int | None:
+        """ファイルの更新日時を取得します"""
+        try:
+            return Path(file_path).stat().st_mtime_ns
+        except OSError:
+            return None
+
+    def convert(self, file_path_from: str, file_path_to: str, filter_name: str) -> bool:
+        """常駐させたLibreOfficeでPDFに変換します"""
+        result: bool = False
+        try:
+            if not self.is_alive():
+                if self.process is None:
+                    self.start()
+                else:
+                    self.restart(force=True)
+            outcome: dict = {}
+            mtime_before: int | None = self._get_mtime(file_path_to)
+            # 再起動後のリスナーを、変換中のスレッドが使わないようにする
+            desktop: Any = self.desktop
+
+            def _target():
+                """変換を別スレッドで実行します"""
+                try:
+                    self._convert_with_uno(desktop, file_path_from, file_path_to, filter_name)
+                except Exception as e:
+                    outcome["error"] = e
+
+            worker: threading.Thread = threading.Thread(target=_target, daemon=True)
+            worker.start()
+            worker.join(self.timeout)
+            if worker.is_alive():
+                # 応答しないリスナーを止めて、変換中のスレッドが終わってから作り直す
+                self.log.error(f"変換がタイムアウトしました。({self.timeout}秒): {file_path_from}")
+                self.stop(force=True)
+                worker.join(self.STOP_TIMEOUT)
+                if worker.is_alive():
+                    self.log.warning("変換中のスレッドが終了しませんでした。")
+                self.start()
+            elif "error" in outcome:
+                self.log.error(f"error: \n{str(outcome['error'])}")
+                if not self.is_alive():
+                    self.restart(force=True)
+            else:
+                # 以前の変換先のファイルが残っていても、新しく書き出されたかどうかで判定する
+                mtime_after: int | None = self._get_mtime(file_path_to)
+                result = mtime_after is not None and mtime_after != mtime_before
+        except ImportError:
+            raise
+        except Exception as e:
+            self.log.error(f"error: \n{str(e)}")
+        else:
+            pass
+        finally:
+            pass
+        return result
 
 
 class ConvertLibreToPDF:
@@ -52,6 +293,31 @@ class ConvertLibreToPDF:
         self.success: int = 0
         # 全てのファイルを変換できたかどうか
         self.complete: bool = False
+        # 同時に変換するプロセスの数
+        self.max_workers: int = os.cpu_count() or 1
+        # PDFのエクスポートフィルターの辞書
+        self.pdf_filters: dict = {
+            "Excel": "calc_pdf_Export",
+            "Word": "writer_pdf_Export",
+            "Powerpoint": "impress_pdf_Export",
+            "Calc": "calc_pdf_Export",
+            "Writer": "writer_pdf_Export",
+            "Impress": "impress_pdf_Export",
+        }
+        # 1ファイルあたりの変換の制限時間(秒)
+        self.timeout_per_file: float = 300.0
+        # 1回のsofficeで変換するファイルの数
+        self.chunk_size: int = 1
+        # 変換処理のバージョン(変換結果が変わる修正をしたら、上げる)
+        self.VERSION_OF_CONVERTER: str = "1"
+        # 変換済みのファイルをスキップするかどうか
+        self.skip_unchanged: bool = True
+        # 変換済みのファイルのマニフェスト
+        self.obj_of_mt: ManifestTools = ManifestTools(self.__class__.__name__, self.VERSION_OF_CONVERTER)
+        # 常駐させたLibreOfficeで変換するかどうか
+        self.use_listener: bool = False
+        # 常駐させたLibreOfficeのリスナーのリスト
+        self.listeners: list[SofficeListener] = []
 
     def create_file_lst(self) -> bool:
         """ファイルリストを作成します"""
@@ -59,10 +325,20 @@ class ConvertLibreToPDF:
         try:
             # 指定のフォルダにあるファイルパスのリストから指定の拡張子で抽出する
             self.filtered_lst_of_f = [str(f) for f in Path(self.folder_path_from).glob("*") if f.suffix.lower() in self.valid_exts]
+            # 変換先のフォルダのマニフェストで、変換済みのファイルを除外する
+            self.filtered_lst_of_f = self.obj_of_mt._exclude_converted(
+                self.folder_path_to, self.filtered_lst_of_f, self._get_file_path_to, self.skip_unchanged
+            )
+            if self.obj_of_mt.number_of_skip:
+                self.log.info(f"{self.obj_of_mt.number_of_skip}件のファイルは変換済みのため、スキップします。")
             self.number_of_f = len(self.filtered_lst_of_f)
-            if not self.number_of_f:
+            if not self.number_of_f and not self.obj_of_mt.number_of_skip:
                 raise Exception("変換元のファイルがありません。")
-            self.current_file_path_from = self.filtered_lst_of_f[self.p]
+            if not self.number_of_f:
+                # 変換するファイルがないだけなので、失敗とはしない
+                self.log.info("全てのファイルが変換済みです。")
+            else:
+                self.current_file_path_from = self.filtered_lst_of_f[self.p]
         except Exception:
             raise
         else:
@@ -111,30 +387,136 @@ class ConvertLibreToPDF:
             pass
         return result
 
+    def _get_file_path_to(self, file_path_from: str) -> str:
+        """変換先のファイルパスを取得します"""
+        return str(Path(self.folder_path_to) / f"{Path(file_path_from).stem}.pdf")
+
+    def _get_mtime_of_file_to(self, file_path_from: str) -> int | None:
+        """変換先のファイルの更新日時を取得します"""
+        try:
+            return Path(self._get_file_path_to(file_path_from)).stat().st_mtime_ns
+        except OSError:
+            return None
+
+    def _create_chunks(self, chunk_size: int) -> list:
+        """1回のsofficeで変換するファイルのまとまりに、ファイルリストを分割します"""
+        # 変換先のファイル名が重なるファイルは、別の回に入れて、同時に変換しないようにする
+        rounds: list = []
+        dct_of_occurrence: dict = {}
+        for f in self.filtered_lst_of_f:
+            stem: str = Path(f).stem.lower()
+            i: int = dct_of_occurrence.get(stem, 0)
+            dct_of_occurrence[stem] = i + 1
+            if i == len(rounds):
+                rounds.append([])
+            rounds[i].append(f)
+        # 回ごとに、まとまりに分割する
+        return [[lst_of_files[j : j + chunk_size] for j in range(0, len(lst_of_files), chunk_size)] for lst_of_files in rounds]
+
+    def _create_command(self, lst_of_files: list, folder_path_of_profile: str = "") -> list:
+        """sofficeのコマンドを作成します"""
+        command: list = ["soffice", "--headless"]
+        if folder_path_of_profile:
+            # プロセスごとにユーザープロファイルを分けて、プロファイルのロックの競合を防ぐ
+            command.append(f"-env:UserInstallation={Path(folder_path_of_profile).as_uri()}")
+        command += ["--convert-to", "pdf", "--outdir", self.folder_path_to, *lst_of_files]
+        return command
+
+    def _run_soffice(self, lst_of_files: list, folder_path_of_profile: str = "") -> dict:
+        """sofficeを実行して、ファイルごとに変換できたかどうかを返します"""
+        # 変換前の変換先のファイルの更新日時を記録する
+        dct_of_before: dict = {f: self._get_mtime_of_file_to(f) for f in lst_of_files}
+        completed: bool = False
+        try:
+            process: subprocess.CompletedProcess = subprocess.run(
+                self._create_command(lst_of_files, folder_path_of_profile),
+                capture_output=True,
+                text=True,
+                timeout=self.timeout_per_file * len(lst_of_files),
+            )
+            if process.returncode != 0:
+                raise Exception(f"sofficeが異常終了しました。(終了コード: {process.returncode}): \n{process.stderr.strip()}")
+        except subprocess.TimeoutExpired:
+            self.log.error(f"変換がタイムアウトしました。({self.timeout_per_file * len(lst_of_files)}秒): {', '.join(lst_of_files)}")
+        except Exception as e:
+            self.log.error(f"error: \n{str(e)}")
+        else:
+            completed = True
+        finally:
+            pass
+        # 正常に終了したうえで、変換先のファイルが新しく書き出されたかどうかで、ファイルごとの成否を判定する
+        dct_of_result: dict = {}
+        for f in lst_of_files:
+            after: int | None = self._get_mtime_of_file_to(f)
+            dct_of_result[f] = completed and after is not None and after != dct_of_before[f]
+        return dct_of_result
+
+    def _convert_with(self, slot: Any, lst_of_files: list) -> dict:
+        """リスナー、またはユーザープロファイルを指定して変換します"""
+        if isinstance(slot, SofficeListener):
+            dct_of_result: dict = {}
+            for f in lst_of_files:
+                ext: str = Path(f).suffix.lower()
+                filter_name: str = next((self.pdf_filters[key] for key, exts in self.file_types.items() if ext in exts), "")
+                if not filter_name:
+                    # エクスポートフィルターが決まらないファイルは、変換せずに失敗とする
+                    self.log.error(f"PDFのエクスポートフィルターがない拡張子です。: {f}")
+                    dct_of_result[f] = False
+                    continue
+                dct_of_result[f] = slot.convert(f, self._get_file_path_to(f), filter_name)
+            return dct_of_result
+        return self._run_soffice(lst_of_files, slot)
+
+    def _prepare_listeners(self, number_of_listeners: int) -> list:
+        """常駐させるリスナーを必要な数だけ用意します"""
+        SofficeListener._import_uno()
+        while len(self.listeners) < number_of_listeners:
+            self.listeners.append(SofficeListener(self.log, self.timeout_per_file))
+        for listener in self.listeners:
+            listener.timeout = self.timeout_per_file
+        return self.listeners[:number_of_listeners]
+
+    def stop_listeners(self) -> bool:
+        """常駐させたリスナーを全て停止します"""
+        result: bool = False
+        try:
+            for listener in self.listeners:
+                listener.stop()
+        except Exception:
+            raise
+        else:
+            result = True
+        finally:
+            self.listeners.clear()
+        return result
+
+    def _count_result(self, result: bool) -> bool:
+        """変換の結果を集計します"""
+        self.count += 1
+        if result:
+            self.success += 1
+            self.obj_of_mt._record(self.current_file_path_from, self._get_file_path_to(self.current_file_path_from))
+            self.log.info("***成功しました。***")
+        else:
+            self.log.error("***失敗しました。***")
+        if self.count == self.number_of_f:
+            self.obj_of_mt._save()
+            if self.success == self.number_of_f:
+                self.complete = True
+                self.log.info("全てのファイルの変換が完了しました。")
+            else:
+                raise Exception("一部のファイルの変換が失敗しました。")
+        return result
+
     def convert_file(self) -> bool:
         """変換します"""
         result: bool = False
         try:
             self.log.info(f"* [{self.count + 1} / {self.number_of_f}] {self.convert_file.__doc__}: ")
             self.log.info(f"{self.current_file_path_from} => PDF")
-            convert_obj: subprocess.CompletedProcess = subprocess.run(
-                ["soffice", "--headless", "--convert-to", "pdf", "--outdir", self.folder_path_to, self.current_file_path_from],
-                capture_output=True,
-                text=True,
-            )
-            result = not convert_obj.returncode
-            self.count += 1
-            if result:
-                self.success += 1
-                self.log.info("***成功しました。***")
-            else:
-                self.log.error("***失敗しました。***")
-            if self.count == self.number_of_f:
-                if self.success == self.number_of_f:
-                    self.complete = True
-                    self.log.info("全てのファイルの変換が完了しました。")
-                else:
-                    raise Exception("一部のファイルの変換が失敗しました。")
+            slot: Any = self._prepare_listeners(1)[0] if self.use_listener else ""
+            dct_of_result: dict = self._convert_with(slot, [self.current_file_path_from])
+            result = self._count_result(dct_of_result[self.current_file_path_from])
         except Exception:
             raise
         else:
@@ -142,3 +524,61 @@ class ConvertLibreToPDF:
         finally:
             pass
         return result
+
+    def convert_all_files(self, callback: Callable[[int, int], Any] | None = None) -> bool:
+        """全てのファイルを並列で一括変換します"""
+        result: bool = False
+        folder_p_of_profiles: Path | None = None
+        try:
+            if not self.filtered_lst_of_f:
+                raise Exception("ファイルリストが初期化されていません。")
+            # 初期化する
+            self.count = 0
+            self.success = 0
+            self.complete = False
+            # 常駐させたリスナーは起動済みのため、1ファイルずつ渡す
+            rounds: list = self._create_chunks(1 if self.use_listener else self.chunk_size)
+            number_of_chunks: int = sum(len(chunks) for chunks in rounds)
+            number_of_workers: int = max(1, min(self.max_workers, max(len(chunks) for chunks in rounds)))
+            self.log.info(f"同時に変換するプロセスの数: {number_of_workers}")
+            self.log.info(f"sofficeの起動回数: {number_of_chunks}")
+            # ワーカーごとに、常駐させたリスナー、またはユーザープロファイルを用意する
+            slots: queue.Queue = queue.Queue()
+            if self.use_listener:
+                for listener in self._prepare_listeners(number_of_workers):
+                    slots.put(listener)
+            else:
+                folder_p_of_profiles = Path(tempfile.mkdtemp(prefix="cltp_profiles_"))
+                for i in range(number_of_workers):
+                    slots.put(str(folder_p_of_profiles / f"profile_{i}"))
+
+            def _convert_in_slot(lst_of_files: list) -> dict:
+                """空いているリスナー、またはユーザープロファイルで変換します"""
+                slot: Any = slots.get()
+                try:
+                    return self._convert_with(slot, lst_of_files)
+                finally:
+                    slots.put(slot)
+
+            with ThreadPoolExecutor(max_workers=number_of_workers) as executor:
+                # 変換先のファイル名が重なるファイルを同時に変換しないように、回ごとに待つ
+                for chunks in rounds:
+                    futures: dict[Future, list] = {executor.submit(_convert_in_slot, chunk): chunk for chunk in chunks}
+                    # 集計は呼び出し元のスレッドだけで行う
+                    for future in as_completed(futures):
+                        dct_of_result: dict = future.result()
+                        for f in futures[future]:
+                            self.current_file_path_from = f
+                            self.log.info(f"* [{self.count + 1} / {self.number_of_f}] {self.convert_file.__doc__}: ")
+                            self.log.info(f"{self.current_file_path_from} => PDF")
+                            self._count_result(dct_of_result[f])
+                            if callback:
+                                callback(self.count, self.number_of_f)
+        except Exception:
+            raise
+        else:
+            result = True
+        finally:
+            if folder_p_of_profiles:
+                shutil.rmtree(folder_p_of_profiles, ignore_errors=True)
+        return result
@@ -1,8 +1,63 @@
 from logging import Logger
 from pathlib import Path
-from typing import Any
+from typing import Any, Callable
 
-from comtypes.client import CreateObject
+from source.common.common import ManifestTools
+
+
+class OfficeAppCache:
+    """
+    Officeのアプリケーションのインスタンスを種類ごとに使い回します
+    COMのオブジェクトの作成は、dispatcherに任せます
+    """
+
+    def __init__(self, logger: Logger, dispatcher: Callable[[str], Any], max_uses: int):
+        """初期化します"""
+        self.log: Logger = logger
+        # ProgIDからCOMのオブジェクトを作成する関数
+        self.dispatcher: Callable[[str], Any] = dispatcher
+        # 1つのインスタンスで処理するファイルの数の上限
+        self.max_uses: int = max_uses
+        # ProgIDをキーとするインスタンスの辞書
+        self.apps: dict = {}
+        # ProgIDをキーとする処理したファイルの数の辞書
+        self.uses: dict = {}
+
+    def get(self, prog_id: str) -> Any:
+        """インスタンスを取得します"""
+        if prog_id in self.apps and self.uses[prog_id] >= self.max_uses:
+            # 上限に達したインスタンスは、作り直す
+            self.release(prog_id)
+        if prog_id not in self.apps:
+            self.log.info(f"{prog_id}を起動します。")
+            self.apps[prog_id] = self.dispatcher(prog_id)
+            self.uses[prog_id] = 0
+        self.uses[prog_id] += 1
+        return self.apps[prog_id]
+
+    def release(self, prog_id: str) -> bool:
+        """インスタンスを終了します"""
+        result: bool = False
+        app: Any = self.apps.pop(prog_id, None)
+        self.uses.pop(prog_id, None)
+        try:
+            if app is not None:
+                app.Quit()
+        except Exception:
+            # 既に応答しないインスタンスは、破棄するだけにする
+            self.log.warning(f"{prog_id}を正常に終了できませんでした。")
+        else:
+            result = True
+        finally:
+            pass
+        return result
+
+    def release_all(self) -> bool:
+        """全てのインスタンスを終了します"""
+        result: bool = True
+        for prog_id in list(self.apps):
+            result = self.release(prog_id) and result
+        return result
 
 
 class ConvertOfficeToPDF:
@@ -11,8 +66,13 @@ class ConvertOfficeToPDF:
     Windows + Microsoft Office(デスクトップ版)が必要です
     """
 
-    def __init__(self, logger: Logger):
+    def __init__(self, logger: Logger, dispatcher: Callable[[str], Any] | None = None):
         """初期化します"""
+        if dispatcher is None:
+            # comtypesは、Windowsでのみインポートできる
+            from comtypes.client import CreateObject
+
+            dispatcher = CreateObject
         self.log: Logger = logger
         self.log.info(self.__class__.__doc__)
         # 拡張子の辞書
@@ -53,15 +113,27 @@ class ConvertOfficeToPDF:
         self.success: int = 0
         # 全てのファイルを変換できたかどうか
         self.complete: bool = False
+        # 変換処理のバージョン(変換結果が変わる修正をしたら、上げる)
+        self.VERSION_OF_CONVERTER: str = "1"
+        # 変換済みのファイルをスキップするかどうか
+        self.skip_unchanged: bool = True
+        # 変換済みのファイルのマニフェスト
+        self.obj_of_mt: ManifestTools = ManifestTools(self.__class__.__name__, self.VERSION_OF_CONVERTER)
+        # 1つのアプリケーションのインスタンスで変換するファイルの数の上限
+        self.max_uses_of_app: int = 50
+        # 一括変換の間、使い回すアプリケーションのインスタンス
+        self.obj_of_oac: OfficeAppCache = OfficeAppCache(self.log, dispatcher, self.max_uses_of_app)
+
+    def _get_file_path_to(self, file_path_from: str) -> str:
+        """変換先のファイルパスを取得します"""
+        return str(Path(self.folder_path_to) / f"{Path(file_path_from).stem}.pdf")
 
     def _set_file_path(self) -> bool:
         """ファイルパスを設定します"""
         result: bool = False
         try:
             self.current_file_path_from = self.filtered_lst_of_f[self.p]
-            current_file_from_p: Path = Path(self.current_file_path_from)
-            current_file_to_p: Path = Path(self.folder_path_to) / f"{current_file_from_p.stem}.pdf"
-            self.current_file_path_to = str(current_file_to_p)
+            self.current_file_path_to = self._get_file_path_to(self.current_file_path_from)
         except Exception:
             raise
         else:
@@ -76,10 +148,20 @@ class ConvertOfficeToPDF:
         try:
             # 指定のフォルダにあるファイルパスのリストから指定の拡張子で抽出する
             self.filtered_lst_of_f = [str(f) for f in Path(self.folder_path_from).glob("*") if f.suffix.lower() in self.valid_exts]
+            # 変換先のフォルダのマニフェストで、変換済みのファイルを除外する
+            self.filtered_lst_of_f = self.obj_of_mt._exclude_converted(
+                self.folder_path_to, self.filtered_lst_of_f, self._get_file_path_to, self.skip_unchanged
+            )
+            if self.obj_of_mt.number_of_skip:
+                self.log.info(f"{self.obj_of_mt.number_of_skip}件のファイルは変換済みのため、スキップします。")
             self.number_of_f = len(self.filtered_lst_of_f)
-            if not self.number_of_f:
+            if not self.number_of_f and not self.obj_of_mt.number_of_skip:
                 raise Exception("変換元のファイルがありません。")
-            self._set_file_path()
+            if not self.number_of_f:
+                # 変換するファイルがないだけなので、失敗とはしない
+                self.log.info("全てのファイルが変換済みです。")
+            else:
+                self._set_file_path()
         except Exception:
             raise
         else:
@@ -131,83 +213,66 @@ class ConvertOfficeToPDF:
     def handle_file(self) -> bool:
         """ファイルの種類を判定して、各処理を実行します"""
 
-        def _with_excel() -> bool:
-            """ExcelをPDFに変換します"""
+        def _export(prog_id: str, label: str | None, open_and_export: Callable[[Any], Any]) -> bool:
+            """使い回すアプリケーションのインスタンスで、ファイルを開いてPDFに変換します"""
             result: bool = False
-            PDF_NUMBER_OF_EXCEL: int = 0
-            self.log.info(f"* [{self.count + 1} / {self.number_of_f}] {_with_excel.__doc__}: ")
+            self.log.info(f"* [{self.count + 1} / {self.number_of_f}] {label}: ")
             self.log.info(f"{self.current_file_path_from} => {self.current_file_path_to}")
             try:
-                obj: Any = CreateObject("Excel.Application")
-                f: Any = obj.Workbooks.Open(self.current_file_path_from, ReadOnly=False)
-                f.ExportAsFixedFormat(Filename=self.current_file_path_to, Type=PDF_NUMBER_OF_EXCEL)
+                self.obj_of_oac.max_uses = self.max_uses_of_app
+                f: Any = open_and_export(self.obj_of_oac.get(prog_id))
+                if f:
+                    f.Close()
             except Exception:
                 self.log.error("***失敗しました。***")
+                # エラーになったインスタンスは、作り直す
+                self.obj_of_oac.release(prog_id)
                 raise
             else:
                 result = True
                 self.log.info("***成功しました。***")
             finally:
                 pass
-            if f:
-                f.Close()
-            if obj:
-                obj.Quit()
             return result
 
+        def _with_excel() -> bool:
+            """ExcelをPDFに変換します"""
+            PDF_NUMBER_OF_EXCEL: int = 0
+
+            def _open_and_export(obj: Any) -> Any:
+                f: Any = obj.Workbooks.Open(self.current_file_path_from, ReadOnly=False)
+                f.ExportAsFixedFormat(Filename=self.current_file_path_to, Type=PDF_NUMBER_OF_EXCEL)
+                return f
+
+            return _export("Excel.Application", _with_excel.__doc__, _open_and_export)
+
         def _with_word() -> bool:
             """WordをPDFに変換します"""
-            result: bool = False
             PDF_NUMBER_OF_WORD: int = 17
-            self.log.info(f"* [{self.count + 1} / {self.number_of_f}] {_with_word.__doc__}: ")
-            self.log.info(f"{self.current_file_path_from} => {self.current_file_path_to}")
-            try:
-                obj: Any = CreateObject("Word.Application")
+
+            def _open_and_export(obj: Any) -> Any:
                 f: Any = obj.Documents.Open(self.current_file_path_from, ReadOnly=False)
                 f.ExportAsFixedFormat(
                     OutputFileName=self.current_file_path_to,
                     ExportFormat=PDF_NUMBER_OF_WORD,
                 )
-            except Exception:
-                self.log.error("***失敗しました。***")
-                raise
-            else:
-                result = True
-                self.log.info("***成功しました。***")
-            finally:
-                pass
-            if f:
-                f.Close()
-            if obj:
-                obj.Quit()
-            return result
+                return f
+
+            return _export("Word.Application", _with_word.__doc__, _open_and_export)
 
         def _with_powerpoint() -> bool:
             """PowerPointをPDFに変換します"""
-            result: bool = False
             PDF_NUMBER_OF_POWERPOINT: int = 2
-            self.log.info(f"* [{self.count + 1} / {self.number_of_f}] {_with_powerpoint.__doc__}: ")
-            self.log.info(f"{self.current_file_path_from} => {self.current_file_path_to}")
-            try:
-                obj: Any = CreateObject("PowerPoint.Application")
+
+            def _open_and_export(obj: Any) -> Any:
                 f: Any = obj.Presentations.Open(self.current_file_path_from, ReadOnly=False)
                 f.ExportAsFixedFormat(
                     Path=self.current_file_path_to,
                     FixedFormatType=PDF_NUMBER_OF_POWERPOINT,
                 )
-            except Exception:
-                self.log.error("***失敗しました。***")
-                raise
-            else:
-                result = True
-                self.log.info("***成功しました。***")
-            finally:
-                pass
-            if f:
-                f.Close()
-            if obj:
-                obj.Quit()
-            return result
+                return f
+
+            return _export("PowerPoint.Application", _with_powerpoint.__doc__, _open_and_export)
 
         result: bool = False
         try:
@@ -222,16 +287,25 @@ class ConvertOfficeToPDF:
             self.count += 1
             if result:
                 self.success += 1
+                self.obj_of_mt._record(self.current_file_path_from, self.current_file_path_to)
             if self.count == self.number_of_f:
+                self.obj_of_mt._save()
+                # 一括変換が終わったら、アプリケーションを終了する
+                self.obj_of_oac.release_all()
                 if self.success == self.number_of_f:
                     self.complete = True
                     self.log.info("全てのファイルの変換が完了しました。")
                 else:
                     raise Exception("一部のファイルの変換が失敗しました。")
         except Exception:
+            # エラーになったファイルの種類のインスタンスだけを終了済みのため、他のインスタンスは使い回す
             raise
         else:
             pass
         finally:
             pass
         return result
+
+    def release_apps(self) -> bool:
+        """一括変換を中断した場合に、全てのアプリケーションを終了します"""
+        return self.obj_of_oac.release_all()
@@ -104,6 +104,7 @@ def main() -> bool:
         result = False
         try:
             obj_of_cls.folder_path_from, obj_of_cls.folder_path_to = obj_with_cui._input_folder_path()
+            obj_of_cls.skip_unchanged = obj_with_cui._input_bool("変換済みのファイルをスキップしますか？")
             obj_of_cls.create_file_lst()
             for _ in range(obj_of_cls.number_of_f):
                 obj_of_cls.handle_file()
@@ -118,7 +119,8 @@ def main() -> bool:
             result = True
             obj_of_lt.logger.info("***処理が成功しました。***")
         finally:
-            pass
+            # 一括変換を中断した場合も、アプリケーションを残さない
+            obj_of_cls.release_apps()
         if obj_with_cui._input_bool("終了しますか？"):
             break
     return result
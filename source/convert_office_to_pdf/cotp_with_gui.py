@@ -8,6 +8,7 @@ from PySide6.QtCore import QObject, Signal
 from PySide6.QtGui import QFont
 from PySide6.QtWidgets import (
     QApplication,
+    QCheckBox,
     QFileDialog,
     QFormLayout,
     QLabel,
@@ -160,6 +161,11 @@ class MainApp_Of_COTP(QMainWindow):
             btn_open_to: QPushButton = QPushButton("変換先のフォルダを開く")
             main_container_layout.addRow(btn_open_to)
             btn_open_to.clicked.connect(lambda *args: self.open_explorer(self.obj_of_cls.folder_path_to))
+            # 変換済みのファイル
+            skip_checkbox: QCheckBox = QCheckBox("変換済みのファイルをスキップする")
+            skip_checkbox.setChecked(self.obj_of_cls.skip_unchanged)
+            main_container_layout.addRow(skip_checkbox)
+            skip_checkbox.toggled.connect(lambda *args, chckbx=skip_checkbox: self._get_skip_unchanged(chckbx))
             # 進行状況
             main_container_layout.addRow(QLabel("進行状況: "))
             self.progress_bar: QProgressBar = QProgressBar()
@@ -181,6 +187,19 @@ class MainApp_Of_COTP(QMainWindow):
             pass
         return result
 
+    def _get_skip_unchanged(self, chckbx: QCheckBox):
+        """変換済みのファイルをスキップするかどうかを取得します"""
+        try:
+            self.obj_of_cls.skip_unchanged = chckbx.isChecked()
+            if self.obj_of_cls.folder_path_from and self.obj_of_cls.folder_path_to:
+                self.show_file_lst()
+        except Exception as e:
+            self._show_error(f"error: \n{str(e)}")
+        else:
+            pass
+        finally:
+            pass
+
     def select_folder_from(self, lbl: QLabel) -> bool:
         """変換元のフォルダを選択します"""
         result: bool = False
@@ -245,6 +264,8 @@ class MainApp_Of_COTP(QMainWindow):
                 file_s: str = file_p.name
                 self.lst_widget.addItem(file_s)
             self.progress_bar.setValue(0)
+            if not self.obj_of_cls.number_of_f:
+                self._show_info("全てのファイルが変換済みです。")
         except Exception as e:
             self._show_error(f"error: \n{str(e)}")
         else:
@@ -271,6 +292,8 @@ class MainApp_Of_COTP(QMainWindow):
         else:
             result = True
         finally:
+            # 一括変換を中断した場合も、アプリケーションを残さない
+            self.obj_of_cls.release_apps()
             self._show_result(self.convert_all_files.__doc__, result)
         return result
 
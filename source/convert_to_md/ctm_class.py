@@ -1,15 +1,26 @@
+import csv
+import multiprocessing
+import os
+from concurrent.futures import Future, ProcessPoolExecutor, as_completed
 from logging import Logger
 from pathlib import Path
-from typing import Any
+from typing import Any, Callable, Iterable, TextIO
 
 from markitdown import MarkItDown
 
+from source.common.common import ManifestTools
+
 
 class ConvertToMd:
     """
     markdownに一括変換します
     """
 
+    # ワーカープロセスごとのマークダウンのオブジェクト
+    md_of_worker: MarkItDown | None = None
+    # ストリーミングで変換できる拡張子のリスト
+    STREAMING_EXTS: list = [".pdf", ".xlsx", ".csv"]
+
     def __init__(self, logger: Logger):
         """初期化します"""
         self.log: Logger = logger
@@ -59,15 +70,29 @@ class ConvertToMd:
         self.success: int = 0
         # すべてのファイルを変換できたかどうか
         self.complete: bool = False
+        # 変換処理のバージョン(変換結果が変わる修正をしたら、上げる)
+        self.VERSION_OF_CONVERTER: str = "1"
+        # 変換済みのファイルをスキップするかどうか
+        self.skip_unchanged: bool = True
+        # 変換済みのファイルのマニフェスト
+        self.obj_of_mt: ManifestTools = ManifestTools(self.__class__.__name__, self.VERSION_OF_CONVERTER)
+        # 同時に変換するプロセスの数
+        self.max_workers: int = os.cpu_count() or 1
+        # 変換に失敗したファイルパスとエラーメッセージのリスト
+        self.lst_of_failure: list = []
+        # ストリーミングで変換するファイルのサイズの下限(バイト)
+        self.streaming_threshold: int = 50 * 1024 * 1024
+
+    def _get_file_path_to(self, file_path_from: str) -> str:
+        """変換先のファイルパスを取得します"""
+        return str(Path(self.folder_path_to) / f"{Path(file_path_from).stem}.md")
 
     def _set_file_path(self) -> bool:
         """ファイルパスを設定します"""
         result: bool = False
         try:
             self.current_file_path_from = self.filtered_lst_of_f[self.p]
-            current_file_from_p: Path = Path(self.current_file_path_from)
-            current_file_to_p: Path = Path(self.folder_path_to) / f"{current_file_from_p.stem}.md"
-            self.current_file_path_to = str(current_file_to_p)
+            self.current_file_path_to = self._get_file_path_to(self.current_file_path_from)
         except Exception:
             raise
         else:
@@ -82,10 +107,20 @@ class ConvertToMd:
         try:
             # 指定のフォルダにあるファイルパスのリストから指定の拡張子で抽出する
             self.filtered_lst_of_f = [str(f) for f in Path(self.folder_path_from).glob("*") if f.suffix.lower() in self.valid_exts]
+            # 変換先のフォルダのマニフェストで、変換済みのファイルを除外する
+            self.filtered_lst_of_f = self.obj_of_mt._exclude_converted(
+                self.folder_path_to, self.filtered_lst_of_f, self._get_file_path_to, self.skip_unchanged
+            )
+            if self.obj_of_mt.number_of_skip:
+                self.log.info(f"{self.obj_of_mt.number_of_skip}件のファイルは変換済みのため、スキップします。")
             self.number_of_f = len(self.filtered_lst_of_f)
-            if not self.number_of_f:
+            if not self.number_of_f and not self.obj_of_mt.number_of_skip:
                 raise Exception("変換元のファイルがありません。")
-            self._set_file_path()
+            if not self.number_of_f:
+                # 変換するファイルがないだけなので、失敗とはしない
+                self.log.info("全てのファイルが変換済みです。")
+            else:
+                self._set_file_path()
         except Exception:
             raise
         else:
@@ -141,18 +176,25 @@ class ConvertToMd:
             self.log.info(f"* [{self.count + 1} / {self.number_of_f}] {self.convert_file.__doc__}: ")
             self.log.info(f"{self.current_file_path_from} => {self.current_file_path_to}")
             try:
-                doc: Any = self.md.convert(self.current_file_path_from)
-                current_file_to_p: Path = Path(self.current_file_path_to)
-                current_file_to_p.write_text(doc.text_content, encoding="utf-8")
+                if self._should_stream(self.current_file_path_from, self.streaming_threshold):
+                    self.log.info("ストリーミングで変換します。")
+                    self._convert_with_streaming(self.current_file_path_from, self.current_file_path_to)
+                else:
+                    doc: Any = self.md.convert(self.current_file_path_from)
+                    current_file_to_p: Path = Path(self.current_file_path_to)
+                    current_file_to_p.write_text(doc.text_content, encoding="utf-8")
             except Exception:
                 self.log.error("***失敗しました。***")
                 raise
             else:
+                result = True
                 self.success += 1
+                self.obj_of_mt._record(self.current_file_path_from, self.current_file_path_to)
                 self.log.info("***成功しました。***")
             finally:
                 self.count += 1
                 if self.count == self.number_of_f:
+                    self.obj_of_mt._save()
                     if self.success == self.number_of_f:
                         self.complete = True
                         self.log.info("全てのファイルの変換が終了しました。")
@@ -165,3 +207,200 @@ class ConvertToMd:
         finally:
             pass
         return result
+
+    @staticmethod
+    def _init_worker():
+        """ワーカープロセスを初期化します"""
+        # MarkItDownの初期化は重いため、ワーカープロセスごとに1回だけ行う
+        ConvertToMd.md_of_worker = MarkItDown()
+
+    @staticmethod
+    def _should_stream(file_path_from: str, streaming_threshold: int) -> bool:
+        """ストリーミングで変換するかどうかを判定します"""
+        file_p: Path = Path(file_path_from)
+        return file_p.suffix.lower() in ConvertToMd.STREAMING_EXTS and file_p.stat().st_size >= streaming_threshold
+
+    @staticmethod
+    def _escape_cell(value: Any) -> str:
+        """Markdownの表のセルの値をエスケープします"""
+        text: str = "" if value is None else str(value)
+        return text.replace("|", "\\|").replace("\r\n", " ").replace("\n", " ").replace("\r", " ")
+
+    @staticmethod
+    def _write_table(f: TextIO, rows: Iterable) -> int:
+        """1行目をヘッダーとして、Markdownの表を1行ずつ書き出します"""
+        number_of_columns: int = 0
+        number_of_rows: int = 0
+        for row in rows:
+            cells: list = [ConvertToMd._escape_cell(v) for v in row]
+            if number_of_rows == 0:
+                number_of_columns = len(cells)
+                f.write("| " + " | ".join(cells) + " |\n")
+                f.write("| " + " | ".join(["---"] * number_of_columns) + " |\n")
+            else:
+                # 列の数をヘッダーにそろえる(多い列は切り捨て、足りない列は空にする)
+                cells = cells[:number_of_columns]
+                cells.extend([""] * (number_of_columns - len(cells)))
+                f.write("| " + " | ".join(cells) + " |\n")
+            number_of_rows += 1
+        return number_of_rows
+
+    @staticmethod
+    def _stream_pdf(file_path_from: str, f: TextIO):
+        """
+        PDFを1ページずつテキストに変換して、書き出します
+        見出しや表などのMarkdownの書式は付けず、抽出したテキストをそのまま書き出します
+        """
+        from pdfminer.high_level import extract_text_to_fp
+        from pdfminer.layout import LAParams
+
+        with open(file_path_from, "rb") as fin:
+            extract_text_to_fp(fin, f, laparams=LAParams())
+
+    @staticmethod
+    def _stream_excel(file_path_from: str, f: TextIO):
+        """Excelをシートごとに1行ずつ読み込んで、書き出します"""
+        from openpyxl import load_workbook
+
+        wb: Any = load_workbook(file_path_from, read_only=True, data_only=True)
+        try:
+            for ws in wb.worksheets:
+                f.write(f"## {ws.title}\n")
+                ConvertToMd._write_table(f, ws.iter_rows(values_only=True))
+                f.write("\n")
+        finally:
+            wb.close()
+
+    @staticmethod
+    def _stream_csv(file_path_from: str, f: TextIO):
+        """CSVを1行ずつ読み込んで、書き出します"""
+        from charset_normalizer import from_bytes
+
+        # 文字コードは、先頭の一部だけで判定する
+        with open(file_path_from, "rb") as fin:
+            sample: bytes = fin.read(1024 * 1024)
+        detected: Any = from_bytes(sample).best()
+        encoding: str = detected.encoding if detected is not None else "utf-8"
+        if encoding.replace("-", "_").lower() == "utf_8":
+            # 先頭のBOMを除く
+            encoding = "utf-8-sig"
+        with open(file_path_from, encoding=encoding, errors="replace", newline="") as fin:
+            ConvertToMd._write_table(f, (row for row in csv.reader(fin) if any(row)))
+
+    @staticmethod
+    def _convert_with_streaming(file_path_from: str, file_path_to: str):
+        """読み込みながら書き出して、ファイルのサイズによらずメモリの使用量を抑えます"""
+        ext: str = Path(file_path_from).suffix.lower()
+        with open(file_path_to, "w", encoding="utf-8", newline="\n") as f:
+            match ext:
+                case ".pdf":
+                    ConvertToMd._stream_pdf(file_path_from, f)
+                case ".xlsx":
+                    ConvertToMd._stream_excel(file_path_from, f)
+                case ".csv":
+                    ConvertToMd._stream_csv(file_path_from, f)
+                case _:
+                    raise Exception("ストリーミングで変換できない拡張子です。")
+
+    @staticmethod
+    def _convert_in_worker(file_path_from: str, file_path_to: str, streaming_threshold: int) -> str:
+        """ワーカープロセスで変換して、エラーメッセージを返します"""
+        error: str = ""
+        try:
+            if ConvertToMd._should_stream(file_path_from, streaming_threshold):
+                ConvertToMd._convert_with_streaming(file_path_from, file_path_to)
+                return error
+            if ConvertToMd.md_of_worker is None:
+                ConvertToMd._init_worker()
+            doc: Any = ConvertToMd.md_of_worker.convert(file_path_from)
+            Path(file_path_to).write_text(doc.text_content, encoding="utf-8")
+        except Exception as e:
+            error = f"{type(e).__name__}: {str(e)}"
+        else:
+            pass
+        finally:
+            pass
+        return error
+
+    def _create_rounds(self) -> list:
+        """同時に変換するファイルのまとまりに、ファイルリストを分割します"""
+        # 変換先のファイル名が重なるファイルは、別の回に入れて、同時に変換しないようにする
+        rounds: list = []
+        dct_of_occurrence: dict = {}
+        for f in self.filtered_lst_of_f:
+            stem: str = Path(f).stem.lower()
+            i: int = dct_of_occurrence.get(stem, 0)
+            dct_of_occurrence[stem] = i + 1
+            if i == len(rounds):
+                rounds.append([])
+            rounds[i].append(f)
+        return rounds
+
+    def _tally(self, file_path_from: str, error: str, callback: Callable[[int, int], Any] | None):
+        """1つのファイルの変換結果を集計します"""
+        self.current_file_path_from = file_path_from
+        self.current_file_path_to = self._get_file_path_to(file_path_from)
+        self.log.info(f"* [{self.count + 1} / {self.number_of_f}] {self.convert_file.__doc__}: ")
+        self.log.info(f"{self.current_file_path_from} => {self.current_file_path_to}")
+        self.count += 1
+        if error:
+            self.lst_of_failure.append([self.current_file_path_from, error])
+            self.log.error(f"***失敗しました。***: {error}")
+        else:
+            self.success += 1
+            self.obj_of_mt._record(self.current_file_path_from, self.current_file_path_to)
+            self.log.info("***成功しました。***")
+        if callback:
+            callback(self.count, self.number_of_f)
+
+    def convert_all(self, callback: Callable[[int, int], Any] | None = None) -> bool:
+        """全てのファイルをプロセスプールで一括変換します"""
+        result: bool = False
+        try:
+            if not self.filtered_lst_of_f:
+                raise Exception("ファイルリストが初期化されていません。")
+            # 初期化する
+            self.count = 0
+            self.success = 0
+            self.complete = False
+            self.lst_of_failure = []
+            rounds: list = self._create_rounds()
+            number_of_workers: int = max(1, min(self.max_workers, len(rounds[0])))
+            self.log.info(f"同時に変換するプロセスの数: {number_of_workers}")
+            # GUIのスレッドがある状態でforkしないように、spawnでワーカープロセスを起動する
+            with ProcessPoolExecutor(
+                max_workers=number_of_workers, mp_context=multiprocessing.get_context("spawn"), initializer=ConvertToMd._init_worker
+            ) as executor:
+                # 回ごとに、前の回の変換が全て終わってから次の回を始める
+                for lst_of_files in rounds:
+                    futures: dict[Future, str] = {}
+                    for f in lst_of_files:
+                        try:
+                            futures[executor.submit(ConvertToMd._convert_in_worker, f, self._get_file_path_to(f), self.streaming_threshold)] = f
+                        except Exception as e:
+                            # 前の回でワーカープロセスが異常終了して、プールが使えない場合も、一括変換は続ける
+                            self._tally(f, f"{type(e).__name__}: {str(e)}", callback)
+                    # 変換が終わったファイルから順に、呼び出し元のプロセスで集計する
+                    for future in as_completed(futures):
+                        try:
+                            error: str = future.result()
+                        except Exception as e:
+                            # ワーカープロセスが異常終了した場合も、一括変換は続ける
+                            error = f"{type(e).__name__}: {str(e)}"
+                        self._tally(futures[future], error, callback)
+            self.obj_of_mt._save()
+            if self.success == self.number_of_f:
+                self.complete = True
+                self.log.info("全てのファイルの変換が終了しました。")
+            else:
+                self.log.error(f"{len(self.lst_of_failure)}件のファイルの変換が失敗しました。")
+                for file_path_from, error in self.lst_of_failure:
+                    self.log.error(f"{file_path_from}: {error}")
+                raise Exception("一部のファイルの変換が失敗しました。")
+        except Exception:
+            raise
+        else:
+            result = True
+        finally:
+            pass
+        return result
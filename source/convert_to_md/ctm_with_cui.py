@@ -1,3 +1,4 @@
+import multiprocessing
 import sys
 from pathlib import Path
 
@@ -39,6 +40,29 @@ class CTM_With_Cui:
                 pass
         return (folder_from_s, folder_to_s)
 
+    def _input_number(self, msg: str, default: int) -> int:
+        """1以上の数字を入力します"""
+        number: int = default
+        while True:
+            try:
+                text: str = input(f"{msg}(未入力 => {default}): ").strip()
+                if text == "":
+                    break
+                if not text.isdecimal():
+                    raise Exception("数字を入力してください。")
+                number = int(text)
+                if number < 1:
+                    raise Exception("1以上の数字を入力してください。")
+            except KeyboardInterrupt:
+                raise
+            except Exception as e:
+                print(f"error: \n{str(e)}")
+            else:
+                break
+            finally:
+                pass
+        return number
+
     def _input_bool(self, msg: str) -> bool:
         """はいかいいえをを入力します"""
         result: bool = False
@@ -94,12 +118,12 @@ def main() -> bool:
         result = False
         try:
             obj_of_cls.folder_path_from, obj_of_cls.folder_path_to = obj_with_cui._input_folder_path()
+            obj_of_cls.skip_unchanged = obj_with_cui._input_bool("変換済みのファイルをスキップしますか？")
             obj_of_cls.create_file_lst()
-            for _ in range(obj_of_cls.number_of_f):
-                obj_of_cls.convert_file()
-                if obj_of_cls.complete:
-                    break
-                obj_of_cls.move_to_next_file()
+            # 全てのファイルが変換済みの場合は、何もしない
+            if obj_of_cls.number_of_f:
+                obj_of_cls.max_workers = obj_with_cui._input_number("同時に変換するプロセスの数を入力してください。", obj_of_cls.max_workers)
+                obj_of_cls.convert_all()
         except KeyboardInterrupt:
             sys.exit(0)
         except Exception as e:
@@ -115,4 +139,6 @@ def main() -> bool:
 
 
 if __name__ == "__main__":
+    # exe化した場合に、プロセスプールのワーカーがmainを再実行しないようにする
+    multiprocessing.freeze_support()
     main()
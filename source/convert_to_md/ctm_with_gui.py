@@ -1,13 +1,16 @@
 import logging
+import multiprocessing
 import platform
 import subprocess
 import sys
 from pathlib import Path
+from typing import Any
 
-from PySide6.QtCore import QObject, Signal
+from PySide6.QtCore import QObject, QThread, Signal
 from PySide6.QtGui import QFont
 from PySide6.QtWidgets import (
     QApplication,
+    QCheckBox,
     QFileDialog,
     QFormLayout,
     QLabel,
@@ -17,6 +20,7 @@ from PySide6.QtWidgets import (
     QProgressBar,
     QPushButton,
     QScrollArea,
+    QSpinBox,
     QTextEdit,
     QVBoxLayout,
     QWidget,
@@ -26,6 +30,32 @@ from source.common.common import DatetimeTools, GUITools, LogTools, PlatformTool
 from source.convert_to_md.ctm_class import ConvertToMd
 
 
+class ConvertWorker(QObject):
+    """一括変換の処理のワーカー"""
+
+    progress: Signal = Signal(int, int)
+    finished: Signal = Signal(bool)
+    error: Signal = Signal(str)
+
+    def __init__(self, obj_of_cls: Any):
+        """初期化します"""
+        super().__init__()
+        self.obj_of_cls = obj_of_cls
+
+    def run(self):
+        """実行します"""
+        result: bool = False
+        try:
+            self.obj_of_cls.convert_all(self.progress.emit)
+        except Exception as e:
+            self.error.emit(f"error: \n{str(e)}")
+        else:
+            result = True
+        finally:
+            pass
+        self.finished.emit(result)
+
+
 class LogEmitter(QObject):
     """loggingの出力をQtのSignalに変換し、GUIスレッドへ安全にログを伝達するためのクラス"""
 
@@ -50,6 +80,8 @@ class MainApp_Of_CTM(QMainWindow):
         super().__init__()
         self.obj_of_lt: LogTools = LogTools()
         self.obj_of_cls: ConvertToMd = ConvertToMd(self.obj_of_lt.logger)
+        # 一括変換の実行中かどうか
+        self.is_converting: bool = False
         self._setup_ui()
         self.obj_of_dt2: DatetimeTools = DatetimeTools()
         self.obj_of_pft: PlatformTools = PlatformTools()
@@ -57,6 +89,11 @@ class MainApp_Of_CTM(QMainWindow):
 
     def closeEvent(self, event):
         """終了します"""
+        if self.is_converting:
+            # 実行中のスレッドとプロセスプールを残さないように、一括変換が終わるまで終了しない
+            self._show_error("一括変換の実行中です。終わってから終了してください。")
+            event.ignore()
+            return
         if self.obj_of_lt:
             self._show_info(f"ログファイルは、\n{self.obj_of_lt.file_path_of_log}\nに出力されました。")
         for h in self.obj_of_lt.logger.handlers[:]:
@@ -162,6 +199,18 @@ class MainApp_Of_CTM(QMainWindow):
             btn_open_to: QPushButton = QPushButton("変換先のフォルダを開く")
             main_container_layout.addRow(btn_open_to)
             btn_open_to.clicked.connect(lambda *args: self.open_explorer(self.obj_of_cls.folder_path_to))
+            # 変換済みのファイル
+            skip_checkbox: QCheckBox = QCheckBox("変換済みのファイルをスキップする")
+            skip_checkbox.setChecked(self.obj_of_cls.skip_unchanged)
+            main_container_layout.addRow(skip_checkbox)
+            skip_checkbox.toggled.connect(lambda *args, chckbx=skip_checkbox: self._get_skip_unchanged(chckbx))
+            # 同時に変換するプロセスの数
+            main_container_layout.addRow(QLabel("同時に変換するプロセスの数: "))
+            self.workers_spin: QSpinBox = QSpinBox()
+            self.workers_spin.setRange(1, max(self.obj_of_cls.max_workers, 1) * 2)
+            self.workers_spin.setValue(self.obj_of_cls.max_workers)
+            self.workers_spin.valueChanged.connect(self._get_max_workers)
+            main_container_layout.addRow(self.workers_spin)
             # 進行状況
             main_container_layout.addRow(QLabel("進行状況: "))
             self.progress_bar: QProgressBar = QProgressBar()
@@ -170,6 +219,8 @@ class MainApp_Of_CTM(QMainWindow):
             btn_convert: QPushButton = QPushButton("Markdownファイルへの一括変換を実行する")
             main_container_layout.addRow(btn_convert)
             btn_convert.clicked.connect(self.convert_all_files)
+            # 一括変換の実行中は、設定を変えられないようにするウィジェット
+            self.lst_of_locked_widgets: list = [btn_select_from, btn_select_to, skip_checkbox, self.workers_spin, btn_convert]
             # ログ
             self.log_area: QTextEdit = QTextEdit()
             self.log_area.setReadOnly(True)
@@ -183,6 +234,30 @@ class MainApp_Of_CTM(QMainWindow):
             pass
         return result
 
+    def _get_max_workers(self, value: int):
+        """同時に変換するプロセスの数を取得します"""
+        try:
+            self.obj_of_cls.max_workers = value
+        except Exception as e:
+            self._show_error(f"error: \n{str(e)}")
+        else:
+            pass
+        finally:
+            pass
+
+    def _get_skip_unchanged(self, chckbx: QCheckBox):
+        """変換済みのファイルをスキップするかどうかを取得します"""
+        try:
+            self.obj_of_cls.skip_unchanged = chckbx.isChecked()
+            if self.obj_of_cls.folder_path_from and self.obj_of_cls.folder_path_to:
+                self.show_file_lst()
+        except Exception as e:
+            self._show_error(f"error: \n{str(e)}")
+        else:
+            pass
+        finally:
+            pass
+
     def select_folder_from(self, lbl: QLabel) -> bool:
         """変換元のフォルダを選択します"""
         result: bool = False
@@ -253,6 +328,8 @@ class MainApp_Of_CTM(QMainWindow):
                 file_s: str = file_p.name
                 self.lst_widget.addItem(file_s)
             self.progress_bar.setValue(0)
+            if not self.obj_of_cls.number_of_f:
+                self._show_info("全てのファイルが変換済みです。")
         except Exception as e:
             self._show_error(f"error: \n{str(e)}")
         else:
@@ -267,21 +344,44 @@ class MainApp_Of_CTM(QMainWindow):
         try:
             if not self.obj_of_cls.filtered_lst_of_f:
                 raise Exception("ファイルリストが初期化されていません。")
+            if self.is_converting:
+                raise Exception("一括変換の実行中です。")
             self.progress_bar.setRange(0, self.obj_of_cls.number_of_f)
-            for i in range(self.obj_of_cls.number_of_f):
-                self.obj_of_cls.convert_file()
-                self.progress_bar.setValue(i + 1)
-                if self.obj_of_cls.complete:
-                    break
-                self.obj_of_cls.move_to_next_file()
+            self.progress_bar.setValue(0)
+            # 変換中も画面が固まらないように、別スレッドで実行する
+            self.worker: ConvertWorker = ConvertWorker(self.obj_of_cls)
+            self.worker_thread: QThread = QThread()
+            self.worker.moveToThread(self.worker_thread)
+            self.worker_thread.started.connect(self.worker.run)
+            self.worker.progress.connect(lambda count, _: self.progress_bar.setValue(count))
+            self.worker.error.connect(self._show_error)
+            self.worker.finished.connect(self.worker_thread.quit)
+            self.worker.finished.connect(self.worker.deleteLater)
+            self.worker_thread.finished.connect(self.worker_thread.deleteLater)
+            self.worker.finished.connect(self._finish_converting)
+            self.is_converting = True
+            self._set_widgets_enabled(False)
+            self.worker_thread.start()
         except Exception as e:
             self._show_error(f"error: \n{str(e)}")
         else:
             result = True
         finally:
-            self._show_result(self.convert_all_files.__doc__, result)
+            pass
         return result
 
+    def _finish_converting(self, success: bool):
+        """一括変換の終了を処理します"""
+        # スレッドの終了前に破棄されないように、参照は残しておく
+        self.is_converting = False
+        self._set_widgets_enabled(True)
+        self._show_result(self.convert_all_files.__doc__, success)
+
+    def _set_widgets_enabled(self, enabled: bool):
+        """一括変換の実行中に、設定を変えられないようにします"""
+        for widget in self.lst_of_locked_widgets:
+            widget.setEnabled(enabled)
+
 
 def create_window() -> MainApp_Of_CTM:
     window: MainApp_Of_CTM = MainApp_Of_CTM()
@@ -313,4 +413,6 @@ def main() -> bool:
 
 
 if __name__ == "__main__":
+    # exe化した場合に、プロセスプールのワーカーがmainを再実行しないようにする
+    multiprocessing.freeze_support()
     main()
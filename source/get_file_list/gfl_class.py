@@ -1,5 +1,290 @@
+import fnmatch
+import hashlib
+import os
+import re
+import sqlite3
+import sys
+import time
+from collections import defaultdict
+from concurrent.futures import FIRST_COMPLETED, ThreadPoolExecutor, wait
+from contextlib import closing
+from datetime import datetime
 from logging import Logger
 from pathlib import Path
+from typing import Any, Callable, Iterator
+
+
+class FileQuery:
+    """
+    複数の検索条件を一度だけコンパイルして、ファイルを判定します
+    ファイル名だけで判定できる安い条件から順に判定し、サイズと更新日時は最後に判定します
+    """
+
+    def __init__(
+        self,
+        pattern: str = "",
+        glob: str = "",
+        regex: str = "",
+        exts: list | None = None,
+        min_size: int | None = None,
+        max_size: int | None = None,
+        min_mtime: datetime | None = None,
+        max_mtime: datetime | None = None,
+    ):
+        """初期化します"""
+        # ファイルパスに含まれる文字列
+        self.pattern: str = pattern
+        # ワイルドカード(区切り文字を含む場合はファイルパス、それ以外はファイル名と照合します)
+        self.glob: str = glob
+        # 正規表現(ファイルパスと照合します)
+        self.regex: str = regex
+        # 拡張子のリスト
+        self.exts: list = exts or []
+        # サイズの範囲(バイト)
+        self.min_size: int | None = min_size
+        self.max_size: int | None = max_size
+        # 更新日時の範囲
+        self.min_mtime: datetime | None = min_mtime
+        self.max_mtime: datetime | None = max_mtime
+        # ファイルパスとファイル名で判定する条件のリスト
+        self.lst_of_name_predicates: list = []
+        # サイズと更新日時(ナノ秒)で判定する条件のリスト
+        self.lst_of_stat_predicates: list = []
+        self._compile()
+
+    def __str__(self) -> str:
+        """検索条件を文字列にします"""
+        dct_of_conditions: dict = {
+            "部分一致": self.pattern,
+            "ワイルドカード": self.glob,
+            "正規表現": self.regex,
+            "拡張子": ",".join(self.exts),
+            "最小サイズ": self.min_size,
+            "最大サイズ": self.max_size,
+            "更新日時の開始": self.min_mtime,
+            "更新日時の終了": self.max_mtime,
+        }
+        return ", ".join(f"{k}={v}" for k, v in dct_of_conditions.items() if v not in ("", None)) or "なし"
+
+    def _compile(self) -> bool:
+        """検索条件をコンパイルします"""
+        result: bool = False
+        try:
+            lst_of_name_predicates: list = []
+            lst_of_stat_predicates: list = []
+            if self.exts:
+                set_of_exts: frozenset = frozenset("." + ext.strip().lower().lstrip(".") for ext in self.exts)
+                lst_of_name_predicates.append(lambda path, name: os.path.splitext(name)[1].lower() in set_of_exts)
+            if self.pattern:
+                pattern: str = self.pattern
+                lst_of_name_predicates.append(lambda path, name: pattern in path)
+            if self.glob:
+                match_glob: Callable = re.compile(fnmatch.translate(os.path.normcase(self.glob))).match
+                if "/" in self.glob or os.sep in self.glob:
+                    lst_of_name_predicates.append(lambda path, name: match_glob(os.path.normcase(path)) is not None)
+                else:
+                    lst_of_name_predicates.append(lambda path, name: match_glob(os.path.normcase(name)) is not None)
+            if self.regex:
+                search_regex: Callable = re.compile(self.regex).search
+                lst_of_name_predicates.append(lambda path, name: search_regex(path) is not None)
+            if self.min_size is not None or self.max_size is not None:
+                min_size: int = self.min_size if self.min_size is not None else 0
+                max_size: float = self.max_size if self.max_size is not None else float("inf")
+                if min_size > max_size:
+                    raise Exception("最小サイズが最大サイズを超えています。")
+                lst_of_stat_predicates.append(lambda size, mtime_ns: min_size <= size <= max_size)
+            if self.min_mtime is not None or self.max_mtime is not None:
+                min_ns: float = int(self.min_mtime.timestamp() * 1_000_000_000) if self.min_mtime is not None else float("-inf")
+                max_ns: float = int(self.max_mtime.timestamp() * 1_000_000_000) if self.max_mtime is not None else float("inf")
+                if min_ns > max_ns:
+                    raise Exception("更新日時の開始が終了より後です。")
+                lst_of_stat_predicates.append(lambda size, mtime_ns: min_ns <= mtime_ns <= max_ns)
+        except re.error as e:
+            raise Exception(f"正規表現が正しくありません。: {str(e)}")
+        except Exception:
+            raise
+        else:
+            result = True
+            self.lst_of_name_predicates = lst_of_name_predicates
+            self.lst_of_stat_predicates = lst_of_stat_predicates
+        finally:
+            pass
+        return result
+
+    def match_entry(self, entry: os.DirEntry) -> bool:
+        """走査中のファイルが検索条件に一致するかどうかを判定します"""
+        for predicate in self.lst_of_name_predicates:
+            if not predicate(entry.path, entry.name):
+                return False
+        if self.lst_of_stat_predicates:
+            # 名前の条件をすべて満たした場合だけ、statを取得する
+            try:
+                stat: os.stat_result = entry.stat()
+            except OSError:
+                return False
+            for predicate in self.lst_of_stat_predicates:
+                if not predicate(stat.st_size, stat.st_mtime_ns):
+                    return False
+        return True
+
+    def match_path(self, path: str) -> bool:
+        """ファイルパスが検索条件に一致するかどうかを判定します(サイズと更新日時の条件がある場合だけ、statします)"""
+        return self.match_row(path, 0, 0) is not None
+
+    def match_row(self, path: str, size: int, mtime_ns: int) -> tuple | None:
+        """インデックスの行が検索条件に一致するかどうかを判定して、一致した場合は行を返します"""
+        name: str = os.path.basename(path)
+        for predicate in self.lst_of_name_predicates:
+            if not predicate(path, name):
+                return None
+        if self.lst_of_stat_predicates:
+            # ファイルをその場で書き換えてもフォルダの更新日時は変わらず、インデックスの値は古い場合があるため、statし直す
+            try:
+                stat: os.stat_result = os.stat(path)
+            except OSError:
+                return None
+            size, mtime_ns = stat.st_size, stat.st_mtime_ns
+            for predicate in self.lst_of_stat_predicates:
+                if not predicate(size, mtime_ns):
+                    return None
+        return (path, size, mtime_ns)
+
+
+class FileIndex:
+    """
+    フォルダ内のファイルの一覧をSQLiteのインデックスに保存します
+    更新日時が変わったフォルダだけを再走査して、インデックスを更新します
+    """
+
+    def __init__(self, logger: Logger, folder_path: str, folder_path_of_index: str):
+        """初期化します"""
+        self.log: Logger = logger
+        # 起点のフォルダパス
+        self.folder_path: str = folder_path
+        # インデックスのファイルパス(起点のフォルダごとに作成します)
+        key: str = hashlib.sha256(os.path.normcase(os.path.abspath(folder_path)).encode("utf-8")).hexdigest()[:16]
+        folder_of_index_p: Path = Path(folder_path_of_index)
+        folder_of_index_p.mkdir(parents=True, exist_ok=True)
+        self.file_path_of_index: str = str(folder_of_index_p / f"index_{key}.sqlite3")
+        # 再走査したフォルダの数
+        self.number_of_scanned: int = 0
+        self._create_tables()
+
+    def _connect(self) -> sqlite3.Connection:
+        """インデックスに接続します(スレッドをまたいで使えるように、都度接続します)"""
+        return sqlite3.connect(self.file_path_of_index)
+
+    def _create_tables(self) -> bool:
+        """テーブルを作成します"""
+        result: bool = False
+        try:
+            with closing(self._connect()) as conn, conn:
+                conn.execute("CREATE TABLE IF NOT EXISTS folders (path TEXT PRIMARY KEY, parent TEXT, mtime_ns INTEGER)")
+                conn.execute("CREATE TABLE IF NOT EXISTS files (path TEXT PRIMARY KEY, folder TEXT, ext TEXT, size INTEGER, mtime_ns INTEGER)")
+                conn.execute("CREATE INDEX IF NOT EXISTS idx_folders_parent ON folders (parent)")
+                conn.execute("CREATE INDEX IF NOT EXISTS idx_files_folder ON files (folder)")
+        except Exception:
+            raise
+        else:
+            result = True
+        finally:
+            pass
+        return result
+
+    def _delete_folder(self, conn: sqlite3.Connection, folder_path: str):
+        """消えたフォルダとその配下をインデックスから削除します"""
+        prefix: str = folder_path.rstrip(os.sep) + os.sep
+        conn.execute("DELETE FROM folders WHERE path = ? OR substr(path, 1, ?) = ?", (folder_path, len(prefix), prefix))
+        conn.execute("DELETE FROM files WHERE folder = ? OR substr(folder, 1, ?) = ?", (folder_path, len(prefix), prefix))
+
+    def _scan_folder(self, conn: sqlite3.Connection, folder_path: str, parent: str | None, mtime_ns: int) -> list:
+        """フォルダを再走査して、ファイルとサブフォルダを記録します"""
+        lst_of_rows: list = []
+        lst_of_folders: list = []
+        with os.scandir(folder_path) as it:
+            for entry in it:
+                try:
+                    if entry.is_dir(follow_symlinks=False):
+                        lst_of_folders.append(entry.path)
+                    elif entry.is_file():
+                        stat: os.stat_result = entry.stat()
+                        lst_of_rows.append((entry.path, folder_path, os.path.splitext(entry.name)[1].lower(), stat.st_size, stat.st_mtime_ns))
+                except OSError:
+                    continue
+        conn.execute("DELETE FROM files WHERE folder = ?", (folder_path,))
+        conn.executemany("INSERT OR REPLACE INTO files VALUES (?, ?, ?, ?, ?)", lst_of_rows)
+        # 消えたサブフォルダを削除し、新しいサブフォルダは未走査として記録する
+        set_of_folders: set = set(lst_of_folders)
+        for (child,) in conn.execute("SELECT path FROM folders WHERE parent = ?", (folder_path,)).fetchall():
+            if child not in set_of_folders:
+                self._delete_folder(conn, child)
+        conn.executemany("INSERT OR IGNORE INTO folders VALUES (?, ?, NULL)", [(d, folder_path) for d in lst_of_folders])
+        conn.execute("INSERT OR REPLACE INTO folders VALUES (?, ?, ?)", (folder_path, parent, mtime_ns))
+        self.number_of_scanned += 1
+        return lst_of_folders
+
+    def refresh(self, recursive: bool, is_cancelled: Callable[[], bool] | None = None) -> bool:
+        """更新日時が変わったフォルダだけを再走査して、インデックスを更新します"""
+        result: bool = False
+        try:
+            self.number_of_scanned = 0
+            with closing(self._connect()) as conn, conn:
+                stack: list = [(self.folder_path, None)]
+                while stack:
+                    # フォルダごとに記録しているため、途中で打ち切っても、次回は残りのフォルダから再走査する
+                    if is_cancelled is not None and is_cancelled():
+                        self.log.warning("インデックスの更新をキャンセルしました。")
+                        return result
+                    folder_path, parent = stack.pop()
+                    try:
+                        mtime_ns: int = os.stat(folder_path).st_mtime_ns
+                    except OSError:
+                        if parent is None:
+                            raise
+                        self._delete_folder(conn, folder_path)
+                        continue
+                    row: tuple | None = conn.execute("SELECT mtime_ns FROM folders WHERE path = ?", (folder_path,)).fetchone()
+                    if row is not None and row[0] == mtime_ns:
+                        # フォルダ直下に変更がなければ、記録済みのサブフォルダだけを辿る
+                        lst_of_folders: list = [r[0] for r in conn.execute("SELECT path FROM folders WHERE parent = ?", (folder_path,))]
+                    else:
+                        try:
+                            lst_of_folders = self._scan_folder(conn, folder_path, parent, mtime_ns)
+                        except OSError as e:
+                            if parent is None:
+                                raise
+                            self.log.warning(f"フォルダを読み込めませんでした。: {folder_path}: {str(e)}")
+                            continue
+                    if recursive:
+                        stack.extend((d, folder_path) for d in reversed(lst_of_folders))
+            self.log.info(f"インデックスを更新しました。(再走査したフォルダ: {self.number_of_scanned}件)")
+        except Exception:
+            raise
+        else:
+            result = True
+        finally:
+            pass
+        return result
+
+    def select_paths(self, recursive: bool, pattern: str = "") -> list:
+        """インデックスからファイルパスのリストを取得します"""
+        sql: str = "SELECT path FROM files WHERE instr(path, ?) > 0"
+        params: list = [pattern]
+        if not recursive:
+            sql += " AND folder = ?"
+            params.append(self.folder_path)
+        with closing(self._connect()) as conn:
+            return [r[0] for r in conn.execute(sql + " ORDER BY path", params)]
+
+    def iter_rows(self, recursive: bool) -> Iterator[tuple]:
+        """インデックスからファイルパス、サイズ、更新日時の行を1件ずつ返します"""
+        sql: str = "SELECT path, size, mtime_ns FROM files"
+        params: list = []
+        if not recursive:
+            sql += " WHERE folder = ?"
+            params.append(self.folder_path)
+        with closing(self._connect()) as conn:
+            yield from conn.execute(sql + " ORDER BY path", params)
 
 
 class GetFileList:
@@ -21,6 +306,95 @@ class GetFileList:
         # ファイルの数
         self.num_of_f_before: int = 0
         self.num_of_f_after: int = 0
+        # 再帰的に検索するときの並列数
+        self.max_workers: int = min(32, (os.cpu_count() or 1) + 4)
+        # インデックスを使うかどうか
+        self.use_index: bool = False
+        # インデックスのフォルダパス
+        # exe化されている場合は、exeと同じフォルダにインデックスを作成します
+        exe_path: Path = Path(sys.executable) if getattr(sys, "frozen", False) else Path(__file__)
+        self.folder_path_of_index: str = str(exe_path.parent / "__index__")
+        # インデックスのオブジェクト
+        self.obj_of_fi: FileIndex | None = None
+        # 詳細な検索条件のオブジェクト
+        self.obj_of_fq: FileQuery | None = None
+        # 検索で走査したときの条件(起点のフォルダパス, 再帰的に検索するかどうか)
+        self.key_of_lst_file_before: tuple = ()
+        # 重複の検出で、部分的に比較する先頭と末尾のサイズ(バイト)
+        self.head_tail_size: int = 64 * 1024
+        # 重複の検出で、ファイル全体を読み込むときのバッファのサイズ(バイト)
+        self.buffer_size: int = 1024 * 1024
+        # 少しずつ返すときに、まとめて返す間隔(秒)
+        self.batch_interval: float = 0.2
+        # キャンセルするかどうか
+        self.cancel: bool = False
+        # 重複したファイルのグループのリスト
+        self.lst_of_duplicates: list = []
+        # 重複による無駄な容量の合計(バイト)
+        self.wasted_bytes: int = 0
+
+    def _scan_folder(self, folder_path: str) -> tuple:
+        """フォルダ直下のファイルとサブフォルダを取得します"""
+        lst_of_entries: list = []
+        lst_of_folders: list = []
+        try:
+            with os.scandir(folder_path) as it:
+                for entry in it:
+                    # DirEntryが持つ種別の情報を使い、ファイルごとのstatを省く
+                    if entry.is_dir(follow_symlinks=False):
+                        lst_of_folders.append(entry.path)
+                    elif entry.is_file():
+                        lst_of_entries.append(entry)
+        except OSError as e:
+            if folder_path == self.folder_path:
+                raise
+            self.log.warning(f"フォルダを読み込めませんでした。: {folder_path}: {str(e)}")
+        return (lst_of_entries, lst_of_folders)
+
+    def _walk(self) -> Iterator[tuple]:
+        """フォルダごとにファイルのリストとサブフォルダのリストを返します"""
+        if not self.recursive:
+            yield self._scan_folder(self.folder_path)
+            return
+        if self.max_workers <= 1:
+            stack: list = [self.folder_path]
+            while stack:
+                lst_of_entries, lst_of_folders = self._scan_folder(stack.pop())
+                stack.extend(reversed(lst_of_folders))
+                yield (lst_of_entries, lst_of_folders)
+            return
+        # サブフォルダを並列で走査する
+        executor: ThreadPoolExecutor = ThreadPoolExecutor(max_workers=self.max_workers)
+        try:
+            pending: set = {executor.submit(self._scan_folder, self.folder_path)}
+            while pending:
+                done, pending = wait(pending, return_when=FIRST_COMPLETED)
+                for future in done:
+                    lst_of_entries, lst_of_folders = future.result()
+                    pending.update(executor.submit(self._scan_folder, d) for d in lst_of_folders)
+                    yield (lst_of_entries, lst_of_folders)
+        finally:
+            # 途中で打ち切られた場合は、未着手の走査を取り消す
+            executor.shutdown(wait=True, cancel_futures=True)
+
+    def walk_files(self) -> Iterator[os.DirEntry]:
+        """ファイルを1件ずつ返します"""
+        for lst_of_entries, _ in self._walk():
+            yield from lst_of_entries
+
+    def count_files(self) -> int:
+        """ファイルの数だけを数えます"""
+        return sum(len(lst_of_entries) for lst_of_entries, _ in self._walk())
+
+    def _setup_index(self, is_cancelled: Callable[[], bool] | None = None) -> bool:
+        """インデックスを使う場合は、インデックスを用意して更新し、使うかどうかを返します"""
+        if not self.use_index:
+            self.obj_of_fi = None
+            return False
+        if self.obj_of_fi is None or self.obj_of_fi.folder_path != self.folder_path:
+            self.obj_of_fi = FileIndex(self.log, self.folder_path, self.folder_path_of_index)
+        self.obj_of_fi.refresh(self.recursive, is_cancelled)
+        return True
 
     def search_directly_under_folder(self) -> bool:
         """フォルダ直下を検索します"""
@@ -28,8 +402,16 @@ class GetFileList:
         try:
             self.log.info(f"起点のフォルダパス: {self.folder_path}")
             self.log.info(f"再帰的に検索: {'する' if self.recursive else 'しない'}")
-            RECURSIVE: str = "**/*" if self.recursive else "*"
-            self.lst_file_before = [str(f) for f in Path(self.folder_path).glob(RECURSIVE) if f.is_file()]
+            # 前回の抽出結果を消す
+            self.lst_file_after = []
+            self.num_of_f_after = 0
+            if self._setup_index():
+                self.lst_file_before = self.obj_of_fi.select_paths(self.recursive)
+                self.key_of_lst_file_before = ()
+            else:
+                # 抽出で走査し直さないように、走査したファイルパスを保持する(DirEntryは保持しない)
+                self.lst_file_before = [entry.path for entry in self.walk_files()]
+                self.key_of_lst_file_before = (self.folder_path, self.recursive)
             if not self.lst_file_before:
                 raise Exception("フォルダにファイルがありませんでした。")
             self.num_of_f_before = len(self.lst_file_before)
@@ -48,8 +430,24 @@ class GetFileList:
         """検索パターンで抽出します"""
         result: bool = False
         try:
-            self.log.info(f"検索パターン: {self.pattern if self.pattern else "なし"}")
-            self.lst_file_after = [f for f in self.lst_file_before if self.pattern in f]
+            if self.obj_of_fq is not None:
+                self.log.info(f"検索条件: {self.obj_of_fq}")
+            else:
+                self.log.info(f"検索パターン: {self.pattern if self.pattern else "なし"}")
+            if self.obj_of_fq is not None and self.obj_of_fi is not None:
+                self.lst_file_after = [r[0] for r in self.obj_of_fi.iter_rows(self.recursive) if self.obj_of_fq.match_row(*r)]
+            elif self.obj_of_fq is not None:
+                if self.key_of_lst_file_before == (self.folder_path, self.recursive):
+                    # 検索で走査したファイルパスを使い回し、サイズと更新日時は必要な場合だけstatし直す
+                    self.lst_file_after = [f for f in self.lst_file_before if self.obj_of_fq.match_path(f)]
+                else:
+                    # 走査しながら判定して、一致したファイルだけを保持する
+                    self.lst_file_after = [entry.path for entry in self.walk_files() if self.obj_of_fq.match_entry(entry)]
+            elif self.obj_of_fi is not None:
+                # 走査し直さずに、インデックスから抽出する
+                self.lst_file_after = self.obj_of_fi.select_paths(self.recursive, self.pattern)
+            else:
+                self.lst_file_after = [f for f in self.lst_file_before if self.pattern in f]
             if not self.lst_file_after:
                 raise Exception("検索パターンによる抽出結果がありませんでした。")
             self.num_of_f_after = len(self.lst_file_after)
@@ -63,3 +461,171 @@ class GetFileList:
         finally:
             pass
         return result
+
+    def _iter_matches(self, obj_of_fq: FileQuery) -> Iterator[list]:
+        """検索条件に一致したファイルパス、サイズ、更新日時の行を、フォルダごとに返します"""
+        if self.obj_of_fi is not None:
+            lst_of_matches: list = []
+            for i, row in enumerate(self.obj_of_fi.iter_rows(self.recursive), start=1):
+                matched: tuple | None = obj_of_fq.match_row(*row)
+                if matched is not None:
+                    lst_of_matches.append(matched)
+                # 一致しなくても、一定の件数ごとに返して、キャンセルを受け付ける
+                if i % 1000 == 0:
+                    yield lst_of_matches
+                    lst_of_matches = []
+            yield lst_of_matches
+            return
+        for lst_of_entries, _ in self._walk():
+            lst_of_matches = []
+            for entry in lst_of_entries:
+                if not obj_of_fq.match_entry(entry):
+                    continue
+                try:
+                    stat: os.stat_result = entry.stat()
+                except OSError:
+                    continue
+                lst_of_matches.append((entry.path, stat.st_size, stat.st_mtime_ns))
+            yield lst_of_matches
+
+    def search_in_batches(self, callback: Callable, batch_size: int = 1000) -> bool:
+        """検索条件に一致するファイルを、まとまりごとに返します"""
+        result: bool = False
+        try:
+            self.cancel = False
+            self.log.info(f"起点のフォルダパス: {self.folder_path}")
+            self.log.info(f"再帰的に検索: {'する' if self.recursive else 'しない'}")
+            # 検索パターンだけの場合も、同じ判定を使う
+            obj_of_fq: FileQuery = self.obj_of_fq if self.obj_of_fq is not None else FileQuery(pattern=self.pattern)
+            self.log.info(f"検索条件: {obj_of_fq}")
+            self.lst_file_after = []
+            lst_of_rows: list = []
+            last_time: float = time.monotonic()
+            self._setup_index(lambda: self.cancel)
+            for lst_of_matches in self._iter_matches(obj_of_fq):
+                if self.cancel:
+                    break
+                lst_of_rows.extend(lst_of_matches)
+                # 件数か時間が一定を超えたら、まとめて返す
+                if len(lst_of_rows) >= batch_size or (lst_of_rows and time.monotonic() - last_time >= self.batch_interval):
+                    self.lst_file_after.extend(row[0] for row in lst_of_rows)
+                    callback(lst_of_rows)
+                    lst_of_rows = []
+                    last_time = time.monotonic()
+            if lst_of_rows:
+                self.lst_file_after.extend(row[0] for row in lst_of_rows)
+                callback(lst_of_rows)
+            self.num_of_f_after = len(self.lst_file_after)
+            if self.cancel:
+                # キャンセルは成功として扱わず、途中までの件数を残す
+                self.log.warning(f"キャンセルされました。(キャンセルまでに{self.num_of_f_after}件のファイルが抽出されました)")
+                return result
+            self.log.info(f"{self.num_of_f_after}件のファイルが抽出されました。")
+        except Exception:
+            raise
+        else:
+            result = True
+            self.log.info(f"***{self.search_in_batches.__doc__} => 成功しました。***")
+        finally:
+            pass
+        return result
+
+    def _get_stat(self, file_path: str) -> os.stat_result | None:
+        """ファイルのサイズと実体の情報を取得します"""
+        try:
+            return os.stat(file_path)
+        except OSError as e:
+            self.log.warning(f"ファイルのサイズを取得できませんでした。: {file_path}: {str(e)}")
+            return None
+
+    def _get_hash(self, file_path: str, partial: bool) -> str | None:
+        """ファイルのハッシュ値を取得します(部分的な場合は、先頭と末尾だけを読み込みます)"""
+        try:
+            obj_of_hash: Any = hashlib.blake2b()
+            with open(file_path, "rb") as f:
+                if partial:
+                    size: int = os.fstat(f.fileno()).st_size
+                    obj_of_hash.update(f.read(self.head_tail_size))
+                    # 先頭と末尾が重ならないようにする(小さいファイルは、全体を読み込むことになる)
+                    f.seek(max(self.head_tail_size, size - self.head_tail_size))
+                    obj_of_hash.update(f.read(self.head_tail_size))
+                else:
+                    buffer: bytearray = bytearray(self.buffer_size)
+                    view: memoryview = memoryview(buffer)
+                    while n := f.readinto(buffer):
+                        # キャンセルされたら、大きいファイルも読み込みを打ち切る
+                        if self.cancel:
+                            return None
+                        obj_of_hash.update(view[:n])
+            return obj_of_hash.hexdigest()
+        except OSError as e:
+            self.log.warning(f"ファイルを読み込めませんでした。: {file_path}: {str(e)}")
+            return None
+
+    def _regroup_by_hash(self, executor: ThreadPoolExecutor, lst_of_groups: list, partial: bool) -> list:
+        """グループ内のファイルをハッシュ値で分け直し、2件以上のグループだけを返します"""
+        lst_of_keys: list = [(size, file_path) for size, _, lst_of_files in lst_of_groups for file_path in lst_of_files]
+        dct_of_groups: defaultdict = defaultdict(list)
+        for (size, file_path), digest in zip(lst_of_keys, executor.map(lambda k: self._get_hash(k[1], partial), lst_of_keys)):
+            if digest is not None:
+                dct_of_groups[(size, digest)].append(file_path)
+        return [(size, digest, lst_of_files) for (size, digest), lst_of_files in dct_of_groups.items() if len(lst_of_files) > 1]
+
+    def find_duplicates(self) -> bool:
+        """重複したファイルを検出します"""
+        result: bool = False
+        try:
+            self.cancel = False
+            # 抽出結果があれば抽出結果、なければ検索結果を対象にする
+            lst_of_targets: list = self.lst_file_after if self.lst_file_after else self.lst_file_before
+            if not lst_of_targets:
+                raise Exception("先にファイルを検索してください。")
+            with ThreadPoolExecutor(max_workers=self.max_workers) as executor:
+                # 1段階目: サイズで分ける(空のファイルは除く)
+                dct_of_sizes: defaultdict = defaultdict(list)
+                set_of_inodes: set = set()
+                number_of_hardlinks: int = 0
+                for file_path, stat in zip(lst_of_targets, executor.map(self._get_stat, lst_of_targets)):
+                    if stat is None or not stat.st_size:
+                        continue
+                    # 同じ実体を指すファイル(ハードリンク)は容量を使わないため、1件だけを対象にする
+                    inode: tuple = (stat.st_dev, stat.st_ino)
+                    if inode in set_of_inodes:
+                        number_of_hardlinks += 1
+                        continue
+                    set_of_inodes.add(inode)
+                    dct_of_sizes[stat.st_size].append(file_path)
+                if number_of_hardlinks:
+                    self.log.info(f"同じ実体を指すファイル(ハードリンク): {number_of_hardlinks}件は除きました。")
+                lst_of_groups: list = [(size, "", lst_of_files) for size, lst_of_files in dct_of_sizes.items() if len(lst_of_files) > 1]
+                self.log.info(f"サイズが同じファイル: {sum(len(g[2]) for g in lst_of_groups)}件")
+                # 2段階目: 先頭と末尾のハッシュ値で分ける
+                lst_of_groups = self._regroup_by_hash(executor, lst_of_groups, partial=True)
+                self.log.info(f"先頭と末尾が同じファイル: {sum(len(g[2]) for g in lst_of_groups)}件")
+                # 3段階目: 全体のハッシュ値で分ける(全体を読み込み済みの小さいファイルは除く)
+                lst_of_small: list = [g for g in lst_of_groups if g[0] <= self.head_tail_size * 2]
+                lst_of_large: list = [g for g in lst_of_groups if g[0] > self.head_tail_size * 2]
+                lst_of_groups = lst_of_small + self._regroup_by_hash(executor, lst_of_large, partial=False)
+            if self.cancel:
+                self.log.warning("キャンセルされました。")
+                return result
+            self.lst_of_duplicates = sorted(
+                (
+                    {"size": size, "hash": digest, "files": sorted(lst_of_files), "wasted_bytes": size * (len(lst_of_files) - 1)}
+                    for size, digest, lst_of_files in lst_of_groups
+                ),
+                key=lambda d: d["wasted_bytes"],
+                reverse=True,
+            )
+            self.wasted_bytes = sum(d["wasted_bytes"] for d in self.lst_of_duplicates)
+            self.log.info(f"{len(self.lst_of_duplicates)}組の重複したファイルがあります。(無駄な容量: {self.wasted_bytes}バイト)")
+            for d in self.lst_of_duplicates:
+                self.log.info(f"{len(d['files'])}件 × {d['size']}バイト(無駄な容量: {d['wasted_bytes']}バイト)\n" + "\n".join(d["files"]))
+        except Exception:
+            raise
+        else:
+            result = True
+            self.log.info(f"***{self.find_duplicates.__doc__} => 成功しました。***")
+        finally:
+            pass
+        return result
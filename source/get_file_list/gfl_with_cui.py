@@ -1,8 +1,9 @@
 import sys
+from datetime import datetime, time
 from pathlib import Path
 
 from source.common.common import DatetimeTools, LogTools
-from source.get_file_list.gfl_class import GetFileList
+from source.get_file_list.gfl_class import FileQuery, GetFileList
 
 
 class GFL_With_Cui:
@@ -59,6 +60,38 @@ class GFL_With_Cui:
                 pass
         return result
 
+    def _input_query(self) -> FileQuery:
+        """詳細な検索条件を入力します(未入力の条件は使いません)"""
+        while True:
+            try:
+                pattern: str = input("ファイルパスに含まれる文字列を入力してください。: ")
+                glob: str = input("ワイルドカードを入力してください。(例: *.txt): ").strip()
+                regex: str = input("正規表現を入力してください。: ").strip()
+                exts_s: str = input("拡張子をカンマ区切りで入力してください。(例: pdf,docx): ").strip()
+                min_size_s: str = input("最小サイズ(バイト)を入力してください。: ").strip()
+                max_size_s: str = input("最大サイズ(バイト)を入力してください。: ").strip()
+                min_mtime_s: str = input("更新日の開始(YYYY-MM-DD)を入力してください。: ").strip()
+                max_mtime_s: str = input("更新日の終了(YYYY-MM-DD)を入力してください。: ").strip()
+                obj_of_fq: FileQuery = FileQuery(
+                    pattern=pattern,
+                    glob=glob,
+                    regex=regex,
+                    exts=[ext for ext in exts_s.split(",") if ext.strip()],
+                    min_size=int(min_size_s) if min_size_s else None,
+                    max_size=int(max_size_s) if max_size_s else None,
+                    min_mtime=datetime.strptime(min_mtime_s, "%Y-%m-%d") if min_mtime_s else None,
+                    max_mtime=datetime.combine(datetime.strptime(max_mtime_s, "%Y-%m-%d").date(), time.max) if max_mtime_s else None,
+                )
+            except KeyboardInterrupt:
+                raise
+            except Exception as e:
+                print(f"error: \n{str(e)}")
+            else:
+                break
+            finally:
+                pass
+        return obj_of_fq
+
 
 def main() -> bool:
     """主要関数"""
@@ -92,10 +125,17 @@ def main() -> bool:
         try:
             obj_of_cls.folder_path = obj_with_cui._input_folder_path()
             obj_of_cls.recursive = obj_with_cui._input_bool("フォルダを再帰的に検索しますか？")
+            obj_of_cls.use_index = obj_with_cui._input_bool("インデックスを使って検索しますか？")
             obj_of_cls.search_directly_under_folder()
             if obj_with_cui._input_bool(f"{obj_of_cls.extract_by_pattern.__doc__} => 行いますか？"):
-                obj_of_cls.pattern = input("ファイルの検索パターンを入力してください。: ")
+                if obj_with_cui._input_bool("詳細な検索条件を指定しますか？"):
+                    obj_of_cls.obj_of_fq = obj_with_cui._input_query()
+                else:
+                    obj_of_cls.obj_of_fq = None
+                    obj_of_cls.pattern = input("ファイルの検索パターンを入力してください。: ")
                 obj_of_cls.extract_by_pattern()
+            if obj_with_cui._input_bool(f"{obj_of_cls.find_duplicates.__doc__} => 行いますか？"):
+                obj_of_cls.find_duplicates()
         except KeyboardInterrupt:
             sys.exit(0)
         except Exception as e:
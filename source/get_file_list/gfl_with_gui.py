@@ -2,21 +2,25 @@ import logging
 import platform
 import subprocess
 import sys
+from datetime import datetime
 from pathlib import Path
+from typing import Any
 
-from PySide6.QtCore import QObject, Signal
+from PySide6.QtCore import QAbstractTableModel, QModelIndex, QObject, Qt, QThread, Signal
 from PySide6.QtGui import QFont
 from PySide6.QtWidgets import (
     QApplication,
     QCheckBox,
     QFileDialog,
     QFormLayout,
+    QHeaderView,
     QLabel,
     QLineEdit,
     QMainWindow,
     QMessageBox,
     QPushButton,
     QScrollArea,
+    QTableView,
     QTextEdit,
     QVBoxLayout,
     QWidget,
@@ -26,6 +30,116 @@ from source.common.common import DatetimeTools, GUITools, LogTools, PlatformTool
 from source.get_file_list.gfl_class import GetFileList
 
 
+class FileTableModel(QAbstractTableModel):
+    """検索結果のファイルを表示するモデル(表示する行だけを描画します)"""
+
+    HEADERS: list = ["ファイルパス", "サイズ(バイト)", "更新日時"]
+
+    def __init__(self):
+        """初期化します"""
+        super().__init__()
+        # ファイルパス、サイズ、更新日時(ナノ秒)の行のリスト
+        self.lst_of_rows: list = []
+
+    def rowCount(self, parent: QModelIndex = QModelIndex()) -> int:
+        return 0 if parent.isValid() else len(self.lst_of_rows)
+
+    def columnCount(self, parent: QModelIndex = QModelIndex()) -> int:
+        return 0 if parent.isValid() else len(self.HEADERS)
+
+    def data(self, index: QModelIndex, role: int = Qt.ItemDataRole.DisplayRole) -> Any:
+        if not index.isValid() or role != Qt.ItemDataRole.DisplayRole:
+            return None
+        file_path, size, mtime_ns = self.lst_of_rows[index.row()]
+        match index.column():
+            case 0:
+                return file_path
+            case 1:
+                return f"{size:,}"
+            case 2:
+                return datetime.fromtimestamp(mtime_ns / 1_000_000_000).strftime("%Y-%m-%d %H:%M:%S")
+        return None
+
+    def headerData(self, section: int, orientation: Qt.Orientation, role: int = Qt.ItemDataRole.DisplayRole) -> Any:
+        if role == Qt.ItemDataRole.DisplayRole and orientation == Qt.Orientation.Horizontal:
+            return self.HEADERS[section]
+        return None
+
+    def append_rows(self, lst_of_rows: list):
+        """行を追加します"""
+        if not lst_of_rows:
+            return
+        first: int = len(self.lst_of_rows)
+        self.beginInsertRows(QModelIndex(), first, first + len(lst_of_rows) - 1)
+        self.lst_of_rows.extend(lst_of_rows)
+        self.endInsertRows()
+
+    def clear(self):
+        """行を全て削除します"""
+        self.beginResetModel()
+        self.lst_of_rows = []
+        self.endResetModel()
+
+
+class SearchWorker(QObject):
+    """ファイルを検索する処理のワーカー"""
+
+    batch: Signal = Signal(list)
+    finished: Signal = Signal(bool)
+    error: Signal = Signal(str)
+
+    def __init__(self, obj_of_cls: Any):
+        """初期化します"""
+        super().__init__()
+        self.obj_of_cls = obj_of_cls
+
+    def run(self):
+        """実行します"""
+        result: bool = False
+        try:
+            self.obj_of_cls.search_in_batches(self.batch.emit)
+        except Exception as e:
+            self.error.emit(f"error: \n{str(e)}")
+        else:
+            result = True
+        finally:
+            pass
+        self.finished.emit(result)
+
+    def cancel(self):
+        """キャンセルします"""
+        self.obj_of_cls.cancel = True
+
+
+class DuplicatesWorker(QObject):
+    """重複したファイルを検出する処理のワーカー"""
+
+    finished: Signal = Signal(bool)
+    error: Signal = Signal(str)
+
+    def __init__(self, obj_of_cls: Any):
+        """初期化します"""
+        super().__init__()
+        self.obj_of_cls = obj_of_cls
+
+    def run(self):
+        """実行します"""
+        result: bool = False
+        try:
+            result = self.obj_of_cls.find_duplicates()
+        except Exception as e:
+            self.error.emit(f"error: \n{str(e)}")
+        else:
+            pass
+        finally:
+            pass
+        self.finished.emit(result)
+
+    def cancel(self):
+        """キャンセルします"""
+        self.obj_of_cls.cancel = True
+
+
 class LogEmitter(QObject):
     """loggingの出力をQtのSignalに変換し、GUIスレッドへ安全にログを伝達するためのクラス"""
 
@@ -50,6 +164,8 @@ class MainApp_Of_GFL(QMainWindow):
         super().__init__()
         self.obj_of_lt: LogTools = LogTools()
         self.obj_of_cls: GetFileList = GetFileList(self.obj_of_lt.logger)
+        # 検索、または重複したファイルの検出の実行中かどうか
+        self.is_searching: bool = False
         self._setup_ui()
         self.obj_of_dt2: DatetimeTools = DatetimeTools()
         self.obj_of_pft: PlatformTools = PlatformTools()
@@ -57,6 +173,10 @@ class MainApp_Of_GFL(QMainWindow):
 
     def closeEvent(self, event):
         """終了します"""
+        if self.is_searching:
+            self.worker.cancel()
+            self.worker_thread.quit()
+            self.worker_thread.wait()
         if self.obj_of_lt:
             self._show_info(f"ログファイルは、\n{self.obj_of_lt.file_path_of_log}\nに出力されました。")
         for h in self.obj_of_lt.logger.handlers[:]:
@@ -139,6 +259,10 @@ class MainApp_Of_GFL(QMainWindow):
             recursive_checkbox: QCheckBox = QCheckBox("サブフォルダも含めて検索する（再帰的）")
             main_container_layout.addRow(recursive_checkbox)
             recursive_checkbox.toggled.connect(lambda *args, chckbx=recursive_checkbox: self._get_recursive(chckbx))
+            # インデックス
+            index_checkbox: QCheckBox = QCheckBox("インデックスを使って検索する")
+            main_container_layout.addRow(index_checkbox)
+            index_checkbox.toggled.connect(lambda *args, chckbx=index_checkbox: self._get_use_index(chckbx))
             # 検索パターン
             main_container_layout.addRow(QLabel("検索パターン:"))
             pattern_input: QLineEdit = QLineEdit()
@@ -149,6 +273,23 @@ class MainApp_Of_GFL(QMainWindow):
             search_btn: QPushButton = QPushButton("検索パターンで検索する")
             main_container_layout.addRow(search_btn)
             search_btn.clicked.connect(self.search_files)
+            cancel_btn: QPushButton = QPushButton("検索をキャンセルする")
+            main_container_layout.addRow(cancel_btn)
+            cancel_btn.clicked.connect(self.cancel_searching)
+            duplicates_btn: QPushButton = QPushButton("重複したファイルを検出する")
+            main_container_layout.addRow(duplicates_btn)
+            duplicates_btn.clicked.connect(self.find_duplicates)
+            # 検索結果
+            self.result_label: QLabel = QLabel("検索結果: 0件")
+            main_container_layout.addRow(self.result_label)
+            self.file_model: FileTableModel = FileTableModel()
+            self.result_view: QTableView = QTableView()
+            self.result_view.setModel(self.file_model)
+            # 行の高さを固定にして、大量の行でも再計算させない
+            self.result_view.verticalHeader().setSectionResizeMode(QHeaderView.ResizeMode.Fixed)
+            self.result_view.horizontalHeader().setSectionResizeMode(0, QHeaderView.ResizeMode.Stretch)
+            self.result_view.setMinimumHeight(300)
+            main_container_layout.addRow(self.result_view)
             # ログ
             self.log_area: QTextEdit = QTextEdit()
             self.log_area.setReadOnly(True)
@@ -166,7 +307,17 @@ class MainApp_Of_GFL(QMainWindow):
         """再帰的かどうかを取得します"""
         try:
             self.obj_of_cls.recursive = chckbx.isChecked()
-            self.obj_of_cls.search_directly_under_folder()
+        except Exception as e:
+            self._show_error(f"error: \n{str(e)}")
+        else:
+            pass
+        finally:
+            pass
+
+    def _get_use_index(self, chckbx: QCheckBox):
+        """インデックスを使うかどうかを取得します"""
+        try:
+            self.obj_of_cls.use_index = chckbx.isChecked()
         except Exception as e:
             self._show_error(f"error: \n{str(e)}")
         else:
@@ -193,7 +344,6 @@ class MainApp_Of_GFL(QMainWindow):
             folder_p: Path = Path(self.obj_of_cls.folder_path).expanduser()
             self.obj_of_cls.folder_path = str(folder_p)
             lbl.setText(self.obj_of_cls.folder_path)
-            self.obj_of_cls.search_directly_under_folder()
         except Exception as e:
             self._show_error(f"error: \n{str(e)}")
         else:
@@ -231,15 +381,90 @@ class MainApp_Of_GFL(QMainWindow):
                 raise Exception("フォルダを選択してください。")
             if self.obj_of_cls.pattern == "":
                 raise Exception("検索パターンを入力してください。")
-            self.obj_of_cls.extract_by_pattern()
+            if self.is_searching:
+                raise Exception("検索の実行中です。")
+            self.file_model.clear()
+            self.result_label.setText("検索結果: 0件")
+            # 検索は別スレッドで行い、結果をまとまりごとに受け取る
+            self.worker: SearchWorker = SearchWorker(self.obj_of_cls)
+            self.worker_thread: QThread = QThread()
+            self.worker.moveToThread(self.worker_thread)
+            self.worker_thread.started.connect(self.worker.run)
+            self.worker.batch.connect(self._add_results)
+            self.worker.error.connect(self._show_error)
+            self.worker.finished.connect(self.worker_thread.quit)
+            self.worker.finished.connect(self.worker.deleteLater)
+            self.worker_thread.finished.connect(self.worker_thread.deleteLater)
+            self.worker.finished.connect(self._finish_searching)
+            self.is_searching = True
+            self.worker_thread.start()
         except Exception as e:
             self._show_error(f"error: \n{str(e)}")
+            self._show_result(self.search_files.__doc__, result)
         else:
             result = True
         finally:
-            self._show_result(self.search_files.__doc__, result)
+            pass
         return result
 
+    def _add_results(self, lst_of_rows: list):
+        """検索結果を追加します"""
+        self.file_model.append_rows(lst_of_rows)
+        self.result_label.setText(f"検索結果: {self.file_model.rowCount():,}件")
+
+    def _finish_searching(self, success: bool):
+        """検索の終了を処理します"""
+        # スレッドの終了前に破棄されないように、参照は残しておく
+        self.is_searching = False
+        self._show_result_or_cancel(self.search_files.__doc__, success)
+
+    def cancel_searching(self):
+        """検索をキャンセルします"""
+        if self.is_searching:
+            self.worker.cancel()
+
+    def find_duplicates(self) -> bool:
+        """重複したファイルを検出します"""
+        result: bool = False
+        try:
+            if self.obj_of_cls.folder_path == "":
+                raise Exception("フォルダを選択してください。")
+            if self.is_searching:
+                raise Exception("検索の実行中です。")
+            # ハッシュ値の計算中も画面が固まらないように、別スレッドで実行する
+            self.worker: DuplicatesWorker = DuplicatesWorker(self.obj_of_cls)
+            self.worker_thread: QThread = QThread()
+            self.worker.moveToThread(self.worker_thread)
+            self.worker_thread.started.connect(self.worker.run)
+            self.worker.error.connect(self._show_error)
+            self.worker.finished.connect(self.worker_thread.quit)
+            self.worker.finished.connect(self.worker.deleteLater)
+            self.worker_thread.finished.connect(self.worker_thread.deleteLater)
+            self.worker.finished.connect(self._finish_finding_duplicates)
+            self.is_searching = True
+            self.worker_thread.start()
+        except Exception as e:
+            self._show_error(f"error: \n{str(e)}")
+            self._show_result(self.find_duplicates.__doc__, result)
+        else:
+            result = True
+        finally:
+            pass
+        return result
+
+    def _finish_finding_duplicates(self, success: bool):
+        """重複したファイルの検出の終了を処理します"""
+        # スレッドの終了前に破棄されないように、参照は残しておく
+        self.is_searching = False
+        self._show_result_or_cancel(self.find_duplicates.__doc__, success)
+
+    def _show_result_or_cancel(self, label: str | None, success: bool):
+        """キャンセルされた場合は失敗と区別して、結果を表示します"""
+        if self.obj_of_cls.cancel:
+            self._show_info(f"{label} => キャンセルしました。")
+        else:
+            self._show_result(label, success)
+
 
 def create_window() -> MainApp_Of_GFL:
     window: MainApp_Of_GFL = MainApp_Of_GFL()
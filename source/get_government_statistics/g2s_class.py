@@ -1,16 +1,27 @@
 import asyncio
 import csv
+import gzip
+import hashlib
 import io
 import json
-import shutil
+import os
+import random
+import re
+import sqlite3
 import sys
+import tempfile
+import time
+from collections import deque
+from contextlib import closing
+from datetime import datetime
 from logging import Logger
 from pathlib import Path
-from typing import Any, AsyncGenerator
+from typing import Any, AsyncGenerator, Callable, Iterable, Iterator
 from xml.etree import ElementTree
 
 import clipboard
 import httpx
+import numpy
 import pandas
 from pandas import DataFrame
 from tabulate import tabulate
@@ -18,6 +29,283 @@ from tabulate import tabulate
 from source.common.common import DatetimeTools
 
 
+class AsyncRateLimiter:
+    """リクエストの間隔を一定以上に保つように、待ち合わせます"""
+
+    def __init__(self, requests_per_second: float):
+        """初期化します"""
+        # リクエストの間隔(秒)
+        self.interval: float = 1.0 / requests_per_second if requests_per_second > 0 else 0.0
+        # 次にリクエストを送れる時刻
+        self.next_time: float = 0.0
+        self.lock: asyncio.Lock = asyncio.Lock()
+
+    async def wait(self):
+        """次にリクエストを送れるまで待ちます"""
+        async with self.lock:
+            now: float = asyncio.get_running_loop().time()
+            start_time: float = max(now, self.next_time)
+            self.next_time = start_time + self.interval
+        if start_time > now:
+            await asyncio.sleep(start_time - now)
+
+
+class ResponseCache:
+    """
+    APIの応答を圧縮してフォルダに保存します
+    有効期限内はそのまま使い、期限切れの場合はETagとLast-Modifiedで更新の有無を確認します
+    """
+
+    # キャッシュのキーに含めないパラメータ
+    IGNORED_PARAMS: tuple = ("appId",)
+    # 読み込むときのバッファサイズ
+    BUFFER_SIZE: int = 1024 * 1024
+    # 処理結果のSTATUSを取得する正規表現(XML、JSON、CSVの順)
+    PATTERNS_OF_STATUS: tuple = (
+        rb"<STATUS>\s*(\d+)\s*</STATUS>",
+        rb'"STATUS"\s*:\s*"?(\d+)',
+        rb'(?m)^"?STATUS"?,[^\r\n]*\r?\n"?(\d+)',
+    )
+    # 期限切れのキャッシュを残しておく期間(有効期限の倍数、更新の有無の確認に使います)
+    MAX_AGE_FACTOR: int = 7
+    # 古いキャッシュを削除する間隔(秒)
+    PRUNE_INTERVAL: float = 60 * 60
+
+    def __init__(self, folder_path: str, ttl: float):
+        """初期化します"""
+        self.folder_p: Path = Path(folder_path)
+        self.folder_p.mkdir(parents=True, exist_ok=True)
+        # 有効期限(秒)
+        self.ttl: float = ttl
+        # これより前に保存したキャッシュは削除します(秒)
+        self.max_age: float = ttl * self.MAX_AGE_FACTOR
+        # 最後に古いキャッシュを削除した時刻
+        self.last_pruned_at: float = 0.0
+
+    def _get_key(self, url: str, params: dict) -> str:
+        """URLとパラメータから、キャッシュのキーを作成します"""
+        dct_of_params: dict = {k: str(v) for k, v in params.items() if k not in self.IGNORED_PARAMS}
+        text: str = json.dumps({"url": url, "params": dct_of_params}, ensure_ascii=False, sort_keys=True)
+        return hashlib.sha256(text.encode("utf-8")).hexdigest()
+
+    def load(self, url: str, params: dict) -> dict | None:
+        """キャッシュの情報を読み込みます(ない場合は、Noneを返します)"""
+        key: str = self._get_key(url, params)
+        file_p_of_meta: Path = self.folder_p / f"{key}.json"
+        if not file_p_of_meta.exists() or not (self.folder_p / f"{key}.gz").exists():
+            return None
+        try:
+            meta: dict = json.loads(file_p_of_meta.read_text(encoding="utf-8"))
+        except (OSError, ValueError):
+            return None
+        meta["key"] = key
+        return meta
+
+    def is_fresh(self, meta: dict) -> bool:
+        """キャッシュが有効期限内かどうかを判定します"""
+        return time.time() - float(meta.get("stored_at", 0.0)) < self.ttl
+
+    def get_conditional_headers(self, meta: dict | None) -> dict:
+        """更新の有無を確認するためのリクエストヘッダーを作成します"""
+        headers: dict = {}
+        if meta is None:
+            return headers
+        if meta.get("etag"):
+            headers["If-None-Match"] = meta["etag"]
+        if meta.get("last_modified"):
+            headers["If-Modified-Since"] = meta["last_modified"]
+        return headers
+
+    def touch(self, meta: dict):
+        """更新されていなかったキャッシュの有効期限を延ばします"""
+        meta["stored_at"] = time.time()
+        self._write_meta(meta["key"], meta)
+
+    def iter_bytes(self, meta: dict) -> Iterator[bytes]:
+        """キャッシュの本体を少しずつ返します"""
+        with gzip.open(self.folder_p / f"{meta['key']}.gz", "rb") as f:
+            while chunk := f.read(self.BUFFER_SIZE):
+                yield chunk
+
+    def read_bytes(self, meta: dict) -> bytes:
+        """キャッシュの本体を読み込みます"""
+        return b"".join(self.iter_bytes(meta))
+
+    def _write_meta(self, key: str, meta: dict):
+        """キャッシュの情報を書き込みます"""
+        dct_of_meta: dict = {k: v for k, v in meta.items() if k != "key"}
+        file_p_of_tmp: Path = self._create_tmp_file(key, ".json.tmp")
+        file_p_of_tmp.write_text(json.dumps(dct_of_meta, ensure_ascii=False), encoding="utf-8")
+        os.replace(file_p_of_tmp, self.folder_p / f"{key}.json")
+
+    def _create_tmp_file(self, key: str, suffix: str) -> Path:
+        """同じキーを同時に書き込んでも重ならない、一時ファイルを作成します"""
+        with tempfile.NamedTemporaryFile(dir=self.folder_p, prefix=f"{key}.", suffix=suffix, delete=False) as f:
+            return Path(f.name)
+
+    def _get_status(self, head: bytes) -> int | None:
+        """応答の先頭から、APIの処理結果のSTATUSを取得します(見つからない場合は、Noneを返します)"""
+        for pattern in self.PATTERNS_OF_STATUS:
+            match: re.Match | None = re.search(pattern, head)
+            if match is not None:
+                return int(match.group(1))
+        return None
+
+    def _is_error(self, head: bytes) -> bool:
+        """応答の先頭から、APIのエラーかどうかを判定します(エラーはキャッシュしません)"""
+        status: int | None = self._get_status(head)
+        return status is not None and status >= 100
+
+    def prune(self) -> int:
+        """保存してから期間が経ちすぎたキャッシュと、書き込み途中で残ったファイルを削除します"""
+        self.last_pruned_at = time.time()
+        number_of_pruned: int = 0
+        for file_p in self.folder_p.iterdir():
+            try:
+                if file_p.name.endswith(".tmp"):
+                    # 書き込み中のファイルは消さないように、古いものだけを削除する
+                    if self.last_pruned_at - file_p.stat().st_mtime < self.max_age:
+                        continue
+                elif file_p.suffix == ".json":
+                    meta: dict = json.loads(file_p.read_text(encoding="utf-8"))
+                    if self.last_pruned_at - float(meta.get("stored_at", 0.0)) < self.max_age:
+                        continue
+                    (self.folder_p / f"{file_p.stem}.gz").unlink(missing_ok=True)
+                elif file_p.suffix == ".gz":
+                    # 情報のない本体は使われないため、削除する
+                    if (self.folder_p / f"{file_p.stem}.json").exists():
+                        continue
+                else:
+                    continue
+                file_p.unlink(missing_ok=True)
+                number_of_pruned += 1
+            except (OSError, ValueError):
+                continue
+        return number_of_pruned
+
+    def store(self, url: str, params: dict, headers: httpx.Headers, chunks: Iterable[bytes]) -> Iterator[bytes]:
+        """応答の本体を返しながら、キャッシュに書き込みます(最後まで読み込んだ場合だけ保存します)"""
+        key: str = self._get_key(url, params)
+        file_p_of_tmp: Path = self._create_tmp_file(key, ".gz.tmp")
+        completed: bool = False
+        head: bytes = b""
+        try:
+            with gzip.open(file_p_of_tmp, "wb", compresslevel=6) as f:
+                for chunk in chunks:
+                    if len(head) < 4096:
+                        head += chunk[: 4096 - len(head)]
+                    f.write(chunk)
+                    yield chunk
+            completed = not self._is_error(head)
+        finally:
+            if completed:
+                os.replace(file_p_of_tmp, self.folder_p / f"{key}.gz")
+                meta: dict = {
+                    "url": url,
+                    "params": {k: str(v) for k, v in params.items() if k not in self.IGNORED_PARAMS},
+                    "etag": headers.get("ETag", ""),
+                    "last_modified": headers.get("Last-Modified", ""),
+                    "stored_at": time.time(),
+                }
+                self._write_meta(key, meta)
+                if time.time() - self.last_pruned_at >= self.PRUNE_INTERVAL:
+                    self.prune()
+            else:
+                file_p_of_tmp.unlink(missing_ok=True)
+
+    def store_bytes(self, url: str, params: dict, headers: httpx.Headers, content: bytes):
+        """応答の本体をまとめて、キャッシュに書き込みます"""
+        for _ in self.store(url, params, headers, [content]):
+            pass
+
+
+class StatsDataIdsIndex:
+    """
+    統計表IDの一覧を、SQLiteの全文検索(FTS5のtrigram)のインデックスに保存します
+    3文字以上のキーワードはインデックスで、それより短いキーワードはLIKEで検索します
+    """
+
+    # trigramで検索できるキーワードの最小の文字数
+    MIN_LENGTH_OF_TRIGRAM: int = 3
+
+    def __init__(self, file_path: str):
+        """初期化します"""
+        self.file_path: str = file_path
+
+    def _connect(self, file_path: str) -> sqlite3.Connection:
+        """インデックスに接続します"""
+        return sqlite3.connect(file_path)
+
+    def get_signature(self) -> str:
+        """インデックスを作成したときの、統計表IDの一覧の状態を取得します(ない場合は、空文字を返します)"""
+        if not os.path.exists(self.file_path):
+            return ""
+        try:
+            with closing(self._connect(self.file_path)) as conn:
+                row: tuple | None = conn.execute("SELECT value FROM meta WHERE key = 'signature'").fetchone()
+        except sqlite3.Error:
+            return ""
+        return row[0] if row else ""
+
+    def build(self, rows: Iterable[tuple], signature: str) -> int:
+        """インデックスを作り直します(作成中も、以前のインデックスで検索できます)"""
+        file_path_of_tmp: str = f"{self.file_path}.tmp"
+        if os.path.exists(file_path_of_tmp):
+            os.remove(file_path_of_tmp)
+        try:
+            with closing(self._connect(file_path_of_tmp)) as conn, conn:
+                # 一覧は通常のテーブルに保存し、全文検索のインデックスはそれを参照する
+                conn.execute("CREATE TABLE ids (rowid INTEGER PRIMARY KEY, stats_data_id TEXT, stat_name TEXT, title TEXT)")
+                conn.execute(
+                    "CREATE VIRTUAL TABLE ids_fts USING fts5(stats_data_id, stat_name, title, "
+                    "content='ids', content_rowid='rowid', tokenize='trigram')"
+                )
+                conn.execute("CREATE TABLE meta (key TEXT PRIMARY KEY, value TEXT)")
+                conn.executemany("INSERT INTO ids (stats_data_id, stat_name, title) VALUES (?, ?, ?)", rows)
+                conn.execute("INSERT INTO ids_fts (ids_fts) VALUES ('rebuild')")
+                conn.execute("INSERT INTO meta (key, value) VALUES ('signature', ?)", (signature,))
+                number_of_rows: int = conn.execute("SELECT count(*) FROM ids").fetchone()[0]
+        except sqlite3.Error:
+            # 作成途中のファイルは残さない
+            os.remove(file_path_of_tmp)
+            raise
+        os.replace(file_path_of_tmp, self.file_path)
+        return number_of_rows
+
+    def _get_condition(self, keyword: str, match_type: str) -> tuple[str, list]:
+        """キーワードごとの検索条件を作成します"""
+        # 3文字以上の場合は、インデックスで候補を絞り込む
+        use_trigram: bool = len(keyword) >= self.MIN_LENGTH_OF_TRIGRAM
+        condition_of_index: str = "rowid IN (SELECT rowid FROM ids_fts WHERE ids_fts MATCH ?)"
+        phrase: str = '"' + keyword.replace('"', '""') + '"'
+        match match_type:
+            case "部分一致":
+                if use_trigram:
+                    return (condition_of_index, [phrase])
+                pattern: str = "%" + keyword.replace("\\", "\\\\").replace("%", "\\%").replace("_", "\\_") + "%"
+                return ("(stats_data_id LIKE ? ESCAPE '\\' OR stat_name LIKE ? ESCAPE '\\' OR title LIKE ? ESCAPE '\\')", [pattern] * 3)
+            case "完全一致":
+                condition: str = "(stats_data_id = ? OR stat_name = ? OR title = ?)"
+                if use_trigram:
+                    return (f"{condition_of_index} AND {condition}", [phrase] + [keyword] * 3)
+                return (condition, [keyword] * 3)
+            case _:
+                raise Exception("その検索方法はありません。")
+
+    def search(self, lst_of_keyword: list, match_type: str, logic_type: str) -> list:
+        """キーワードで検索して、一覧の順に行を返します"""
+        lst_of_conditions: list = []
+        lst_of_params: list = []
+        for keyword in lst_of_keyword:
+            condition, params = self._get_condition(str(keyword), match_type)
+            lst_of_conditions.append(condition)
+            lst_of_params.extend(params)
+        operator: str = " AND " if logic_type == "AND抽出" and len(lst_of_conditions) > 1 else " OR "
+        sql: str = f"SELECT stats_data_id, stat_name, title FROM ids WHERE {operator.join(lst_of_conditions)} ORDER BY rowid"
+        with closing(self._connect(self.file_path)) as conn:
+            return conn.execute(sql, lst_of_params).fetchall()
+
+
 class GetGovernmentStatistics:
     """政府の統計データを取得します"""
 
@@ -73,6 +361,24 @@ class GetGovernmentStatistics:
         self.header_of_ids_s: str = ",".join(self.header_of_ids_l)
         # APIのバージョン
         self.VERSION: float = 3.0
+        # APIのベースURL
+        self.BASE_URL: str = "http://api.e-stat.go.jp/rest"
+        # APIで1回に取得できる件数の上限
+        self.MAX_LIMIT: int = 100000
+        # 統計表IDの一覧を1回に取得する件数
+        self.limit_of_ids: int = 100
+        # 統計データを1回に取得する件数
+        self.limit_of_table: int = 100000
+        # 統計表IDの一覧を取得するときの同時リクエスト数
+        self.max_concurrency: int = 5
+        # 1秒あたりのリクエスト数の上限
+        self.requests_per_second: float = 10.0
+        # リトライの回数
+        self.max_retries: int = 3
+        # リトライの待ち時間の基準(秒)
+        self.backoff_factor: float = 0.5
+        # リトライするHTTPステータスコード
+        self.RETRY_STATUS_CODES: tuple = (429, 500, 502, 503, 504)
         # アプリケーションID
         self.APP_ID: str = ""
         # 統計表ID
@@ -85,14 +391,39 @@ class GetGovernmentStatistics:
         self.DATA_COUNT: int = 0
         # 指定の統計表のデータフレーム
         self.df: DataFrame = None
+        # 複数の統計表をまとめて取得した結果
+        self.df_of_summary: DataFrame | None = None
+        # API側で絞り込む分類の値(キーは分類のidか名称、値はコードか名称のリスト)
+        self.dct_of_filters: dict = {}
+        # API側で絞り込む分類の階層(キーは分類のidか名称、値は"2"や"1-3"などの階層)
+        self.dct_of_levels: dict = {}
+        # APIで1回に指定できるコードの数の上限
+        self.MAX_CODES: int = 100
+        # 読み込み済みの統計表IDの一覧のデータフレームと、読み込んだファイルの状態
+        self.df_of_ids: DataFrame | None = None
+        self.signature_of_ids: tuple = ()
         # 処理をキャンセルするかどうか
         self.cancel: bool = False
+        # APIの応答をキャッシュするかどうかと、その有効期限(秒)
+        self.use_cache: bool = True
+        self.cache_ttl: float = 24 * 60 * 60
+        # APIの応答のキャッシュのオブジェクト(古いキャッシュを削除する間隔を保つために、使い回します)
+        self.obj_of_rc: ResponseCache | None = None
         # exe化されている場合とそれ以外を切り分ける
         exe_path: Path = Path(sys.executable) if getattr(sys, "frozen", False) else Path(__file__)
         # 統計表IDの一覧のCSVファイルを格納するフォルダ
         self.folder_p_of_ids: Path = exe_path.parent / "__stats_data_ids__"
         self.folder_s_of_ids: str = str(self.folder_p_of_ids)
         self.log.info(f"統計表IDのリストを格納するフォルダ => {self.folder_s_of_ids}")
+        # 統計表IDの一覧のファイル名(1つの圧縮したCSVファイル)
+        self.file_name_of_ids: str = "list_of_stats_data_ids.csv.gz"
+        # 統計表IDの一覧を最後に同期した日時を記録するファイル名
+        self.file_name_of_sync_state: str = "sync_state_of_stats_data_ids.json"
+        # 統計表IDの一覧の全文検索のインデックスのファイル名
+        self.file_name_of_index_of_ids: str = "index_of_stats_data_ids.sqlite3"
+        # APIの応答のキャッシュを格納するフォルダ
+        self.folder_p_of_cache: Path = exe_path.parent / "__cache__"
+        self.log.info(f"APIの応答のキャッシュを格納するフォルダ => {self.folder_p_of_cache}")
         # 指定の統計表のCSVファイルを格納するフォルダ
         self.folder_p_of_table: Path = exe_path.parent / "__output__"
         self.folder_s_of_table: str = str(self.folder_p_of_table)
@@ -103,6 +434,9 @@ class GetGovernmentStatistics:
         page_dct: dict = {}
         try:
             root: ElementTree.Element[str] = ElementTree.fromstring(res.text)
+            status: str = (root.findtext(".//RESULT/STATUS") or "0").strip()
+            # 該当する統計表がない場合(STATUSが1)は、TABLE_INFがない
+            self._check_status(int(status) if status.isdigit() else 0, root.findtext(".//RESULT/ERROR_MSG") or "", "統計表IDの一覧")
             table_lst: list[ElementTree.Element[str]] = root.findall(".//TABLE_INF")
             for t in table_lst:
                 stat_id: str = (t.attrib.get("id", "") or "") if t is not None else ""
@@ -130,7 +464,14 @@ class GetGovernmentStatistics:
         page_dct: dict = {}
         try:
             data: Any = res.json()
-            table_data: Any = data["GET_STATS_LIST"]["DATALIST_INF"]["TABLE_INF"]
+            result: dict = data["GET_STATS_LIST"].get("RESULT", {})
+            # 該当する統計表がない場合(STATUSが1、または0件)は、TABLE_INFがない
+            if not self._check_status(int(result.get("STATUS", 0)), result.get("ERROR_MSG", ""), "統計表IDの一覧"):
+                return page_dct, 0
+            datalist_inf: dict = data["GET_STATS_LIST"]["DATALIST_INF"]
+            if "TABLE_INF" not in datalist_inf and str(datalist_inf.get("NUMBER")) == "0":
+                return page_dct, 0
+            table_data: Any = datalist_inf["TABLE_INF"]
             table_lst = [table_data] if isinstance(table_data, dict) else table_data
             for t in table_lst:
                 stat_id: str = t.get("@id", "")
@@ -168,6 +509,9 @@ class GetGovernmentStatistics:
                     start_idx = i + 1
                     break
             if start_idx == 0:
+                # 該当する統計表がない場合(STATUSが1)は、STAT_INFの行がない
+                if not self._check_status_of_csv(list(csv.reader(lines)), "統計表IDの一覧"):
+                    return page_dct, row_count
                 raise Exception("CSVファイルにヘッダー行が見つかりません。")
             csv_text: str = "\n".join(lines[start_idx:])
             reader: csv.DictReader[str] = csv.DictReader(io.StringIO(csv_text))
@@ -191,8 +535,131 @@ class GetGovernmentStatistics:
             pass
         return page_dct, row_count
 
-    async def _get_stats_data_ids_with_async(self) -> AsyncGenerator[dict, None]:
+    def _check_status(self, status: int, error_msg: str, label: str = "統計データ") -> bool:
+        """APIの処理結果を確認します(該当するデータがない場合は、Falseを返します)"""
+        if status >= 100:
+            raise Exception(f"{label}を取得できませんでした。 => {error_msg or status}")
+        # 1は、正常に終了したが該当するデータがないことを表す
+        return status != 1
+
+    def _get_value_of_csv(self, lst_of_rows: list, name: str) -> str:
+        """CSVの見出しの次の行から、値を取得します(ない場合は、空文字を返します)"""
+        for j, row in enumerate(lst_of_rows[:-1]):
+            if name in row and row.index(name) < len(lst_of_rows[j + 1]):
+                return lst_of_rows[j + 1][row.index(name)]
+        return ""
+
+    def _check_status_of_csv(self, lst_of_rows: list, label: str = "統計データ") -> bool:
+        """CSVの処理結果を確認します(該当するデータがない場合は、Falseを返します)"""
+        status: str = self._get_value_of_csv(lst_of_rows, "STATUS")
+        return self._check_status(int(status) if status.isdigit() else 0, self._get_value_of_csv(lst_of_rows, "ERROR_MSG"), label)
+
+    def _check_limit(self, limit: int) -> int:
+        """1回に取得する件数を確認します"""
+        if not 1 <= limit <= self.MAX_LIMIT:
+            raise Exception(f"1回に取得する件数は、1から{self.MAX_LIMIT}までにしてください。")
+        return limit
+
+    def _get_total_number(self, res: httpx.Response, data_type: str) -> int | None:
+        """統計表IDの一覧の総件数を取得します(取得できない場合は、Noneを返します)"""
+        total: int | None = None
+        try:
+            match data_type:
+                case "xml":
+                    element_of_number: ElementTree.Element | None = ElementTree.fromstring(res.text).find(".//DATALIST_INF/NUMBER")
+                    if element_of_number is not None and element_of_number.text:
+                        total = int(element_of_number.text)
+                case "json":
+                    total = int(res.json()["GET_STATS_LIST"]["DATALIST_INF"]["NUMBER"])
+                case "csv":
+                    # "NUMBER"の見出しの次の行から取得する
+                    lst_of_rows: list = list(csv.reader(io.StringIO(res.text)))
+                    for i, row in enumerate(lst_of_rows[:-1]):
+                        if "STAT_INF" in row:
+                            break
+                        if "NUMBER" in row:
+                            total = int(lst_of_rows[i + 1][row.index("NUMBER")])
+                            break
+        except (KeyError, TypeError, ValueError, IndexError, ElementTree.ParseError):
+            total = None
+        return total
+
+    def _get_cache(self) -> ResponseCache | None:
+        """APIの応答のキャッシュを取得します(使わない場合は、Noneを返します)"""
+        if not self.use_cache:
+            return None
+        if self.obj_of_rc is None or self.obj_of_rc.folder_p != Path(self.folder_p_of_cache) or self.obj_of_rc.ttl != self.cache_ttl:
+            self.obj_of_rc = ResponseCache(str(self.folder_p_of_cache), self.cache_ttl)
+        return self.obj_of_rc
+
+    def _response_from_cache(self, obj_of_rc: ResponseCache, meta: dict, url: str, params: dict) -> httpx.Response:
+        """キャッシュから応答を作成します"""
+        res: httpx.Response = httpx.Response(200, content=obj_of_rc.read_bytes(meta), request=httpx.Request("GET", url, params=params))
+        res.encoding = "utf-8"
+        return res
+
+    def _iter_bytes_with_cache(self, client: httpx.Client, url: str, params: dict) -> Iterator[bytes]:
+        """APIの応答の本体を少しずつ返します(キャッシュがある場合は、キャッシュから返します)"""
+        obj_of_rc: ResponseCache | None = self._get_cache()
+        meta: dict | None = obj_of_rc.load(url, params) if obj_of_rc is not None else None
+        if obj_of_rc is not None and meta is not None and obj_of_rc.is_fresh(meta):
+            self.log.info("キャッシュから取得しました。")
+            yield from obj_of_rc.iter_bytes(meta)
+            return
+        headers: dict = obj_of_rc.get_conditional_headers(meta) if obj_of_rc is not None else {}
+        with client.stream("GET", url, params=params, headers=headers) as res:
+            if obj_of_rc is not None and meta is not None and res.status_code == 304:
+                # 更新されていない場合は、キャッシュを使う
+                self.log.info("更新されていないため、キャッシュから取得しました。")
+                obj_of_rc.touch(meta)
+                yield from obj_of_rc.iter_bytes(meta)
+                return
+            res.raise_for_status()
+            if obj_of_rc is None:
+                yield from res.iter_bytes()
+            else:
+                yield from obj_of_rc.store(url, params, res.headers, res.iter_bytes())
+
+    async def _get_with_retry(
+        self, client: httpx.AsyncClient, url: str, params: dict, obj_of_rl: AsyncRateLimiter, use_cache: bool = True
+    ) -> httpx.Response:
+        """一時的なエラーの場合は、待ち時間を延ばしながらリトライします(キャッシュがある場合は、キャッシュを使います)"""
+        obj_of_rc: ResponseCache | None = self._get_cache() if use_cache else None
+        meta: dict | None = obj_of_rc.load(url, params) if obj_of_rc is not None else None
+        if obj_of_rc is not None and meta is not None and obj_of_rc.is_fresh(meta):
+            return self._response_from_cache(obj_of_rc, meta, url, params)
+        headers: dict = obj_of_rc.get_conditional_headers(meta) if obj_of_rc is not None else {}
+        attempt: int = 0
+        while True:
+            await obj_of_rl.wait()
+            delay: float = self.backoff_factor * (2**attempt) * (1 + random.random())
+            try:
+                res: httpx.Response = await client.get(url, params=params, headers=headers)
+                if obj_of_rc is not None and meta is not None and res.status_code == 304:
+                    # 更新されていない場合は、キャッシュを使う
+                    obj_of_rc.touch(meta)
+                    return self._response_from_cache(obj_of_rc, meta, url, params)
+                if res.status_code in self.RETRY_STATUS_CODES and attempt < self.max_retries:
+                    retry_after: str = res.headers.get("Retry-After", "")
+                    if retry_after.isdigit():
+                        delay = float(retry_after)
+                    self.log.warning(f"HTTP {res.status_code} => {delay:.1f}秒後にリトライします。({attempt + 1}/{self.max_retries})")
+                else:
+                    res.encoding = "utf-8"
+                    res.raise_for_status()
+                    if obj_of_rc is not None:
+                        obj_of_rc.store_bytes(url, params, res.headers, res.content)
+                    return res
+            except httpx.RequestError as e:
+                if attempt >= self.max_retries:
+                    raise
+                self.log.warning(f"{type(e).__name__} => {delay:.1f}秒後にリトライします。({attempt + 1}/{self.max_retries})")
+            await asyncio.sleep(delay)
+            attempt += 1
+
+    async def _get_stats_data_ids_with_async(self, dct_of_extra_params: dict | None = None, use_cache: bool = True) -> AsyncGenerator[dict, None]:
         """ページを取得します(非同期版)"""
+        pending: deque = deque()
         try:
             parser_map: dict = {
                 "xml": self._parser_xml,
@@ -201,9 +668,9 @@ class GetGovernmentStatistics:
             }
             # 統計表IDの一覧のURL
             dct_of_ids_url: dict = {
-                "xml": f"http://api.e-stat.go.jp/rest/{self.VERSION}/app/getStatsList",
-                "json": f"http://api.e-stat.go.jp/rest/{self.VERSION}/app/json/getStatsList",
-                "csv": f"http://api.e-stat.go.jp/rest/{self.VERSION}/app/getSimpleStatsList",
+                "xml": f"{self.BASE_URL}/{self.VERSION}/app/getStatsList",
+                "json": f"{self.BASE_URL}/{self.VERSION}/app/json/getStatsList",
+                "csv": f"{self.BASE_URL}/{self.VERSION}/app/getSimpleStatsList",
             }
             data_type: str = self.lst_of_data_type[self.KEY]
             parser: Any = parser_map.get(data_type)
@@ -211,23 +678,59 @@ class GetGovernmentStatistics:
                 raise Exception("データタイプが対応していません")
             url: str = dct_of_ids_url[data_type]
             start: int = 1
-            limit: int = 100
-            async with httpx.AsyncClient(timeout=120.0) as client:
-                while True:
-                    params: dict = {
-                        "appId": self.APP_ID,
-                        "lang": "J",
-                        "limit": limit,
-                        "startPosition": start,
-                    }
-                    res: httpx.Response = await client.get(url, params=params)
-                    res.encoding = "utf-8"
-                    res.raise_for_status()
-                    page_dct, count = parser(res)
+            limit: int = self._check_limit(self.limit_of_ids)
+            obj_of_rl: AsyncRateLimiter = AsyncRateLimiter(self.requests_per_second)
+            semaphore: asyncio.Semaphore = asyncio.Semaphore(self.max_concurrency)
+            limits: httpx.Limits = httpx.Limits(max_connections=self.max_concurrency, max_keepalive_connections=self.max_concurrency)
+            async with httpx.AsyncClient(timeout=120.0, limits=limits) as client:
+
+                async def _get_page(start_position: int) -> tuple:
+                    """指定の位置からページを取得して、解析します"""
+                    async with semaphore:
+                        params: dict = {
+                            "appId": self.APP_ID,
+                            "lang": "J",
+                            "limit": limit,
+                            "startPosition": start_position,
+                            **(dct_of_extra_params or {}),
+                        }
+                        res: httpx.Response = await self._get_with_retry(client, url, params, obj_of_rl, use_cache)
+                        page_dct, count = parser(res)
+                        return (page_dct, count, res)
+
+                # 1ページ目から総件数を取得する
+                page_dct, count, res = await _get_page(start)
+                if count == 0:
+                    return
+                yield page_dct
+                total: int | None = self._get_total_number(res, data_type)
+                if total is None:
+                    # 総件数が分からない場合は、空のページまで順番に取得する
+                    self.log.warning("総件数を取得できませんでした。ページを順番に取得します。")
+                    while not self.cancel:
+                        start += limit
+                        page_dct, count, _ = await _get_page(start)
+                        if count == 0:
+                            break
+                        yield page_dct
+                    return
+                self.log.info(f"統計表IDの総件数 => {total}件")
+                # 残りのページを同時に取得し、取得を始めた順に返す
+                lst_of_starts: list = list(range(start + limit, total + 1, limit))
+                window: int = self.max_concurrency * 2
+                index: int = 0
+                while index < len(lst_of_starts) and len(pending) < window:
+                    pending.append(asyncio.create_task(_get_page(lst_of_starts[index])))
+                    index += 1
+                while pending and not self.cancel:
+                    page_dct, count, _ = await pending.popleft()
+                    if index < len(lst_of_starts):
+                        pending.append(asyncio.create_task(_get_page(lst_of_starts[index])))
+                        index += 1
                     if count == 0:
+                        # 取得中に総件数が減った場合
                         break
                     yield page_dct
-                    start += limit
         except asyncio.CancelledError:
             raise
         except httpx.HTTPStatusError:
@@ -239,7 +742,11 @@ class GetGovernmentStatistics:
         else:
             pass
         finally:
-            pass
+            # 途中で終了した場合は、取得中のページを取り消す
+            for task in pending:
+                task.cancel()
+            if pending:
+                await asyncio.gather(*pending, return_exceptions=True)
 
     async def write_stats_data_ids_to_file(self, chunk_size: int = 100) -> bool:
         """統計表IDの一覧をCSVファイルに書き出す"""
@@ -262,12 +769,11 @@ class GetGovernmentStatistics:
             self.cancel = False
         return result
 
-    def _common_process_for_writing_stats_data_ids_to_file(self, file_index: int, buffer: list) -> bool:
+    def _common_process_for_writing_stats_data_ids_to_file(self, f: Any, buffer: list) -> bool:
         """ファイルに書き出す処理(同期版と非同期版で共通)"""
         result: bool = False
         try:
-            file_p_of_ids = self.folder_p_of_ids / f"list_of_stats_data_ids_{file_index}.csv"
-            file_p_of_ids.write_text("\n".join(buffer), encoding="utf-8")
+            f.write("".join(f"{line}\n" for line in buffer))
         except asyncio.CancelledError:
             raise
         except KeyboardInterrupt:
@@ -280,37 +786,154 @@ class GetGovernmentStatistics:
             pass
         return result
 
+    def _format_line_of_ids(self, stat_id: str, info: dict) -> str:
+        """統計表IDの一覧の1行を作成します"""
+        col2: str = info.get("stat_name", info.get("statistics_name", ""))
+        col3: str = info.get("title", "")
+        if col3:
+            # データクレンジング
+            col3 = col3.replace("\u002c", "\u3001").replace("\uff0c", "\u3001")
+        return f"{stat_id},{col2},{col3}"
+
+    def _replace_file_of_ids(self, file_p_of_tmp: Path):
+        """書き出した一時ファイルで、統計表IDの一覧を置き換えます"""
+        os.replace(file_p_of_tmp, self.folder_p_of_ids / self.file_name_of_ids)
+        # 以前の形式(100件ごとのCSVファイル)の一覧を削除する
+        for e in self.folder_p_of_ids.glob("list_of_stats_data_ids_*.csv"):
+            e.unlink()
+
+    def _load_sync_state(self) -> dict:
+        """統計表IDの一覧を最後に同期した状態を読み込みます(ない場合は、空の辞書を返します)"""
+        file_p_of_state: Path = self.folder_p_of_ids / self.file_name_of_sync_state
+        if not file_p_of_state.exists() or not (self.folder_p_of_ids / self.file_name_of_ids).exists():
+            return {}
+        try:
+            return json.loads(file_p_of_state.read_text(encoding="utf-8"))
+        except (OSError, ValueError):
+            return {}
+
+    def _save_sync_state(self, started_at: datetime):
+        """統計表IDの一覧を同期した状態を記録します"""
+        state: dict = {"last_synced_at": started_at.isoformat(timespec="seconds"), "data_type": self.lst_of_data_type[self.KEY]}
+        file_p_of_tmp: Path = self.folder_p_of_ids / f"{self.file_name_of_sync_state}.tmp"
+        file_p_of_tmp.write_text(json.dumps(state, ensure_ascii=False), encoding="utf-8")
+        os.replace(file_p_of_tmp, self.folder_p_of_ids / self.file_name_of_sync_state)
+
+    async def sync_stats_data_ids(self) -> bool:
+        """前回の同期以降に更新された統計表IDだけを取得して、一覧に反映します"""
+        result: bool = False
+        try:
+            state: dict = self._load_sync_state()
+            if not state:
+                self.log.info("前回の同期の記録がないため、統計表IDの一覧の全件を取得します。")
+                await self._write_stats_data_ids_to_file_with_async()
+            else:
+                await self._merge_updated_stats_data_ids(datetime.fromisoformat(state["last_synced_at"]))
+        except asyncio.CancelledError:
+            raise
+        except httpx.HTTPStatusError:
+            raise
+        except httpx.RequestError:
+            raise
+        except KeyboardInterrupt:
+            raise
+        except Exception:
+            raise
+        else:
+            result = True
+        finally:
+            self.cancel = False
+        return result
+
+    async def _merge_updated_stats_data_ids(self, last_synced_at: datetime) -> bool:
+        """更新された統計表IDを、統計表IDの一覧に反映します"""
+        result: bool = False
+        file_p_of_tmp: Path = self.folder_p_of_ids / f"{self.file_name_of_ids}.tmp"
+        started_at: datetime = datetime.now()
+        try:
+            self.log.info(f"{self._merge_updated_stats_data_ids.__doc__} => 処理中...")
+            # 前回の同期を始めた日から今日までに、更新された統計表(日単位で指定する)
+            from_s: str = last_synced_at.strftime("%Y%m%d")
+            to_s: str = started_at.strftime("%Y%m%d")
+            dct_of_params: dict = {"updatedDate": from_s if from_s == to_s else f"{from_s}-{to_s}"}
+            self.log.info(f"更新日付 => {dct_of_params['updatedDate']}")
+            dct_of_updated: dict = {}
+            # 今日の更新分は変わるため、キャッシュを使わない
+            async for page in self._get_stats_data_ids_with_async(dct_of_params, use_cache=False):
+                for stat_id, info in page.items():
+                    dct_of_updated[stat_id] = self._format_line_of_ids(stat_id, info)
+                if self.cancel:
+                    break
+            if not self.cancel and not dct_of_updated:
+                # 更新がない日(休日など)は、一覧を書き換えずに同期した日時だけを記録する
+                self.log.info("更新された統計表はありませんでした。")
+                self._save_sync_state(started_at)
+            elif not self.cancel:
+                # 更新された統計表は置き換え、新しい統計表は末尾に追加する(削除された統計表は、全件の取得で反映する)
+                number_of_updated: int = 0
+                with gzip.open(file_p_of_tmp, "wt", encoding="utf-8", newline="") as f:
+                    f.write(f"{self.header_of_ids_s}\n")
+                    for line in self._iter_lines_of_ids(self._get_files_of_ids()):
+                        new_line: str | None = dct_of_updated.pop(line.split(",", 1)[0], None)
+                        if new_line is not None:
+                            number_of_updated += 1
+                        f.write(f"{line if new_line is None else new_line}\n")
+                    for line in dct_of_updated.values():
+                        f.write(f"{line}\n")
+                self._replace_file_of_ids(file_p_of_tmp)
+                self.log.info(f"更新された統計表 => {number_of_updated}件、新しい統計表 => {len(dct_of_updated)}件")
+                self.build_index_of_ids()
+                self._save_sync_state(started_at)
+        except asyncio.CancelledError:
+            self.cancel = True
+            raise
+        except httpx.HTTPStatusError:
+            raise
+        except httpx.RequestError:
+            raise
+        except Exception:
+            raise
+        else:
+            result = True
+        finally:
+            file_p_of_tmp.unlink(missing_ok=True)
+            if self.cancel:
+                self.log.warning(f"{self._merge_updated_stats_data_ids.__doc__} => 中止しました。")
+            elif result:
+                self.log.info(f"{self._merge_updated_stats_data_ids.__doc__} => 成功しました。")
+            else:
+                self.log.error(f"{self._merge_updated_stats_data_ids.__doc__} => 失敗しました。")
+        return result
+
     async def _write_stats_data_ids_to_file_with_async(self, chunk_size: int = 100) -> bool:
         """統計表IDの一覧をCSVファイルに書き出す(非同期版)"""
         result: bool = False
+        file_p_of_tmp: Path = self.folder_p_of_ids / f"{self.file_name_of_ids}.tmp"
+        # 取得を始めた日時(取得中に更新された統計表は、次回の同期で取得する)
+        started_at: datetime = datetime.now()
         try:
             self.log.info(f"{self._write_stats_data_ids_to_file_with_async.__doc__} => 処理中...")
             self.folder_p_of_ids.mkdir(parents=True, exist_ok=True)
-            # フォルダの中を空にする
-            for e in self.folder_p_of_ids.iterdir():
-                if e.is_dir():
-                    shutil.rmtree(e)
-                else:
-                    e.unlink()
-            buffer: list = [self.header_of_ids_s]
-            file_index: int = 1
-            async for page in self._get_stats_data_ids_with_async():
-                for stat_id, info in page.items():
-                    col2: str = info.get("stat_name", info.get("statistics_name", ""))
-                    col3: str = info.get("title", "")
-                    if col3:
-                        # データクレンジング
-                        col3 = col3.replace("\u002c", "\u3001").replace("\uff0c", "\u3001")
-                    buffer.append(f"{stat_id},{col2},{col3}")
-                    if len(buffer) >= chunk_size:
-                        self._common_process_for_writing_stats_data_ids_to_file(file_index, buffer)
-                        buffer.clear()
-                        buffer.append(self.header_of_ids_s)
-                        file_index += 1
-                if self.cancel:
-                    break
-            if len(buffer) > 1:
-                self._common_process_for_writing_stats_data_ids_to_file(file_index, buffer)
+            # 一時ファイルに少しずつ書き出し、書き終えてから置き換える(書き出し中も、以前の一覧を読み込める)
+            with gzip.open(file_p_of_tmp, "wt", encoding="utf-8", newline="") as f:
+                buffer: list = [self.header_of_ids_s]
+                # 同期の基準の日時より古いページが混ざらないように、キャッシュを使わない
+                async for page in self._get_stats_data_ids_with_async(use_cache=False):
+                    for stat_id, info in page.items():
+                        buffer.append(self._format_line_of_ids(stat_id, info))
+                        if len(buffer) >= chunk_size:
+                            self._common_process_for_writing_stats_data_ids_to_file(f, buffer)
+                            buffer.clear()
+                    if self.cancel:
+                        break
+                if buffer:
+                    self._common_process_for_writing_stats_data_ids_to_file(f, buffer)
+            if not self.cancel:
+                # 中止した場合は、途中までの一覧で置き換えずに以前の一覧を残す
+                self._replace_file_of_ids(file_p_of_tmp)
+                # 書き出した一覧から、全文検索のインデックスを作成する
+                self.build_index_of_ids()
+                self._save_sync_state(started_at)
         except asyncio.CancelledError:
             self.cancel = True
             raise
@@ -323,6 +946,7 @@ class GetGovernmentStatistics:
         else:
             result = True
         finally:
+            file_p_of_tmp.unlink(missing_ok=True)
             if self.cancel:
                 self.log.warning(f"{self._write_stats_data_ids_to_file_with_async.__doc__} => 中止しました。")
             elif result:
@@ -331,194 +955,429 @@ class GetGovernmentStatistics:
                 self.log.error(f"{self._write_stats_data_ids_to_file_with_async.__doc__} => 失敗しました。")
         return result
 
+    def _append_row(self, dct_of_columns: dict, row: dict, number_of_rows: int):
+        """行の値を列ごとのリストに追加します(値がない列は、Noneでそろえます)"""
+        for key, value in row.items():
+            if key not in dct_of_columns:
+                dct_of_columns[key] = [None] * number_of_rows
+            # 次元のコードは種類が少ないため、同じ文字列を共有してメモリを節約する
+            dct_of_columns[key].append(value if key == "値" or not isinstance(value, str) else sys.intern(value))
+        if len(row) < len(dct_of_columns):
+            for lst_of_values in dct_of_columns.values():
+                if len(lst_of_values) <= number_of_rows:
+                    lst_of_values.append(None)
+
+    def _to_categorical(self, lst_of_codes: list, code_map: dict) -> pandas.Categorical:
+        """コードの列を、CLASS_OBJの名称をカテゴリーとするカテゴリー型に変換します"""
+        # コードを整数に変換する(欠損値は-1になる)
+        codes, uniques = pandas.factorize(pandas.Series(lst_of_codes, dtype=object))
+        # カテゴリーはCLASS_OBJの順にし、対応表にないコードは末尾に加える
+        lst_of_names: list = list(dict.fromkeys(code_map.values()))
+        set_of_names: set = set(lst_of_names)
+        lst_of_names.extend(u for u in dict.fromkeys(uniques) if u not in code_map and u not in set_of_names)
+        dct_of_positions: dict = {name: i for i, name in enumerate(lst_of_names)}
+        # 末尾の-1は、欠損値のコード(-1)の参照先
+        lookup: numpy.ndarray = numpy.array([dct_of_positions[code_map.get(u, u)] for u in uniques] + [-1], dtype=numpy.int64)
+        return pandas.Categorical.from_codes(lookup[codes], categories=lst_of_names)
+
+    def _build_stats_data_df(self, dct_of_columns: dict, mapping: dict, id2name: dict) -> DataFrame:
+        """列ごとのリストから、次元をカテゴリー型、値をfloat64型とするデータフレームを作成します"""
+        dct_of_series: dict = {}
+        for key, lst_of_values in dct_of_columns.items():
+            if key == "値":
+                dct_of_series[key] = pandas.to_numeric(pandas.Series(lst_of_values, dtype=object), errors="coerce").astype("float64")
+            elif key in mapping:
+                dct_of_series[key] = self._to_categorical(lst_of_values, mapping[key])
+            else:
+                dct_of_series[key] = pandas.Categorical(lst_of_values)
+        df: DataFrame = pandas.DataFrame(dct_of_series)
+        # 列名を日本語に変換する
+        df.rename(columns={**id2name, "unit": "単位"}, inplace=True)
+        return df
+
+    def _parse_stats_data_xml(self, chunks: Iterable[bytes]) -> tuple[DataFrame, str]:
+        """統計データのXMLを少しずつ解析して、列ごとのデータを作成します"""
+        parser: ElementTree.XMLPullParser = ElementTree.XMLPullParser(events=("start", "end"))
+        # CLASS_OBJのidごとの、コードと名称の対応表
+        mapping: dict = {}
+        # CLASS_OBJのidと名称の対応表
+        id2name: dict = {}
+        # 列名ごとの値のリスト
+        dct_of_columns: dict = {}
+        number_of_rows: int = 0
+        next_key: str = ""
+        # 処理結果
+        status: int = 0
+        error_msg: str = ""
+        # 解析済みのVALUEを削除するための親要素
+        parent_of_values: ElementTree.Element | None = None
+
+        def _handle_events():
+            nonlocal number_of_rows, next_key, status, error_msg, parent_of_values
+            for event, element in parser.read_events():
+                if event == "start":
+                    if element.tag == "DATA_INF":
+                        parent_of_values = element
+                    continue
+                match element.tag:
+                    case "VALUE":
+                        row: dict = dict(element.attrib)
+                        row["値"] = (element.text or "").strip()
+                        self._append_row(dct_of_columns, row, number_of_rows)
+                        number_of_rows += 1
+                        # 解析済みの要素を削除して、メモリを解放する
+                        if parent_of_values is not None:
+                            parent_of_values.clear()
+                    case "CLASS_OBJ":
+                        obj_id: str = element.attrib["id"]
+                        # codeをキー、nameを値とする辞書を作成する
+                        mapping[obj_id] = {cls.attrib["code"]: cls.attrib.get("name", cls.attrib["code"]) for cls in element.findall("CLASS")}
+                        id2name[obj_id] = element.attrib.get("name", obj_id)
+                        element.clear()
+                    case "NEXT_KEY":
+                        next_key = element.text or ""
+                    case "STATUS":
+                        status = int((element.text or "0").strip())
+                    case "ERROR_MSG":
+                        error_msg = element.text or ""
+                    case "RESULT":
+                        # エラーの場合は、残りを受信せずに中断する
+                        self._check_status(status, error_msg)
+
+        for chunk in chunks:
+            parser.feed(chunk)
+            _handle_events()
+        parser.close()
+        _handle_events()
+        if not self._check_status(status, error_msg):
+            return (pandas.DataFrame(), "")
+        # コードを名称のカテゴリーに変換する(対応表にないコードは、そのまま残す)
+        df: DataFrame = self._build_stats_data_df(dct_of_columns, mapping, id2name)
+        return (df, next_key)
+
+    def _concat_pages(self, lst_of_df: list) -> DataFrame:
+        """ページごとのデータフレームを、カテゴリー型を保ったまま結合します"""
+        if len(lst_of_df) == 1:
+            return lst_of_df[0]
+        for column in lst_of_df[0].columns:
+            if isinstance(lst_of_df[0][column].dtype, pandas.CategoricalDtype):
+                # カテゴリーをそろえないと、結合時に文字列に戻ってしまう
+                lst_of_categories: list = list(dict.fromkeys(c for df in lst_of_df if column in df.columns for c in df[column].cat.categories))
+                for df in lst_of_df:
+                    if column in df.columns:
+                        df[column] = df[column].cat.set_categories(lst_of_categories)
+        return pandas.concat(lst_of_df, ignore_index=True)
+
+    def _get_params_of_table(self, stats_data_id: str) -> dict:
+        """統計表を取得するAPIのURLのパラメータを取得します"""
+        params: dict = {
+            "appId": self.APP_ID,  # アプリケーションID
+            "statsDataId": stats_data_id,  # 統計表ID
+            "lang": "J",  # 言語
+            "limit": self._check_limit(self.limit_of_table),  # 1回に取得する件数
+            "metaGetFlg": "Y",  # メタ情報の取得フラグ
+            "cntGetFlg": "N",  # 件数の取得フラグ
+            "explanationGetFlg": "N",  # 解説情報の有無フラグ
+            "annotationGetFlg": "N",  # 注釈情報の有無フラグ
+            "sectionHeaderFlg": 1,  # 見出し行の有無フラグ
+            "replaceSpChars": 0,  # 特殊文字のエスケープフラグ
+        }
+        return params
+
+    def set_filters(self, text: str) -> bool:
+        """API側で絞り込む条件を設定します(1行につき「分類=値1,値2」か「lv分類=階層」)"""
+        result: bool = False
+        try:
+            dct_of_filters: dict = {}
+            dct_of_levels: dict = {}
+            for line in text.splitlines():
+                line = line.strip()
+                if line == "":
+                    continue
+                if "=" not in line:
+                    raise Exception(f"「分類=値」の形式で入力してください。 => {line}")
+                key, value = (s.strip() for s in line.split("=", 1))
+                if key == "" or value == "":
+                    raise Exception(f"分類と値を入力してください。 => {line}")
+                if key.startswith("lv"):
+                    if not re.fullmatch(r"\d+(-\d*)?|-\d+", value):
+                        raise Exception(f"階層は「2」や「1-3」の形式で入力してください。 => {line}")
+                    dct_of_levels[key[2:]] = value
+                else:
+                    dct_of_filters.setdefault(key, []).extend(v.strip() for v in value.split(",") if v.strip() != "")
+            self.dct_of_filters = dct_of_filters
+            self.dct_of_levels = dct_of_levels
+        except Exception:
+            raise
+        else:
+            result = True
+        finally:
+            pass
+        return result
+
+    def _get_params_of_meta_info(self, stats_data_id: str) -> tuple[str, dict]:
+        """メタ情報を取得するAPIのURLとパラメータを取得します"""
+        url: str = f"{self.BASE_URL}/{self.VERSION}/app/json/getMetaInfo"
+        params: dict = {
+            "appId": self.APP_ID,  # アプリケーションID
+            "statsDataId": stats_data_id,  # 統計表ID
+            "lang": "J",  # 言語
+            "explanationGetFlg": "N",  # 解説情報の有無フラグ
+        }
+        return (url, params)
+
+    def _parse_meta_info_json(self, text: str) -> dict:
+        """メタ情報のJSONから、分類のidごとの名称とコードの一覧を作成します"""
+        data: Any = json.loads(text)["GET_META_INFO"]
+        status: int = int(data.get("RESULT", {}).get("STATUS", 0))
+        if status >= 100:
+            raise Exception(f"メタ情報を取得できませんでした。 => {data['RESULT'].get('ERROR_MSG', status)}")
+        class_inf: Any = data["METADATA_INF"]["CLASS_INF"]["CLASS_OBJ"]
+        class_inf = [class_inf] if isinstance(class_inf, dict) else class_inf
+        dct_of_meta: dict = {}
+        for obj in class_inf:
+            cls: Any = obj.get("CLASS", [])
+            cls = [cls] if isinstance(cls, dict) else cls
+            lst_of_classes: list = [{"code": c["@code"], "name": c.get("@name", c["@code"]), "level": c.get("@level", "")} for c in cls]
+            dct_of_meta[obj["@id"]] = {"name": obj.get("@name", obj["@id"]), "classes": lst_of_classes}
+        return dct_of_meta
+
+    def _get_meta_info(self, client: httpx.Client, stats_data_id: str) -> dict:
+        """統計表のメタ情報を取得します(キャッシュがある場合は、キャッシュを使います)"""
+        url, params = self._get_params_of_meta_info(stats_data_id)
+        return self._parse_meta_info_json(b"".join(self._iter_bytes_with_cache(client, url, params)).decode("utf-8"))
+
+    async def _get_meta_info_with_async(self, client: httpx.AsyncClient, stats_data_id: str, obj_of_rl: AsyncRateLimiter) -> dict:
+        """統計表のメタ情報を取得します(非同期版)"""
+        url, params = self._get_params_of_meta_info(stats_data_id)
+        res: httpx.Response = await self._get_with_retry(client, url, params, obj_of_rl)
+        return self._parse_meta_info_json(res.text)
+
+    def _find_class_obj(self, dct_of_meta: dict, key: str) -> str:
+        """分類のidか名称から、分類のidを検索します"""
+        if key in dct_of_meta:
+            return key
+        for cid, obj in dct_of_meta.items():
+            if obj["name"] == key:
+                return cid
+        raise Exception(f"「{key}」という分類はありません。 => " + ", ".join(f"{cid}: {obj['name']}" for cid, obj in dct_of_meta.items()))
+
+    def _get_narrowing_params(self, dct_of_meta: dict) -> dict:
+        """API側で絞り込む条件を、メタ情報でコードに変換して、APIのパラメータにします"""
+        params: dict = {}
+        for key, lst_of_values in self.dct_of_filters.items():
+            cid: str = self._find_class_obj(dct_of_meta, key)
+            lst_of_classes: list = dct_of_meta[cid]["classes"]
+            lst_of_codes: list = []
+            for value in lst_of_values:
+                # コードが一致しない場合は、名称が一致する全てのコードにする
+                lst_of_matched: list = [c["code"] for c in lst_of_classes if c["code"] == value] or [
+                    c["code"] for c in lst_of_classes if c["name"] == value
+                ]
+                if not lst_of_matched:
+                    raise Exception(f"「{dct_of_meta[cid]['name']}」に「{value}」はありません。")
+                lst_of_codes.extend(lst_of_matched)
+            lst_of_codes = list(dict.fromkeys(lst_of_codes))
+            if len(lst_of_codes) > self.MAX_CODES:
+                raise Exception(f"「{dct_of_meta[cid]['name']}」のコードは、{self.MAX_CODES}個以下にしてください。")
+            # パラメータ名は、分類のidの先頭を大文字にしたもの(例: area => cdArea, cat01 => cdCat01)
+            params[f"cd{cid[:1].upper()}{cid[1:]}"] = ",".join(lst_of_codes)
+        for key, level in self.dct_of_levels.items():
+            cid = self._find_class_obj(dct_of_meta, key)
+            params[f"lv{cid[:1].upper()}{cid[1:]}"] = level
+        return params
+
+    def show_meta_info(self) -> bool:
+        """指定の統計表の分類を表示します"""
+        result: bool = False
+        try:
+            with httpx.Client(timeout=120.0) as client:
+                dct_of_meta: dict = self._get_meta_info(client, self.STATS_DATA_ID)
+            for cid, obj in dct_of_meta.items():
+                lst_of_levels: list = sorted({c["level"] for c in obj["classes"] if c["level"]})
+                examples: str = ", ".join(c["name"] for c in obj["classes"][:5])
+                self.log.info(f"{cid}: {obj['name']} => {len(obj['classes'])}件(階層: {', '.join(lst_of_levels) or 'なし'}) 例: {examples}")
+        except Exception:
+            raise
+        else:
+            result = True
+        finally:
+            pass
+        return result
+
+    def _parse_stats_data_json(self, text: str) -> tuple[DataFrame, str]:
+        """統計データのJSONを解析して、列ごとのデータを作成します"""
+        data: Any = json.loads(text)["GET_STATS_DATA"]
+        # 絞り込んだ結果、該当するデータがない場合は、DATA_INFがない
+        status: int = int(data.get("RESULT", {}).get("STATUS", 0))
+        if not self._check_status(status, data.get("RESULT", {}).get("ERROR_MSG", "")):
+            return (pandas.DataFrame(), "")
+        statistical_data: dict = data["STATISTICAL_DATA"]
+        # CLASS_OBJとVALUEを抽出する
+        class_inf: Any = statistical_data["CLASS_INF"]["CLASS_OBJ"]
+        class_inf = [class_inf] if isinstance(class_inf, dict) else class_inf
+        values: Any = statistical_data["DATA_INF"]["VALUE"]
+        # 1件だけの場合は、辞書になる
+        values = [values] if isinstance(values, dict) else values
+        # 続きのデータの開始位置
+        next_key: str = str(statistical_data.get("RESULT_INF", {}).get("NEXT_KEY", "") or "")
+        # idと列名の対応表と、CLASS_OBJ内のコードを日本語名に置換する辞書を作成する
+        id2name: dict = {}
+        mapping: dict = {}
+        for obj in class_inf:
+            cid: str = obj["@id"]
+            id2name[cid] = obj["@name"]
+            cls: Any = obj["CLASS"]
+            cls = [cls] if isinstance(cls, dict) else cls
+            mapping[cid] = {c["@code"]: c["@name"] for c in cls}
+        # VALUEを列ごとのリストにする
+        dct_of_columns: dict = {}
+        for number_of_rows, value in enumerate(values):
+            row: dict = {}
+            for k, v in value.items():
+                if k.startswith("@") and (k[1:] in mapping or k == "@unit"):
+                    row[k[1:]] = v
+                elif k == "$":
+                    row["値"] = v
+                else:
+                    row[k] = v
+            self._append_row(dct_of_columns, row, number_of_rows)
+        df: DataFrame = self._build_stats_data_df(dct_of_columns, mapping, id2name)
+        return (df, next_key)
+
+    def _parse_stats_data_csv(self, text: str) -> tuple[DataFrame, str]:
+        """統計データのCSVを解析して、列ごとのデータを作成します"""
+        lines: list[str] = text.splitlines()
+        # VALUE行の位置を検索する
+        value_idx: int = 0
+        for i, line in enumerate(lines):
+            if line.strip().replace('"', "") == "VALUE":
+                value_idx = i
+                break
+        # VALUE行より前の情報(エラーの場合は、全体)
+        lst_of_rows: list = list(csv.reader(lines[:value_idx] if value_idx else lines))
+        if not self._check_status_of_csv(lst_of_rows):
+            return (pandas.DataFrame(), "")
+        if value_idx == 0:
+            raise Exception("CSVに 'VALUE' 行が見つかりませんでした。")
+        # 続きのデータの開始位置("NEXT_KEY"の見出しの次の行にある)
+        next_key: str = self._get_value_of_csv(lst_of_rows, "NEXT_KEY")
+        # ヘッダー行を取得する
+        header_cols: list[str] = [h.strip('"') for h in lines[value_idx + 1].split(",")]
+        # データ本体を文字列として抽出する
+        csv_body: str = "\n".join(lines[value_idx + 2 :])
+        df: DataFrame = pandas.read_csv(io.StringIO(csv_body), header=None)
+        df.columns = header_cols
+        # 列名を日本語に置換し、不要な英語コード列を削除する
+        rename_map: dict = {}
+        drop_cols: list = []
+        i: int = 0
+        while i < len(header_cols):
+            eng: str = header_cols[i]
+            if eng.endswith("_code") and i + 1 < len(header_cols):
+                # 英語コード列は削除する
+                drop_cols.append(eng)
+                i += 2
+                continue
+            # 単独列を処理する
+            elif eng == "unit":
+                rename_map[eng] = "単位"
+            elif eng == "value":
+                rename_map[eng] = "値"
+            else:
+                rename_map[eng] = eng
+            i += 1
+        df = df.rename(columns=rename_map)
+        df = df.drop(columns=drop_cols)
+        # 次元の列をカテゴリー型、値列をfloat64型に変換する
+        for column in df.columns:
+            if column == "値":
+                df[column] = pandas.to_numeric(df[column], errors="coerce").astype("float64")
+            else:
+                df[column] = df[column].astype("category")
+        return (df, next_key)
+
     def get_table_from_api(self) -> bool:
         """APIから指定の統計表を取得します"""
 
-        def _get_params_of_url() -> dict:
-            """APIのURLのパラメータを取得します"""
-            params: dict = {
-                "appId": self.APP_ID,  # アプリケーションID
-                "statsDataId": self.STATS_DATA_ID,  # 統計表ID
-                "lang": "J",  # 言語
-                "limit": 100,
-                "metaGetFlg": "Y",  # メタ情報の取得フラグ
-                "cntGetFlg": "N",  # 件数の取得フラグ
-                "explanationGetFlg": "N",  # 解説情報の有無フラグ
-                "annotationGetFlg": "N",  # 注釈情報の有無フラグ
-                "sectionHeaderFlg": 1,  # 見出し行の有無フラグ
-                "replaceSpChars": 0,  # 特殊文字のエスケープフラグ
-            }
-            return params
-
-        def _with_xml(client: httpx.Client, dct_of_params: dict) -> DataFrame:
+        def _with_xml(client: httpx.Client, dct_of_params: dict) -> tuple[DataFrame, str]:
             """XMLでデータを取得します"""
             try:
-                id_url: str = f"http://api.e-stat.go.jp/rest/{self.VERSION}/app/getStatsData"
-                # リクエストを送信する
-                res: httpx.Response = client.get(id_url, params=dct_of_params)
-                # 解析して、ルート要素を取得する
-                root: ElementTree.Element[str] = ElementTree.fromstring(res.text)
-                # CLASS_OBJからコードと名称のマッピングを作成する
-                mapping: dict = {}
-                for obj in root.findall(".//CLASS_OBJ"):
-                    obj_id: str = obj.attrib["id"]
-                    code_map: dict = {}
-                    for cls in obj.findall("CLASS"):
-                        # codeをキー、nameを値とする辞書を作成する
-                        code_map[cls.attrib["code"]] = cls.attrib.get("name", cls.attrib["code"])
-                    mapping[obj_id] = code_map
-                # VALUEを取得し、行ごとの辞書に変換する
-                rows: list = []
-                for element in root.findall(".//VALUE"):
-                    row: dict = {}
-                    for key, value in element.attrib.items():
-                        if key in mapping:
-                            row[key] = mapping[key].get(value, value)
-                        else:
-                            row[key] = value
-                    # VALUEのテキストを追加する
-                    row["値"] = (element.text or "").strip()
-                    rows.append(row)
-                df: DataFrame = pandas.DataFrame(rows)
-                # 列名を日本語に変換する
-                id2name: dict = {}
-                for obj in root.findall(".//CLASS_OBJ"):
-                    obj_id: str = obj.attrib["id"]
-                    obj_name: str = obj.attrib.get("name", obj_id)
-                    id2name[obj_id] = obj_name
-                id2name["unit"] = "単位"
-                df.rename(columns=id2name, inplace=True)
-                # 値列を数値型に変換する
-                if "値" in df.columns:
-                    df["値"] = pandas.to_numeric(df["値"], errors="coerce")
+                id_url: str = f"{self.BASE_URL}/{self.VERSION}/app/getStatsData"
+                # リクエストを送信し、受信しながら解析する
+                df, next_key = self._parse_stats_data_xml(self._iter_bytes_with_cache(client, id_url, dct_of_params))
             except Exception:
                 raise
             else:
                 pass
             finally:
-                # デバッグ用(加工前のデータをクリップボードにコピーする)
-                clipboard.copy(res.text)
-            return df
+                pass
+            return (df, next_key)
 
-        def _with_json(client: httpx.Client, dct_of_params: dict) -> DataFrame:
+        def _with_json(client: httpx.Client, dct_of_params: dict) -> tuple[DataFrame, str]:
             """JSONでデータを取得します"""
+            text: str = ""
             try:
-                id_url: str = f"http://api.e-stat.go.jp/rest/{self.VERSION}/app/json/getStatsData"
+                id_url: str = f"{self.BASE_URL}/{self.VERSION}/app/json/getStatsData"
                 # リクエストを送信する
-                res: httpx.Response = client.get(id_url, params=dct_of_params)
-                data: Any = res.json()
-                # CLASS_OBJとVALUEを抽出する
-                class_inf: Any = data["GET_STATS_DATA"]["STATISTICAL_DATA"]["CLASS_INF"]["CLASS_OBJ"]
-                values: Any = data["GET_STATS_DATA"]["STATISTICAL_DATA"]["DATA_INF"]["VALUE"]
-                # idと列名の対応表を作成する
-                col_name_map: dict = {obj["@id"]: obj["@name"] for obj in class_inf}
-                col_name_map["unit"] = "単位"
-                # CLASS_OBJ内のコードを日本語名に置換する辞書を作成する
-                code_to_name: dict = {}
-                for obj in class_inf:
-                    cid: str = obj["@id"]
-                    cls: Any = obj["CLASS"]
-                    if isinstance(cls, list):
-                        code_to_name[cid] = {c["@code"]: c["@name"] for c in cls}
-                    else:
-                        code_to_name[cid] = {cls["@code"]: cls["@name"]}
-                # VALUEの各行を日本語に変換する
-                translated_rows: list = []
-                for value in values:
-                    row: dict = {}
-                    for k, v in value.items():
-                        jp_col: str = ""
-                        if k.startswith("@") and k[1:] in code_to_name:
-                            jp_col: Any = col_name_map.get(k[1:], k[1:])
-                            row[jp_col] = code_to_name[k[1:]].get(v, v)
-                        elif k == "@unit":
-                            row["単位"] = v
-                        elif k == "$":
-                            row["値"] = v
-                        else:
-                            row[k] = v
-                    translated_rows.append(row)
-                df: DataFrame = pandas.DataFrame(translated_rows)
-                # 値列を数値型に変換する
-                if "値" in df.columns:
-                    df["値"] = pandas.to_numeric(df["値"], errors="coerce")
+                text = b"".join(self._iter_bytes_with_cache(client, id_url, dct_of_params)).decode("utf-8")
+                df, next_key = self._parse_stats_data_json(text)
             except Exception:
+                # デバッグ用(解析できなかったページだけ、加工前のデータをクリップボードにコピーする)
+                if text:
+                    clipboard.copy(text)
                 raise
             else:
                 pass
             finally:
-                # デバッグ用(加工前のデータをクリップボードにコピーする)
-                clipboard.copy(json.dumps(res.json(), indent=4, ensure_ascii=False))
-            return df
+                pass
+            return (df, next_key)
 
-        def _with_csv(client: httpx.Client, dct_of_params: dict) -> DataFrame:
+        def _with_csv(client: httpx.Client, dct_of_params: dict) -> tuple[DataFrame, str]:
             """CSVでデータを取得します"""
+            text: str = ""
             try:
-                id_url: str = f"http://api.e-stat.go.jp/rest/{self.VERSION}/app/getSimpleStatsData"
+                id_url: str = f"{self.BASE_URL}/{self.VERSION}/app/getSimpleStatsData"
                 # リクエストを送信する
-                res: httpx.Response = client.get(id_url, params=dct_of_params)
-                lines: list[str] = res.text.splitlines()
-                # VALUE行の位置を検索する
-                value_idx: int = 0
-                for i, line in enumerate(lines):
-                    if line.strip().replace('"', "") == "VALUE":
-                        value_idx = i
-                        break
-                if value_idx == 0:
-                    raise Exception("CSVに 'VALUE' 行が見つかりませんでした。")
-                # ヘッダー行を取得する
-                header_cols: list[str] = [h.strip('"') for h in lines[value_idx + 1].split(",")]
-                # データ本体を文字列として抽出する
-                csv_body: str = "\n".join(lines[value_idx + 2 :])
-                df: DataFrame = pandas.read_csv(io.StringIO(csv_body), header=None)
-                df.columns = header_cols
-                # 列名を日本語に置換し、不要な英語コード列を削除する
-                rename_map: dict = {}
-                drop_cols: list = []
-                i: int = 0
-                while i < len(header_cols):
-                    eng: str = header_cols[i]
-                    if eng.endswith("_code") and i + 1 < len(header_cols):
-                        # 英語コード列は削除する
-                        drop_cols.append(eng)
-                        i += 2
-                        continue
-                    # 単独列を処理する
-                    elif eng == "unit":
-                        rename_map[eng] = "単位"
-                    elif eng == "value":
-                        rename_map[eng] = "値"
-                    else:
-                        rename_map[eng] = eng
-                    i += 1
-                df = df.rename(columns=rename_map)
-                df = df.drop(columns=drop_cols)
-                # 値列を数値型に変換する
-                if "値" in df.columns:
-                    df["値"] = pandas.to_numeric(df["値"], errors="coerce")
+                text = b"".join(self._iter_bytes_with_cache(client, id_url, dct_of_params)).decode("utf-8")
+                df, next_key = self._parse_stats_data_csv(text)
             except Exception:
+                # デバッグ用(解析できなかったページだけ、加工前のデータをクリップボードにコピーする)
+                if text:
+                    clipboard.copy(text)
                 raise
             else:
                 pass
             finally:
-                # デバッグ用(加工前のデータをクリップボードにコピーする)
-                clipboard.copy(res.text)
-            return df
+                pass
+            return (df, next_key)
 
         result: bool = False
         try:
-            dct_of_params: dict = _get_params_of_url()
+            dct_of_params: dict = self._get_params_of_table(self.STATS_DATA_ID)
             # セッションを管理する
+            dct_of_func: dict = {"xml": _with_xml, "json": _with_json, "csv": _with_csv}
+            func: Any = dct_of_func.get(self.lst_of_data_type[self.KEY])
+            if func is None:
+                raise Exception("データタイプが対応していません。")
+            lst_of_df: list = []
             with httpx.Client(timeout=120.0) as client:
-                match self.lst_of_data_type[self.KEY]:
-                    case "xml":
-                        self.df = _with_xml(client, dct_of_params)
-                    case "json":
-                        self.df = _with_json(client, dct_of_params)
-                    case "csv":
-                        self.df = _with_csv(client, dct_of_params)
-                    case _:
-                        raise Exception("データタイプが対応していません。")
+                if self.dct_of_filters or self.dct_of_levels:
+                    # 必要なセルだけを受信するように、API側で絞り込む
+                    dct_of_narrowing: dict = self._get_narrowing_params(self._get_meta_info(client, self.STATS_DATA_ID))
+                    self.log.info(f"API側で絞り込む条件 => {dct_of_narrowing}")
+                    dct_of_params.update(dct_of_narrowing)
+                # NEXT_KEYがなくなるまで、続きのデータを取得する
+                while True:
+                    df, next_key = func(client, dct_of_params)
+                    lst_of_df.append(df)
+                    self.log.info(f"{dct_of_params.get('startPosition', 1)}件目から{len(df)}件を取得しました。")
+                    if not next_key:
+                        break
+                    if str(dct_of_params.get("startPosition")) == next_key:
+                        raise Exception("続きのデータの開始位置が進みません。")
+                    dct_of_params["startPosition"] = next_key
+            self.df = self._concat_pages(lst_of_df)
             self.DATA_COUNT = len(self.df)
         except Exception:
             raise
@@ -528,70 +1387,320 @@ class GetGovernmentStatistics:
             pass
         return result
 
+    async def get_tables_from_api(self, lst_of_ids: list) -> bool:
+        """APIから複数の統計表を同時に取得して、取得できたものから順にcsvファイルに出力します"""
+        result: bool = False
+        lst_of_summary: list = []
+        started_at: float = time.perf_counter()
+        try:
+            data_type: str = self.lst_of_data_type[self.KEY]
+            # 統計データのURLと、応答の本体を解析する関数
+            dct_of_url: dict = {
+                "xml": f"{self.BASE_URL}/{self.VERSION}/app/getStatsData",
+                "json": f"{self.BASE_URL}/{self.VERSION}/app/json/getStatsData",
+                "csv": f"{self.BASE_URL}/{self.VERSION}/app/getSimpleStatsData",
+            }
+            dct_of_parser: dict = {
+                "xml": lambda content: self._parse_stats_data_xml([content]),
+                "json": lambda content: self._parse_stats_data_json(content.decode("utf-8")),
+                "csv": lambda content: self._parse_stats_data_csv(content.decode("utf-8")),
+            }
+            if data_type not in dct_of_url:
+                raise Exception("データタイプが対応していません。")
+            self.folder_p_of_table.mkdir(parents=True, exist_ok=True)
+            obj_of_rl: AsyncRateLimiter = AsyncRateLimiter(self.requests_per_second)
+            semaphore: asyncio.Semaphore = asyncio.Semaphore(self.max_concurrency)
+            limits: httpx.Limits = httpx.Limits(max_connections=self.max_concurrency, max_keepalive_connections=self.max_concurrency)
+            # 全ての統計表で、接続を使い回す
+            async with httpx.AsyncClient(timeout=120.0, limits=limits) as client:
+
+                async def _get_table(stats_data_id: str) -> dict:
+                    """統計表を全ページ取得して、csvファイルに出力します"""
+                    summary: dict = {"統計表ID": stats_data_id, "結果": "中止", "件数": 0, "秒数": 0.0, "内容": ""}
+                    async with semaphore:
+                        if self.cancel:
+                            return summary
+                        start_time: float = time.perf_counter()
+                        try:
+                            dct_of_params: dict = self._get_params_of_table(stats_data_id)
+                            if self.dct_of_filters or self.dct_of_levels:
+                                # 必要なセルだけを受信するように、API側で絞り込む
+                                dct_of_meta: dict = await self._get_meta_info_with_async(client, stats_data_id, obj_of_rl)
+                                dct_of_params.update(self._get_narrowing_params(dct_of_meta))
+                            lst_of_df: list = []
+                            # NEXT_KEYがなくなるまで、続きのデータを取得する
+                            while True:
+                                res: httpx.Response = await self._get_with_retry(client, dct_of_url[data_type], dct_of_params, obj_of_rl)
+                                # 解析は別のスレッドで行い、他の統計表の受信を止めない
+                                df, next_key = await asyncio.to_thread(dct_of_parser[data_type], res.content)
+                                lst_of_df.append(df)
+                                if not next_key:
+                                    break
+                                if str(dct_of_params.get("startPosition")) == next_key:
+                                    raise Exception("続きのデータの開始位置が進みません。")
+                                dct_of_params["startPosition"] = next_key
+                            df = self._concat_pages(lst_of_df)
+                            file_name: str = f"stats_table_{stats_data_id}_{self.obj_of_dt2._convert_for_file_name()}.csv"
+                            file_p_of_table: Path = self.folder_p_of_table / file_name
+                            # 値列はfloat64型のため、整数は小数点なしで出力する
+                            await asyncio.to_thread(df.to_csv, str(file_p_of_table), index=False, encoding="utf-8", float_format="%.15g")
+                        except asyncio.CancelledError:
+                            raise
+                        except Exception as e:
+                            summary["結果"] = "失敗"
+                            summary["内容"] = f"{type(e).__name__}: {str(e)}"
+                            self.log.error(f"統計表ID => {stats_data_id}: 取得に失敗しました。 => {summary['内容']}")
+                        else:
+                            summary["結果"] = "成功"
+                            summary["件数"] = len(df)
+                            summary["内容"] = str(file_p_of_table)
+                            self.log.info(f"統計表ID => {stats_data_id}: {len(df)}件を出力しました。")
+                        finally:
+                            summary["秒数"] = round(time.perf_counter() - start_time, 3)
+                    return summary
+
+                # 重複を除き、指定の順に結果をまとめる
+                lst_of_summary = list(await asyncio.gather(*[_get_table(str(i)) for i in dict.fromkeys(lst_of_ids)]))
+        except asyncio.CancelledError:
+            self.cancel = True
+            raise
+        except Exception:
+            raise
+        else:
+            result = True
+        finally:
+            self.cancel = False
+            self.df_of_summary = pandas.DataFrame(lst_of_summary, columns=["統計表ID", "結果", "件数", "秒数", "内容"])
+            if lst_of_summary:
+                self.log.info(tabulate(self.df_of_summary, headers="keys", tablefmt="github", showindex=False))
+            dct_of_counts: dict = self.df_of_summary["結果"].value_counts().to_dict()
+            self.log.info(
+                f"成功 => {dct_of_counts.get('成功', 0)}件、失敗 => {dct_of_counts.get('失敗', 0)}件、中止 => {dct_of_counts.get('中止', 0)}件、"
+                f"処理時間 => {time.perf_counter() - started_at:.1f}秒"
+            )
+        return result
+
+    def _cast_to_str(self, column: pandas.Series) -> pandas.Series:
+        """列を文字列に変換します(欠損値は欠損値のままにします)"""
+        dtype: Any = column.dtype
+        if pandas.api.types.is_string_dtype(dtype) or pandas.api.types.is_numeric_dtype(dtype) or pandas.api.types.is_bool_dtype(dtype):
+            return column.astype(str)
+        # 日時などは、行ごとに変換した場合と同じ表記にする
+        return column.astype(object).map(str, na_action="ignore").astype(str)
+
+    def _cast_columns_to_str(self, df: DataFrame) -> list:
+        """データフレームの列を一度だけ文字列に変換します(カテゴリー型は、カテゴリーだけを変換します)"""
+        lst_of_columns: list = []
+        for i in range(len(df.columns)):
+            column: pandas.Series = df.iloc[:, i]
+            if isinstance(column.dtype, pandas.CategoricalDtype):
+                categories: pandas.Series = self._cast_to_str(pandas.Series(column.cat.categories))
+                lst_of_columns.append((categories, column.cat.codes.to_numpy()))
+            else:
+                lst_of_columns.append(self._cast_to_str(column))
+        return lst_of_columns
+
+    def _match_columns(self, lst_of_columns: list, func: Callable) -> list:
+        """列ごとに判定します(カテゴリー型は、カテゴリーごとに判定した結果をコードで引きます)"""
+        lst_of_masks: list = []
+        for column in lst_of_columns:
+            if isinstance(column, tuple):
+                categories, codes = column
+                # 末尾のFalseは、欠損値のコード(-1)の参照先
+                mask_of_categories: numpy.ndarray = numpy.append(numpy.asarray(func(categories), dtype=bool), False)
+                lst_of_masks.append(mask_of_categories[codes])
+            else:
+                lst_of_masks.append(func(column))
+        return lst_of_masks
+
+    def _combine_masks(self, lst_of_masks: list, number_of_rows: int, how: str) -> numpy.ndarray:
+        """列ごとの判定結果を行ごとにまとめます"""
+        if not lst_of_masks:
+            return numpy.zeros(number_of_rows, dtype=bool) if how == "any" else numpy.ones(number_of_rows, dtype=bool)
+        stacked: numpy.ndarray = numpy.column_stack([numpy.asarray(m, dtype=bool) for m in lst_of_masks])
+        return stacked.any(axis=1) if how == "any" else stacked.all(axis=1)
+
     def filter_df(self, df: DataFrame) -> DataFrame:
         """データフレームをフィルターにかけます"""
         filtered_df: DataFrame | None = None
         try:
+            # 列ごとにまとめて判定する
+            lst_of_columns: list = self._cast_columns_to_str(df)
+            number_of_rows: int = len(df)
+
+            def _contains(kw: str) -> numpy.ndarray:
+                lst_of_masks: list = self._match_columns(lst_of_columns, lambda c: c.str.contains(kw, case=False, na=False))
+                return self._combine_masks(lst_of_masks, number_of_rows, "any")
+
+            def _eq(kw: str) -> numpy.ndarray:
+                return self._combine_masks(self._match_columns(lst_of_columns, lambda c: c.eq(kw).fillna(False)), number_of_rows, "any")
+
+            mask: numpy.ndarray
             match self.lst_of_match_type[self.KEY]:
                 case "部分一致":
                     # 全列で部分一致検索する
                     if len(self.lst_of_keyword) == 1:
                         # 単一キーワード
-                        kw: str = str(self.lst_of_keyword[0])
-                        filtered_df = df[
-                            df.apply(
-                                lambda row: row.astype(str).str.contains(kw, case=False, na=False).any(),
-                                axis=1,
-                            )
-                        ]
+                        mask = _contains(str(self.lst_of_keyword[0]))
                     else:
                         # 複数キーワード
                         match self.lst_of_logic_type[self.KEY]:
                             case "OR抽出":
                                 pattern: str = "|".join(map(str, self.lst_of_keyword))
-                                filtered_df = df[
-                                    df.apply(
-                                        lambda row: row.astype(str).str.contains(pattern, case=False, na=False).any(),
-                                        axis=1,
-                                    )
-                                ]
+                                mask = _contains(pattern)
                             case "AND抽出":
-                                filtered_df = df[
-                                    df.apply(
-                                        lambda row: all(row.astype(str).str.contains(k, case=False, na=False).any() for k in self.lst_of_keyword),
-                                        axis=1,
-                                    )
-                                ]
+                                mask = self._combine_masks([_contains(k) for k in self.lst_of_keyword], number_of_rows, "all")
                             case _:
                                 raise Exception("その抽出方法はありません。")
                 case "完全一致":
                     # 全列で完全一致検索する
                     if len(self.lst_of_keyword) == 1:
                         # 単一キーワード
-                        kw: str = str(self.lst_of_keyword[0])
-                        filtered_df = df[df.apply(lambda row: row.astype(str).eq(kw).any(), axis=1)]
+                        mask = _eq(str(self.lst_of_keyword[0]))
                     else:
                         # 複数キーワード
                         match self.lst_of_logic_type[self.KEY]:
                             case "OR抽出":
-                                filtered_df = df[
-                                    df.apply(
-                                        lambda row: row.astype(str).isin(self.lst_of_keyword).any(),
-                                        axis=1,
-                                    )
-                                ]
+                                lst_of_masks: list = self._match_columns(lst_of_columns, lambda c: c.isin(self.lst_of_keyword))
+                                mask = self._combine_masks(lst_of_masks, number_of_rows, "any")
                             case "AND抽出":
-                                filtered_df = df[
-                                    df.apply(
-                                        lambda row: all(row.astype(str).eq(k).any() for k in self.lst_of_keyword),
-                                        axis=1,
-                                    )
-                                ]
+                                mask = self._combine_masks([_eq(k) for k in self.lst_of_keyword], number_of_rows, "all")
                             case _:
                                 raise Exception("その抽出方法はありません。")
                 case _:
                     raise Exception("その検索方法はありません。")
+            filtered_df = df[mask]
+            self.DATA_COUNT = len(filtered_df)
+        except Exception:
+            raise
+        else:
+            pass
+        finally:
+            pass
+        return filtered_df
+
+    def _get_files_of_ids(self) -> list:
+        """統計表IDの一覧のファイルを取得します(ない場合は、以前の形式のCSVファイルを番号順に取得します)"""
+        file_p_of_ids: Path = self.folder_p_of_ids / self.file_name_of_ids
+        if file_p_of_ids.exists():
+            return [file_p_of_ids]
+        # 検索パターン
+        PATTERN: str = "list_of_stats_data_ids_*.csv"
+        lst_of_files: list = list(self.folder_p_of_ids.glob(PATTERN)) if self.folder_p_of_ids.exists() else []
+
+        def _get_number(file_p: Path) -> tuple:
+            suffix: str = file_p.stem.rsplit("_", 1)[-1]
+            return (0, int(suffix), file_p.name) if suffix.isdigit() else (1, 0, file_p.name)
+
+        return sorted(lst_of_files, key=_get_number)
+
+    def _iter_lines_of_ids(self, lst_of_files: list) -> Iterator[str]:
+        """統計表IDの一覧のファイルから、ヘッダー行と空行を除いた行を1行ずつ読み込みます"""
+        for file_p in lst_of_files:
+            # 圧縮したファイルも、全体を展開せずに1行ずつ読み込む
+            with gzip.open(file_p, "rt", encoding="utf-8") if file_p.suffix == ".gz" else open(file_p, encoding="utf-8") as f:
+                # ヘッダー行を除く
+                next(f, None)
+                for line in f:
+                    line = line.rstrip("\r\n")
+                    if line != "":
+                        yield line
+
+    def _read_csv_of_ids(self, lst_of_files: list) -> DataFrame:
+        """統計表IDの一覧のCSVファイルをまとめて読み込みます"""
+        # 統計名にカンマが含まれる場合があるため、先頭を統計表ID、末尾を表題として分ける(表題のカンマは書き出し時に置換済み)
+        lst_of_rows: list = []
+        for line in self._iter_lines_of_ids(lst_of_files):
+            first: int = line.find(",")
+            last: int = line.rfind(",")
+            # 区切りが2つない行は、空の行にする
+            lst_of_rows.append((line[:first], line[first + 1 : last], line[last + 1 :]) if first != last else ("", "", ""))
+        df: DataFrame = pandas.DataFrame(lst_of_rows, columns=self.header_of_ids_l, dtype=str)
+        return df
+
+    def _get_signature_of_ids(self, lst_of_files: list) -> tuple:
+        """統計表IDの一覧のファイルの状態を取得します"""
+        return tuple((f.name, f.stat().st_mtime_ns, f.stat().st_size) for f in lst_of_files)
+
+    def build_index_of_ids(self) -> bool:
+        """統計表IDの一覧から、全文検索のインデックスを作成します(作成できない場合は、Falseを返します)"""
+        result: bool = False
+        try:
+            df: DataFrame = self.load_lst_of_ids()
+            obj_of_index: StatsDataIdsIndex = StatsDataIdsIndex(str(self.folder_p_of_ids / self.file_name_of_index_of_ids))
+            number_of_rows: int = obj_of_index.build(df.itertuples(index=False, name=None), json.dumps(self.signature_of_ids))
+            self.log.info(f"統計表IDの一覧の全文検索のインデックス => {number_of_rows}件")
+        except sqlite3.Error as e:
+            # FTS5やtrigramが使えない環境では、インデックスを作成せずにデータフレームで検索する
+            self.log.warning(f"全文検索のインデックスを作成できません。 => {str(e)}")
+        except Exception:
+            raise
+        else:
+            result = True
+        finally:
+            pass
+        return result
+
+    def _search_index_of_ids(self) -> DataFrame | None:
+        """全文検索のインデックスで、統計表IDの一覧を検索します(使えない場合は、Noneを返します)"""
+        # 正規表現の記号を含むキーワードは、以前と同じ結果になるようにデータフレームで検索する
+        if any(re.search(r"[.^$*+?{}\[\]\\|()]", str(k)) for k in self.lst_of_keyword):
+            return None
+        lst_of_files: list = self._get_files_of_ids()
+        if not lst_of_files:
+            raise Exception("統計表IDの一覧を取得してください。")
+        obj_of_index: StatsDataIdsIndex = StatsDataIdsIndex(str(self.folder_p_of_ids / self.file_name_of_index_of_ids))
+        try:
+            if obj_of_index.get_signature() != json.dumps(self._get_signature_of_ids(lst_of_files)):
+                # 一覧が変わった場合は、インデックスを作り直す
+                if not self.build_index_of_ids():
+                    return None
+            logic_type: str = self.lst_of_logic_type[self.KEY] if self.lst_of_logic_type else "OR抽出"
+            lst_of_rows: list = obj_of_index.search(self.lst_of_keyword, self.lst_of_match_type[self.KEY], logic_type)
+        except sqlite3.Error as e:
+            # FTS5が使えない環境では、データフレームで検索する
+            self.log.warning(f"全文検索のインデックスを使えません。 => {str(e)}")
+            return None
+        return pandas.DataFrame(lst_of_rows, columns=self.header_of_ids_l, dtype=str)
+
+    def load_lst_of_ids(self) -> DataFrame:
+        """統計表IDの一覧を読み込みます"""
+        df: DataFrame | None = None
+        try:
+            lst_of_files: list = self._get_files_of_ids()
+            if not lst_of_files:
+                raise Exception("統計表IDの一覧を取得してください。")
+            signature: tuple = self._get_signature_of_ids(lst_of_files)
+            if self.df_of_ids is not None and signature == self.signature_of_ids:
+                # ファイルが変わっていなければ、読み込み済みのものを使う
+                df = self.df_of_ids
+            else:
+                df = self._read_csv_of_ids(lst_of_files)
+                self.df_of_ids = df
+                self.signature_of_ids = signature
+            self.log.info(f"統計表IDの一覧 => {len(df)}件")
+        except Exception:
+            raise
+        else:
+            pass
+        finally:
+            pass
+        return df
+
+    def search_lst_of_ids(self) -> DataFrame:
+        """統計表IDの一覧を検索します"""
+        filtered_df: DataFrame | None = None
+        try:
+            if not self.lst_of_match_type or self.lst_of_match_type[self.KEY] == "検索しない":
+                filtered_df = self.load_lst_of_ids()
+            else:
+                # 全文検索のインデックスで検索する
+                filtered_df = self._search_index_of_ids()
+                if filtered_df is None:
+                    # 全てのファイルをまとめて、一度だけフィルターにかける
+                    filtered_df = self.filter_df(self.load_lst_of_ids())
             self.DATA_COUNT = len(filtered_df)
+            self.log.info(f"統計表IDの一覧の検索結果 => {self.DATA_COUNT}件")
         except Exception:
             raise
         else:
@@ -600,6 +1709,21 @@ class GetGovernmentStatistics:
             pass
         return filtered_df
 
+    def show_lst_of_ids(self, df: DataFrame) -> bool:
+        """統計表IDの一覧の検索結果を表示します"""
+        result: bool = False
+        try:
+            self.log.info(tabulate(df, headers="keys", tablefmt="github", showindex=False))
+            self.log.info("抽出するキーワード => " + (", ".join(map(str, self.lst_of_keyword)) if self.lst_of_keyword else "なし"))
+            self.log.info(f"表示件数 => {len(df)}")
+        except Exception:
+            raise
+        else:
+            result = True
+        finally:
+            pass
+        return result
+
     def show_table(self) -> bool:
         """指定の統計表を表示します"""
         result: bool = False
@@ -626,7 +1750,8 @@ class GetGovernmentStatistics:
             self.folder_p_of_table.mkdir(parents=True, exist_ok=True)
             file_p_of_table: Path = self.folder_p_of_table / f"stats_table_{self.STATS_DATA_ID}_{self.obj_of_dt2._convert_for_file_name()}.csv"
             file_s_of_table: str = str(file_p_of_table)
-            self.df.to_csv(file_s_of_table, index=False, encoding="utf-8")
+            # 値列はfloat64型のため、整数は小数点なしで出力する
+            self.df.to_csv(file_s_of_table, index=False, encoding="utf-8", float_format="%.15g")
         except Exception:
             raise
         else:
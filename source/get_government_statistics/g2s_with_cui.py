@@ -117,6 +117,35 @@ class GS_With_Cui:
                 pass
         return text
 
+    def _input_lst_of_stats_data_ids(self) -> list:
+        """複数の統計表IDを入力します"""
+        lst: list = []
+        # 桁
+        DIGIT: int = 10
+        while True:
+            try:
+                text: str = input("統計表IDを、カンマか空白で区切って入力してください。: ").strip()
+                lst = [s for s in re.split(r"[,\s]+", text) if s != ""]
+                if not lst:
+                    raise Exception("統計表IDが未入力です。")
+                lst_of_invalid: list = [s for s in lst if not s.isdecimal() or len(s) != DIGIT]
+                if lst_of_invalid:
+                    raise Exception(f"{DIGIT}桁の数字で入力してください。 => {', '.join(lst_of_invalid)}")
+            except KeyboardInterrupt:
+                raise
+            except Exception as e:
+                print(f"error: \n{str(e)}")
+            else:
+                break
+            finally:
+                pass
+        return lst
+
+    def _input_filters(self) -> str:
+        """API側で絞り込む条件を入力します"""
+        lst: list = self._input_lst_of_text("絞り込む条件を「分類=値1,値2」か「lv分類=階層」の形式で入力してください。(例: 地域=東京都,大阪府): ")
+        return "\n".join(lst)
+
     def _input_bool(self, msg: str) -> bool:
         """はいかいいえをを入力します"""
         result: bool = False
@@ -175,21 +204,46 @@ async def main() -> bool:
             if obj_with_cui._input_bool(f"{obj_of_cls.write_stats_data_ids_to_file.__doc__} => 行いますか？"):
                 # 取得方法は非同期のみ
                 obj_of_cls.lst_of_get_type = list(list(obj_of_cls.dct_of_get_type.items())[0])
-                # 統計表IDをテキストファイルに書き出す
-                await obj_of_cls.write_stats_data_ids_to_file()
-            obj_of_cls.STATS_DATA_ID = obj_with_cui._input_stats_data_id()
-            # 取得方法は同期のみ
-            obj_of_cls.lst_of_get_type = list(list(obj_of_cls.dct_of_get_type.items())[1])
-            obj_of_cls.get_table_from_api()
-            obj_of_cls.lst_of_match_type = obj_with_cui._select_element(obj_of_cls.dct_of_match_type)
-            if obj_with_cui._input_bool("フィルターをかけますか？"):
-                obj_of_cls.lst_of_keyword = obj_with_cui._input_lst_of_text("抽出するキーワードを入力してください。")
+                if obj_with_cui._input_bool(f"{obj_of_cls.sync_stats_data_ids.__doc__} => 行いますか？"):
+                    # 前回の同期以降に更新された統計表IDだけを反映する
+                    await obj_of_cls.sync_stats_data_ids()
+                else:
+                    # 統計表IDをテキストファイルに書き出す
+                    await obj_of_cls.write_stats_data_ids_to_file()
+            if obj_with_cui._input_bool("統計表IDの一覧を検索しますか？"):
+                obj_of_cls.lst_of_match_type = obj_with_cui._select_element(obj_of_cls.dct_of_match_type)
+                obj_of_cls.lst_of_keyword = obj_with_cui._input_lst_of_text("検索するキーワードを入力してください。")
                 if len(obj_of_cls.lst_of_keyword) > 1:
                     obj_of_cls.lst_of_logic_type = obj_with_cui._select_element(obj_of_cls.dct_of_logic_type)
-                obj_of_cls.df = obj_of_cls.filter_df(obj_of_cls.df)
-            obj_of_cls.show_table()
-            if obj_with_cui._input_bool(f"{obj_of_cls.output_table_to_csv.__doc__} => 行いますか？"):
-                obj_of_cls.output_table_to_csv()
+                # 全文検索のインデックスで検索する
+                obj_of_cls.show_lst_of_ids(obj_of_cls.search_lst_of_ids())
+                obj_of_cls.lst_of_keyword = []
+                obj_of_cls.lst_of_logic_type = []
+            if obj_with_cui._input_bool(f"{obj_of_cls.get_tables_from_api.__doc__} => 行いますか？"):
+                # 取得方法は非同期のみ
+                obj_of_cls.lst_of_get_type = list(list(obj_of_cls.dct_of_get_type.items())[0])
+                lst_of_ids: list = obj_with_cui._input_lst_of_stats_data_ids()
+                obj_of_cls.set_filters(obj_with_cui._input_filters() if obj_with_cui._input_bool("分類で絞り込んで取得しますか？") else "")
+                await obj_of_cls.get_tables_from_api(lst_of_ids)
+            else:
+                obj_of_cls.STATS_DATA_ID = obj_with_cui._input_stats_data_id()
+                # 取得方法は同期のみ
+                obj_of_cls.lst_of_get_type = list(list(obj_of_cls.dct_of_get_type.items())[1])
+                if obj_with_cui._input_bool("分類で絞り込んで取得しますか？"):
+                    obj_of_cls.show_meta_info()
+                    obj_of_cls.set_filters(obj_with_cui._input_filters())
+                else:
+                    obj_of_cls.set_filters("")
+                obj_of_cls.get_table_from_api()
+                obj_of_cls.lst_of_match_type = obj_with_cui._select_element(obj_of_cls.dct_of_match_type)
+                if obj_with_cui._input_bool("フィルターをかけますか？"):
+                    obj_of_cls.lst_of_keyword = obj_with_cui._input_lst_of_text("抽出するキーワードを入力してください。")
+                    if len(obj_of_cls.lst_of_keyword) > 1:
+                        obj_of_cls.lst_of_logic_type = obj_with_cui._select_element(obj_of_cls.dct_of_logic_type)
+                    obj_of_cls.df = obj_of_cls.filter_df(obj_of_cls.df)
+                obj_of_cls.show_table()
+                if obj_with_cui._input_bool(f"{obj_of_cls.output_table_to_csv.__doc__} => 行いますか？"):
+                    obj_of_cls.output_table_to_csv()
         except asyncio.CancelledError:
             raise
         except KeyboardInterrupt:
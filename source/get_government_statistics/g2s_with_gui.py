@@ -1,5 +1,4 @@
 import asyncio
-import csv
 import logging
 import re
 import sys
@@ -8,8 +7,8 @@ from typing import Any
 
 import httpx
 import pandas
-from PySide6.QtCore import QModelIndex, QObject, QThread, Signal
-from PySide6.QtGui import QFont, QStandardItem, QStandardItemModel
+from PySide6.QtCore import QAbstractTableModel, QModelIndex, QObject, Qt, QThread, Signal
+from PySide6.QtGui import QFont
 from PySide6.QtWidgets import (
     QApplication,
     QComboBox,
@@ -40,10 +39,12 @@ class GetIdsWorker(QObject):
     finished: Signal = Signal(bool)
     error: Signal = Signal(str)
 
-    def __init__(self, obj_of_cls: Any):
+    def __init__(self, obj_of_cls: Any, only_updated: bool = False):
         """初期化します"""
         super().__init__()
         self.obj_of_cls = obj_of_cls
+        # 前回の同期以降に更新された統計表IDだけを取得するかどうか
+        self.only_updated: bool = only_updated
 
     def run(self):
         """実行します"""
@@ -51,7 +52,10 @@ class GetIdsWorker(QObject):
         try:
             loop: asyncio.AbstractEventLoop = asyncio.new_event_loop()
             asyncio.set_event_loop(loop)
-            loop.run_until_complete(self.obj_of_cls.write_stats_data_ids_to_file())
+            if self.only_updated:
+                loop.run_until_complete(self.obj_of_cls.sync_stats_data_ids())
+            else:
+                loop.run_until_complete(self.obj_of_cls.write_stats_data_ids_to_file())
         except httpx.HTTPStatusError as e:
             self.error.emit(f"HTTPStatusError: \n{str(e)}")
         except httpx.RequestError as e:
@@ -70,6 +74,54 @@ class GetIdsWorker(QObject):
         self.obj_of_cls.cancel = True
 
 
+class DataFrameModel(QAbstractTableModel):
+    """
+    DataFrameを列指向のまま保持し、表示する行のセルだけを文字列にするモデル
+    行はスクロールに合わせて、少しずつ読み込みます
+    """
+
+    def __init__(self, df: pandas.DataFrame, fetch_size: int = 1000):
+        """初期化します"""
+        super().__init__()
+        self.df: pandas.DataFrame = df.reset_index(drop=True)
+        # 1回に読み込む行の数
+        self.fetch_size: int = fetch_size
+        # 読み込み済みの行の数
+        self.number_of_loaded: int = min(fetch_size, len(self.df))
+
+    def rowCount(self, parent: QModelIndex = QModelIndex()) -> int:
+        return 0 if parent.isValid() else self.number_of_loaded
+
+    def columnCount(self, parent: QModelIndex = QModelIndex()) -> int:
+        return 0 if parent.isValid() else len(self.df.columns)
+
+    def data(self, index: QModelIndex, role: int = Qt.ItemDataRole.DisplayRole) -> Any:
+        if not index.isValid() or role != Qt.ItemDataRole.DisplayRole:
+            return None
+        value: Any = self.df.iat[index.row(), index.column()]
+        return "" if pandas.isna(value) else str(value)
+
+    def headerData(self, section: int, orientation: Qt.Orientation, role: int = Qt.ItemDataRole.DisplayRole) -> Any:
+        if role != Qt.ItemDataRole.DisplayRole:
+            return None
+        if orientation == Qt.Orientation.Horizontal:
+            return str(self.df.columns[section])
+        return str(section + 1)
+
+    def canFetchMore(self, parent: QModelIndex = QModelIndex()) -> bool:
+        return not parent.isValid() and self.number_of_loaded < len(self.df)
+
+    def fetchMore(self, parent: QModelIndex = QModelIndex()):
+        if parent.isValid():
+            return
+        number_to_fetch: int = min(self.fetch_size, len(self.df) - self.number_of_loaded)
+        if number_to_fetch <= 0:
+            return
+        self.beginInsertRows(QModelIndex(), self.number_of_loaded, self.number_of_loaded + number_to_fetch - 1)
+        self.number_of_loaded += number_to_fetch
+        self.endInsertRows()
+
+
 class LogEmitter(QObject):
     """loggingの出力をQtのSignalに変換し、GUIスレッドへ安全にログを伝達するためのクラス"""
 
@@ -230,6 +282,10 @@ class MainApp_Of_G2S(QMainWindow):
             cancel_getting_ids_btn: QPushButton = QPushButton("統計表IDの一覧の取得をキャンセルする")
             cancel_getting_ids_btn.clicked.connect(self.cancel_getting_lst_of_ids)
             func_area.addRow(get_ids_btn, cancel_getting_ids_btn)
+            # 前回の同期以降に更新された統計表IDだけを取得する
+            sync_ids_btn: QPushButton = QPushButton("更新された統計表IDだけを取得する")
+            sync_ids_btn.clicked.connect(self.sync_lst_of_ids)
+            func_area.addRow(sync_ids_btn)
             # 統計表IDの一覧を表示する
             show_ids_btn: QPushButton = QPushButton("統計表IDの一覧を表示する")
             func_area.addRow(show_ids_btn)
@@ -256,6 +312,13 @@ class MainApp_Of_G2S(QMainWindow):
             self.logic_type_combo.currentIndexChanged.connect(self._get_logic_type)
             self._get_logic_type(0)
             func_area.addRow(QLabel("抽出方法: "), self.logic_type_combo)
+            # 指定の統計表の分類を表示する
+            show_meta_btn: QPushButton = QPushButton("統計表の分類を表示する")
+            func_area.addRow(show_meta_btn)
+            show_meta_btn.clicked.connect(self.show_meta_info)
+            # API側で絞り込む条件
+            self.filter_text: QPlainTextEdit = QPlainTextEdit()
+            func_area.addRow(QLabel("API側で絞り込む条件\n(1行につき、分類=値1,値2\nまたは、lv分類=階層): "), self.filter_text)
             # 指定の統計表を表示する
             show_table_btn: QPushButton = QPushButton("統計表を表示する")
             func_area.addRow(show_table_btn)
@@ -295,9 +358,9 @@ class MainApp_Of_G2S(QMainWindow):
             c_of_stat_name: int = 1
             # 表題
             c_of_title: int = 2
-            self.obj_of_cls.STATS_DATA_ID = self.model.item(r, c_of_id).text()
-            self.obj_of_cls.STAT_NAME = self.model.item(r, c_of_stat_name).text()
-            self.obj_of_cls.TITLE = self.model.item(r, c_of_title).text()
+            self.obj_of_cls.STATS_DATA_ID = self.model.data(self.model.index(r, c_of_id))
+            self.obj_of_cls.STAT_NAME = self.model.data(self.model.index(r, c_of_stat_name))
+            self.obj_of_cls.TITLE = self.model.data(self.model.index(r, c_of_title))
         except Exception as e:
             self._show_error(f"error: \n{str(e)}")
         else:
@@ -316,9 +379,8 @@ class MainApp_Of_G2S(QMainWindow):
             self.top_left_scroll_area.setWidget(self.top_left_container)
             self.lst_of_ids: QTableView = QTableView()
             self.top_left_container_layout.addWidget(self.lst_of_ids)
-            self.model: QStandardItemModel = QStandardItemModel()
-            # ヘッダーを追加する
-            self.model.setHorizontalHeaderLabels(self.obj_of_cls.header_of_ids_l)
+            # ヘッダーだけの空のモデルを設定する
+            self.model: DataFrameModel = DataFrameModel(pandas.DataFrame(columns=self.obj_of_cls.header_of_ids_l))
             self.lst_of_ids.setModel(self.model)
             self.lst_of_ids.clicked.connect(self._get_id_from_lst)
         except Exception:
@@ -341,13 +403,8 @@ class MainApp_Of_G2S(QMainWindow):
             self.table_container_layout.addWidget(QLabel(f"統計名: {self.obj_of_cls.STAT_NAME}"))
             self.table_container_layout.addWidget(QLabel(f"表題: {self.obj_of_cls.TITLE}"))
             self.table_container_layout.addWidget(self.stats_table)
-            model: QStandardItemModel = QStandardItemModel()
-            # ヘッダーを追加する
-            model.setHorizontalHeaderLabels(self.obj_of_cls.df.columns.tolist())
-            for r in self.obj_of_cls.df.itertuples(index=False):
-                items = [QStandardItem(str(v)) for v in r]
-                model.appendRow(items)
-            self.stats_table.setModel(model)
+            self.stats_model: DataFrameModel = DataFrameModel(self.obj_of_cls.df)
+            self.stats_table.setModel(self.stats_model)
             self.stats_table.resizeColumnsToContents()
         except Exception:
             raise
@@ -516,12 +573,20 @@ class MainApp_Of_G2S(QMainWindow):
 
     def get_lst_of_ids(self) -> bool:
         """統計表IDの一覧を取得します"""
+        return self._start_getting_lst_of_ids(self.get_lst_of_ids.__doc__, False)
+
+    def sync_lst_of_ids(self) -> bool:
+        """前回の同期以降に更新された統計表IDだけを取得します"""
+        return self._start_getting_lst_of_ids(self.sync_lst_of_ids.__doc__, True)
+
+    def _start_getting_lst_of_ids(self, label: str | None, only_updated: bool) -> bool:
+        """統計表IDの一覧を取得する処理を開始します"""
         result: bool = False
         try:
             self._check_first_form()
             # 取得方法は非同期のみ
             self.get_type_combo.setCurrentIndex(0)
-            self.worker: GetIdsWorker = GetIdsWorker(self.obj_of_cls)
+            self.worker: GetIdsWorker = GetIdsWorker(self.obj_of_cls, only_updated)
             self.thread: QThread = QThread()
             self.worker.moveToThread(self.thread)
             self.thread.started.connect(self.worker.run)
@@ -529,7 +594,7 @@ class MainApp_Of_G2S(QMainWindow):
             self.worker.finished.connect(self.worker.deleteLater)
             self.thread.finished.connect(self.thread.deleteLater)
             self.worker.error.connect(self._show_error)
-            self.worker.finished.connect(lambda ok: self._show_result(self.get_lst_of_ids.__doc__, ok))
+            self.worker.finished.connect(lambda ok: self._show_result(label, ok))
             self.thread.start()
         except Exception as e:
             self._show_error(f"error: \n{str(e)}")
@@ -544,26 +609,28 @@ class MainApp_Of_G2S(QMainWindow):
         if hasattr(self, "worker") and self.worker is not None:
             self.worker.cancel()
 
+    def _set_lst_of_ids(self, df: pandas.DataFrame) -> bool:
+        """統計表IDの一覧をモデルに設定します"""
+        result: bool = False
+        try:
+            self.model = DataFrameModel(df)
+            self.lst_of_ids.setModel(self.model)
+            self.lst_of_ids.resizeColumnsToContents()
+        except Exception:
+            raise
+        else:
+            result = True
+        finally:
+            pass
+        return result
+
     def show_lst_of_ids(self) -> bool:
         """統計表IDの一覧を表示します"""
         result: bool = False
         try:
             self._clear_widget(self.top_left_scroll_area)
             self._setup_second_ui()
-            # 検索パターン
-            PATTERN: str = "*.csv"
-            csv_files = self.obj_of_cls.folder_p_of_ids.glob(PATTERN)
-            if not any(csv_files):
-                raise Exception("統計表IDの一覧を取得してください。")
-            for csv_file in csv_files:
-                with open(str(csv_file), newline="", encoding="utf-8") as f:
-                    reader = csv.reader(f)
-                    # ヘッダー行をスキップする
-                    next(reader, None)
-                    for row in reader:
-                        items: list = [QStandardItem(str(cell)) for cell in row]
-                        self.model.appendRow(items)
-            self.lst_of_ids.resizeColumnsToContents()
+            self._set_lst_of_ids(self.obj_of_cls.load_lst_of_ids())
         except Exception as e:
             self._show_error(f"error: \n{str(e)}")
         else:
@@ -579,21 +646,7 @@ class MainApp_Of_G2S(QMainWindow):
             self._check_second_form()
             self._clear_widget(self.top_left_scroll_area)
             self._setup_second_ui()
-            # 検索パターン
-            PATTERN: str = "*.csv"
-            csv_files = self.obj_of_cls.folder_p_of_ids.glob(PATTERN)
-            if not any(csv_files):
-                raise Exception("統計表IDの一覧を取得してください。")
-            for csv_file in csv_files:
-                reader = pandas.read_csv(str(csv_file), chunksize=1, dtype=str)
-                # ヘッダー行をスキップする
-                next(reader, None)
-                for chunk in reader:
-                    df = self.obj_of_cls.filter_df(chunk)
-                    for _, row in df.iterrows():
-                        items: list = [QStandardItem(str(v)) for v in row]
-                        self.model.appendRow(items)
-            self.lst_of_ids.resizeColumnsToContents()
+            self._set_lst_of_ids(self.obj_of_cls.search_lst_of_ids())
         except Exception as e:
             self._show_error(f"error: \n{str(e)}")
         else:
@@ -602,6 +655,22 @@ class MainApp_Of_G2S(QMainWindow):
             self._show_result(self.filter_lst_of_ids.__doc__, result)
         return result
 
+    def show_meta_info(self) -> bool:
+        """指定の統計表の分類を表示します"""
+        result: bool = False
+        try:
+            if self.obj_of_cls.STATS_DATA_ID == "":
+                raise Exception("統計表IDを選択してください。")
+            self._check_first_form()
+            self.obj_of_cls.show_meta_info()
+        except Exception as e:
+            self._show_error(f"error: \n{str(e)}")
+        else:
+            result = True
+        finally:
+            self._show_result(self.show_meta_info.__doc__, result)
+        return result
+
     def show_table(self) -> bool:
         """指定の統計表を表示します"""
         result: bool = False
@@ -612,6 +681,7 @@ class MainApp_Of_G2S(QMainWindow):
             self._clear_widget(self.table_scroll_area)
             # 取得方法は同期のみ
             self.get_type_combo.setCurrentIndex(1)
+            self.obj_of_cls.set_filters(self.filter_text.toPlainText())
             self.obj_of_cls.get_table_from_api()
             self._setup_third_ui()
         except Exception as e:
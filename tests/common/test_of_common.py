@@ -0,0 +1,77 @@
+import os
+from pathlib import Path
+
+from source.common.common import ManifestTools
+
+
+def _create_files(tmp_path: Path) -> tuple:
+    """変換元と変換先のファイルを作成します"""
+    file_p_from: Path = tmp_path / "a.docx"
+    file_p_to: Path = tmp_path / "a.pdf"
+    file_p_from.write_text("abc", encoding="utf-8")
+    file_p_to.write_text("pdf", encoding="utf-8")
+    return str(file_p_from), str(file_p_to)
+
+
+def _create_manifest(tmp_path: Path, file_path_from: str, file_path_to: str, version: str = "1") -> ManifestTools:
+    """変換を記録したマニフェストを作成します"""
+    obj_of_mt: ManifestTools = ManifestTools("Converter", version)
+    obj_of_mt._load(str(tmp_path))
+    obj_of_mt._record(file_path_from, file_path_to)
+    obj_of_mt._save()
+    return obj_of_mt
+
+
+# テスト関数: 変換元のファイルの大きさが変わった場合に、再変換が必要と判定されるかどうかを確認する
+def test_is_up_to_date_with_size(tmp_path):
+    file_path_from, file_path_to = _create_files(tmp_path)
+    obj_of_mt: ManifestTools = _create_manifest(tmp_path, file_path_from, file_path_to)
+    assert obj_of_mt._is_up_to_date(file_path_from, file_path_to)
+    Path(file_path_from).write_text("abcd", encoding="utf-8")
+    assert not obj_of_mt._is_up_to_date(file_path_from, file_path_to)
+
+
+# テスト関数: 更新日時だけが変わった場合に、内容のハッシュ値で判定されるかどうかを確認する
+def test_is_up_to_date_with_mtime(tmp_path):
+    file_path_from, file_path_to = _create_files(tmp_path)
+    obj_of_mt: ManifestTools = _create_manifest(tmp_path, file_path_from, file_path_to)
+    stat: os.stat_result = Path(file_path_from).stat()
+    os.utime(file_path_from, ns=(stat.st_atime_ns, stat.st_mtime_ns + 10**9))
+    # 内容が同じなら、変換済みのままで、更新日時の記録だけを更新する
+    assert obj_of_mt._is_up_to_date(file_path_from, file_path_to)
+    assert obj_of_mt.entries[str(Path(file_path_from).resolve())]["mtime_ns"] == stat.st_mtime_ns + 10**9
+    # 大きさが同じでも、内容が変われば再変換する
+    Path(file_path_from).write_text("xyz", encoding="utf-8")
+    assert not obj_of_mt._is_up_to_date(file_path_from, file_path_to)
+
+
+# テスト関数: 変換処理のバージョンが上がった場合に、再変換が必要と判定されるかどうかを確認する
+def test_is_up_to_date_with_version(tmp_path):
+    file_path_from, file_path_to = _create_files(tmp_path)
+    _create_manifest(tmp_path, file_path_from, file_path_to)
+    obj_of_mt: ManifestTools = ManifestTools("Converter", "2")
+    obj_of_mt._load(str(tmp_path))
+    assert not obj_of_mt._is_up_to_date(file_path_from, file_path_to)
+
+
+# テスト関数: 変換先のファイルが削除された場合に、再変換が必要と判定されるかどうかを確認する
+def test_is_up_to_date_with_missing_output(tmp_path):
+    file_path_from, file_path_to = _create_files(tmp_path)
+    obj_of_mt: ManifestTools = _create_manifest(tmp_path, file_path_from, file_path_to)
+    Path(file_path_to).unlink()
+    assert not obj_of_mt._is_up_to_date(file_path_from, file_path_to)
+
+
+# テスト関数: 変換元のファイルが削除された記録が、マニフェストから取り除かれるかどうかを確認する
+def test_filter_outdated(tmp_path):
+    file_path_from, file_path_to = _create_files(tmp_path)
+    (tmp_path / "b.docx").write_text("b", encoding="utf-8")
+    obj_of_mt: ManifestTools = _create_manifest(tmp_path, file_path_from, file_path_to)
+    obj_of_mt._record(str(tmp_path / "b.docx"), str(tmp_path / "b.pdf"))
+    obj_of_mt._save()
+    (tmp_path / "b.docx").unlink()
+    obj_of_mt._load(str(tmp_path))
+    assert obj_of_mt._exclude_converted(str(tmp_path), [file_path_from], lambda f: file_path_to, True) == []
+    assert obj_of_mt.number_of_skip == 1
+    obj_of_mt._load(str(tmp_path))
+    assert list(obj_of_mt.entries) == [str(Path(file_path_from).resolve())]
@@ -0,0 +1,214 @@
+import logging
+import subprocess
+import threading
+import time
+from pathlib import Path
+from typing import Any
+
+import pytest
+
+from source.convert_libre_to_pdf import cltp_class
+from source.convert_libre_to_pdf.cltp_class import ConvertLibreToPDF, SofficeListener
+
+
+class FakeSoffice:
+    """sofficeの代わり"""
+
+    def __init__(self, fail: tuple = (), returncode: int = 0):
+        # 変換に失敗させるファイル名
+        self.fail: tuple = fail
+        # sofficeの終了コード
+        self.returncode: int = returncode
+        self.commands: list = []
+        self.lock: threading.Lock = threading.Lock()
+
+    def run(self, command: list, **kwargs) -> subprocess.CompletedProcess:
+        with self.lock:
+            self.commands.append(command)
+        folder_to: Path = Path(command[command.index("--outdir") + 1])
+        lst_of_files: list = command[command.index("--outdir") + 2 :]
+        for f in lst_of_files:
+            # 変換できなくても、sofficeは正常に終了する
+            if Path(f).name in self.fail:
+                continue
+            (folder_to / f"{Path(f).stem}.pdf").write_text(f, encoding="utf-8")
+        return subprocess.CompletedProcess(command, self.returncode, "", "")
+
+
+class FakeProcess:
+    """常駐させたsofficeのプロセスの代わり"""
+
+    def __init__(self):
+        self.returncode: int | None = None
+
+    def poll(self) -> int | None:
+        return self.returncode
+
+    def terminate(self):
+        self.returncode = 0
+
+    def kill(self):
+        self.returncode = -9
+
+    def wait(self, timeout: float | None = None) -> int | None:
+        return self.returncode
+
+
+class FakeDesktop:
+    """UNOのDesktopオブジェクトの代わり"""
+
+    def __init__(self, process: FakeProcess, events: list):
+        self.process: FakeProcess = process
+        self.events: list = events
+        # 応答しなくなったかどうか
+        self.broken: bool = False
+
+    def getFrames(self) -> Any:
+        if self.broken or self.process.poll() is not None:
+            raise Exception("応答がありません。")
+        return self
+
+    def getCount(self) -> int:
+        return 0
+
+    def terminate(self):
+        self.events.append("terminate")
+
+
+class FakeListener(SofficeListener):
+    """unoを使わずに動くリスナー"""
+
+    def __init__(self, timeout: float):
+        super().__init__(logging.getLogger(__name__), timeout)
+        self.events: list = []
+
+    def start(self) -> bool:
+        self.process = FakeProcess()
+        self.desktop = FakeDesktop(self.process, self.events)
+        self.events.append("start")
+        return True
+
+    def _convert_with_uno(self, desktop: Any, file_path_from: str, file_path_to: str, filter_name: str):
+        if "hang" in file_path_from:
+            # プロセスが止められるまで応答しない
+            while desktop.process.poll() is None:
+                time.sleep(0.01)
+            self.events.append("aborted")
+            raise Exception("接続が切れました。")
+        Path(file_path_to).write_text(filter_name, encoding="utf-8")
+
+
+def _create_obj(tmp_path: Path, file_names: list) -> ConvertLibreToPDF:
+    """変換元と変換先のフォルダを用意したインスタンスを作成します"""
+    folder_from: Path = tmp_path / "from"
+    folder_to: Path = tmp_path / "to"
+    folder_from.mkdir()
+    folder_to.mkdir()
+    for name in file_names:
+        (folder_from / name).write_text(name, encoding="utf-8")
+    obj: ConvertLibreToPDF = ConvertLibreToPDF(logging.getLogger(__name__))
+    obj.folder_path_from = str(folder_from)
+    obj.folder_path_to = str(folder_to)
+    return obj
+
+
+# テスト関数: 並列で一括変換して、ワーカーごとのユーザープロファイルで集計できるかどうかを確認する
+def test_convert_all_files(tmp_path, monkeypatch):
+    fake: FakeSoffice = FakeSoffice()
+    monkeypatch.setattr(cltp_class.subprocess, "run", fake.run)
+    monkeypatch.setattr(cltp_class.tempfile, "tempdir", str(tmp_path))
+    obj: ConvertLibreToPDF = _create_obj(tmp_path, [f"book{i}.xlsx" for i in range(6)])
+    obj.max_workers = 3
+    obj.create_file_lst()
+    lst_of_progress: list = []
+    assert obj.convert_all_files(lambda count, total: lst_of_progress.append((count, total)))
+    assert obj.complete
+    assert obj.success == obj.count == 6
+    assert lst_of_progress == [(i, 6) for i in range(1, 7)]
+    assert len(list((tmp_path / "to").glob("*.pdf"))) == 6
+    # 同時に動くsofficeは、それぞれ別のユーザープロファイルを使う
+    profiles: set = {c[2] for c in fake.commands}
+    assert all(p.startswith(f"-env:UserInstallation={tmp_path.as_uri()}/cltp_profiles_") for p in profiles)
+    assert 1 <= len(profiles) <= 3
+    # 変換後は、一時的なユーザープロファイルを削除する
+    assert not any(tmp_path.glob("cltp_profiles_*"))
+
+
+# テスト関数: 一部のファイルの変換が失敗した場合に、失敗として集計されるかどうかを確認する
+def test_convert_all_files_with_failure(tmp_path, monkeypatch):
+    fake: FakeSoffice = FakeSoffice(fail=("broken.docx",))
+    monkeypatch.setattr(cltp_class.subprocess, "run", fake.run)
+    obj: ConvertLibreToPDF = _create_obj(tmp_path, ["ok.docx", "broken.docx", "ok.xlsx"])
+    obj.create_file_lst()
+    with pytest.raises(Exception, match="一部のファイルの変換が失敗しました。"):
+        obj.convert_all_files()
+    assert obj.count == 3
+    assert obj.success == 2
+    assert not obj.complete
+
+
+# テスト関数: 応答しないリスナーを止めて、変換中のスレッドが終わってから作り直すかどうかを確認する
+def test_listener_timeout(tmp_path):
+    listener: FakeListener = FakeListener(timeout=0.2)
+    listener.start()
+    assert not listener.convert(str(tmp_path / "hang.docx"), str(tmp_path / "hang.pdf"), "writer_pdf_Export")
+    # UNOで終了を依頼せずに止めて、古いスレッドの終了後に起動する
+    assert listener.events == ["start", "aborted", "start"]
+    assert listener.is_alive()
+    assert listener.convert(str(tmp_path / "ok.docx"), str(tmp_path / "ok.pdf"), "writer_pdf_Export")
+
+
+# テスト関数: 応答しないリスナーが、変換の前に作り直されるかどうかを確認する
+def test_listener_health_check(tmp_path):
+    listener: FakeListener = FakeListener(timeout=5.0)
+    assert not listener.is_alive()
+    listener.start()
+    assert listener.is_alive()
+    listener.desktop.broken = True
+    assert not listener.is_alive()
+    assert listener.convert(str(tmp_path / "ok.docx"), str(tmp_path / "ok.pdf"), "writer_pdf_Export")
+    assert listener.events == ["start", "start"]
+    listener.process.returncode = 1
+    assert not listener.is_alive()
+
+
+# テスト関数: エクスポートフィルターがない拡張子のファイルを、変換せずに失敗とするかどうかを確認する
+def test_convert_with_unknown_ext(tmp_path):
+    obj: ConvertLibreToPDF = _create_obj(tmp_path, [])
+    listener: FakeListener = FakeListener(timeout=5.0)
+    file_path: str = str(tmp_path / "from" / "a.txt")
+    assert obj._convert_with(listener, [file_path]) == {file_path: False}
+    assert listener.events == []
+
+
+# テスト関数: 変換先のファイル名が重なるファイルが、別の回に分割されるかどうかを確認する
+def test_create_chunks(tmp_path):
+    obj: ConvertLibreToPDF = _create_obj(tmp_path, [])
+    obj.filtered_lst_of_f = ["a.docx", "b.docx", "A.xlsx", "c.docx", "a.odt", "d.docx"]
+    assert obj._create_chunks(2) == [[["a.docx", "b.docx"], ["c.docx", "d.docx"]], [["A.xlsx"]], [["a.odt"]]]
+    assert obj._create_chunks(1) == [[["a.docx"], ["b.docx"], ["c.docx"], ["d.docx"]], [["A.xlsx"]], [["a.odt"]]]
+
+
+# テスト関数: 同じ名前のPDFになるファイルの失敗が、もう一方の成功で隠れないかどうかを確認する
+def test_convert_all_files_with_same_stem(tmp_path, monkeypatch):
+    fake: FakeSoffice = FakeSoffice(fail=("a.xlsx",))
+    monkeypatch.setattr(cltp_class.subprocess, "run", fake.run)
+    obj: ConvertLibreToPDF = _create_obj(tmp_path, ["a.docx", "a.xlsx"])
+    obj.max_workers = 2
+    obj.create_file_lst()
+    with pytest.raises(Exception, match="一部のファイルの変換が失敗しました。"):
+        obj.convert_all_files()
+    assert obj.success == 1
+
+
+# テスト関数: sofficeの終了コードと変換先のファイルで、ファイルごとの成否を判定するかどうかを確認する
+def test_run_soffice(tmp_path, monkeypatch):
+    obj: ConvertLibreToPDF = _create_obj(tmp_path, ["a.docx", "b.docx"])
+    lst_of_files: list = [str(tmp_path / "from" / "a.docx"), str(tmp_path / "from" / "b.docx")]
+    # 以前の変換先のファイルが残っているだけでは、成功としない
+    (tmp_path / "to" / "b.pdf").write_text("old", encoding="utf-8")
+    monkeypatch.setattr(cltp_class.subprocess, "run", FakeSoffice(fail=("b.docx",)).run)
+    assert obj._run_soffice(lst_of_files) == {lst_of_files[0]: True, lst_of_files[1]: False}
+    # 異常終了した場合は、書き出されたファイルも失敗とする
+    monkeypatch.setattr(cltp_class.subprocess, "run", FakeSoffice(returncode=1).run)
+    assert obj._run_soffice(lst_of_files) == {lst_of_files[0]: False, lst_of_files[1]: False}
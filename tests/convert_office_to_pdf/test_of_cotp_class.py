@@ -0,0 +1,135 @@
+import logging
+from pathlib import Path
+
+import pytest
+
+from source.convert_office_to_pdf.cotp_class import ConvertOfficeToPDF
+
+
+class FakeFile:
+    """COMのファイルのオブジェクトの代わり"""
+
+    def ExportAsFixedFormat(self, **kwargs):
+        # 変換先のファイルパスの引数名は、アプリケーションごとに異なる
+        file_path_to: str = kwargs.get("Filename") or kwargs.get("OutputFileName") or kwargs.get("Path")
+        Path(file_path_to).write_text("pdf", encoding="utf-8")
+
+    def Close(self):
+        pass
+
+
+class FakeFiles:
+    """Workbooks, Documents, Presentationsの代わり"""
+
+    def __init__(self, fail: bool):
+        self.fail: bool = fail
+
+    def Open(self, file_path: str, ReadOnly: bool):
+        if self.fail and "broken" in file_path:
+            raise Exception("開けません。")
+        return FakeFile()
+
+
+class FakeApp:
+    """COMのアプリケーションのオブジェクトの代わり"""
+
+    def __init__(self, prog_id: str, fail: bool):
+        self.prog_id: str = prog_id
+        self.quit: bool = False
+        self.Workbooks = self.Documents = self.Presentations = FakeFiles(fail)
+
+    def Quit(self):
+        self.quit = True
+
+
+def _create_obj(tmp_path: Path, file_names: list, fail: bool = False) -> tuple:
+    """偽のdispatcherを使うインスタンスを作成します"""
+    folder_from: Path = tmp_path / "from"
+    folder_to: Path = tmp_path / "to"
+    folder_from.mkdir()
+    folder_to.mkdir()
+    for name in file_names:
+        (folder_from / name).write_text(name, encoding="utf-8")
+    created: list = []
+
+    def fake_dispatcher(prog_id: str) -> FakeApp:
+        app: FakeApp = FakeApp(prog_id, fail)
+        created.append(app)
+        return app
+
+    obj: ConvertOfficeToPDF = ConvertOfficeToPDF(logging.getLogger(__name__), dispatcher=fake_dispatcher)
+    obj.folder_path_from = str(folder_from)
+    obj.folder_path_to = str(folder_to)
+    return obj, created
+
+
+# テスト関数: アプリケーションのインスタンスが使い回され、上限で作り直されることを確認する
+def test_reuse_app(tmp_path):
+    obj, created = _create_obj(tmp_path, [f"book{i}.xlsx" for i in range(5)] + ["doc0.docx", "doc1.docx"])
+    obj.max_uses_of_app = 2
+    obj.create_file_lst()
+    for _ in range(obj.number_of_f):
+        obj.handle_file()
+        if obj.complete:
+            break
+        obj.move_to_next_file()
+    prog_ids: list = [app.prog_id for app in created]
+    assert prog_ids.count("Excel.Application") == 3
+    assert prog_ids.count("Word.Application") == 1
+    assert obj.success == 7
+    # 一括変換が終わったら、全てのインスタンスが終了している
+    assert all(app.quit for app in created)
+    assert not obj.obj_of_oac.apps
+
+
+# テスト関数: エラーになったインスタンスが終了されることを確認する
+def test_release_app_on_error(tmp_path):
+    obj, created = _create_obj(tmp_path, ["broken.xlsx", "ok.xlsx"], fail=True)
+    obj.create_file_lst()
+    while "broken" not in obj.current_file_path_from:
+        obj.move_to_next_file()
+    with pytest.raises(Exception, match="開けません。"):
+        obj.handle_file()
+    # エラーになったインスタンスは終了され、使い回されない
+    assert len(created) == 1
+    assert created[0].quit
+    assert not obj.obj_of_oac.apps
+    assert obj.success == 0
+    assert not Path(obj.current_file_path_to).exists()
+    # 次のファイルは、作り直したインスタンスで変換する
+    obj.move_to_next_file()
+    assert obj.handle_file()
+    assert len(created) == 2
+    assert obj.success == 1
+
+
+# テスト関数: 全てのファイルが変換済みの場合に、失敗とせずに何もしないことを確認する
+def test_all_files_converted(tmp_path):
+    obj, created = _create_obj(tmp_path, ["book.xlsx"])
+    obj.create_file_lst()
+    obj.handle_file()
+    assert obj.complete
+    assert obj.create_file_lst()
+    assert obj.number_of_f == 0
+    assert obj.filtered_lst_of_f == []
+
+
+# テスト関数: 1つのファイルの変換が失敗しても、他の種類のインスタンスは使い回されることを確認する
+def test_keep_other_apps_on_error(tmp_path):
+    obj, created = _create_obj(tmp_path, ["book0.xlsx", "broken.docx", "book1.xlsx"], fail=True)
+    obj.create_file_lst()
+    for name in ["book0.xlsx", "broken.docx", "book1.xlsx"]:
+        obj.p = [Path(f).name for f in obj.filtered_lst_of_f].index(name)
+        obj._set_file_path()
+        if "broken" in name:
+            with pytest.raises(Exception, match="開けません。"):
+                obj.handle_file()
+        else:
+            assert obj.handle_file()
+    # Wordのインスタンスだけが終了され、Excelのインスタンスは使い回される
+    assert [(app.prog_id, app.quit) for app in created] == [("Excel.Application", False), ("Word.Application", True)]
+    assert list(obj.obj_of_oac.apps) == ["Excel.Application"]
+    # 一括変換を中断した場合は、残りのインスタンスも終了する
+    assert obj.release_apps()
+    assert created[0].quit
+    assert not obj.obj_of_oac.apps
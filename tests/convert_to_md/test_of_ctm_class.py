@@ -0,0 +1,129 @@
+import io
+import logging
+from pathlib import Path
+
+import pytest
+from openpyxl import Workbook
+
+from source.convert_to_md.ctm_class import ConvertToMd
+
+
+def _create_pdf(file_p: Path, text: str):
+    """1ページだけのPDFを作成します"""
+    objs: list = [
+        b"<< /Type /Catalog /Pages 2 0 R >>",
+        b"<< /Type /Pages /Kids [3 0 R] /Count 1 >>",
+        b"<< /Type /Page /Parent 2 0 R /MediaBox [0 0 300 100] /Contents 4 0 R /Resources << /Font << /F1 5 0 R >> >> >>",
+        None,
+        b"<< /Type /Font /Subtype /Type1 /BaseFont /Helvetica >>",
+    ]
+    stream: bytes = f"BT /F1 12 Tf 10 50 Td ({text}) Tj ET".encode("ascii")
+    objs[3] = b"<< /Length " + str(len(stream)).encode() + b" >>\nstream\n" + stream + b"\nendstream"
+    data: bytes = b"%PDF-1.4\n"
+    offsets: list = []
+    for i, obj in enumerate(objs, start=1):
+        offsets.append(len(data))
+        data += f"{i} 0 obj\n".encode() + obj + b"\nendobj\n"
+    xref: int = len(data)
+    data += f"xref\n0 {len(objs) + 1}\n0000000000 65535 f \n".encode()
+    data += b"".join(f"{offset:010d} 00000 n \n".encode() for offset in offsets)
+    data += f"trailer\n<< /Size {len(objs) + 1} /Root 1 0 R >>\nstartxref\n{xref}\n%%EOF\n".encode()
+    file_p.write_bytes(data)
+
+
+# テスト関数: ヘッダーと列の数が異なる行が、ヘッダーの列の数にそろえられるかどうかを確認する
+def test_write_table():
+    f: io.StringIO = io.StringIO()
+    number_of_rows: int = ConvertToMd._write_table(f, [["a", "b"], ["1"], ["2", "x|y", "extra"], [None, "line\nbreak"]])
+    assert number_of_rows == 4
+    assert f.getvalue().splitlines() == [
+        "| a | b |",
+        "| --- | --- |",
+        "| 1 |  |",
+        "| 2 | x\\|y |",
+        "|  | line break |",
+    ]
+
+
+# テスト関数: CSVをストリーミングで変換できるかどうかを確認する
+def test_stream_csv(tmp_path):
+    file_p_from: Path = tmp_path / "a.csv"
+    file_p_to: Path = tmp_path / "a.md"
+    file_p_from.write_bytes("名前,値\n東京,1\n\n大阪,2,3\n".encode("utf-8-sig"))
+    ConvertToMd._convert_with_streaming(str(file_p_from), str(file_p_to))
+    assert file_p_to.read_text(encoding="utf-8").splitlines() == ["| 名前 | 値 |", "| --- | --- |", "| 東京 | 1 |", "| 大阪 | 2 |"]
+
+
+# テスト関数: Excelをシートごとにストリーミングで変換できるかどうかを確認する
+def test_stream_excel(tmp_path):
+    file_p_from: Path = tmp_path / "a.xlsx"
+    file_p_to: Path = tmp_path / "a.md"
+    wb: Workbook = Workbook()
+    wb.active.title = "first"
+    wb.active.append(["a", "b"])
+    wb.active.append([1, 2])
+    wb.create_sheet("second").append(["c"])
+    wb.save(file_p_from)
+    ConvertToMd._convert_with_streaming(str(file_p_from), str(file_p_to))
+    assert file_p_to.read_text(encoding="utf-8").splitlines() == [
+        "## first",
+        "| a | b |",
+        "| --- | --- |",
+        "| 1 | 2 |",
+        "",
+        "## second",
+        "| c |",
+        "| --- |",
+        "",
+    ]
+
+
+# テスト関数: PDFのテキストをストリーミングで書き出せるかどうかを確認する
+def test_stream_pdf(tmp_path):
+    file_p_from: Path = tmp_path / "a.pdf"
+    file_p_to: Path = tmp_path / "a.md"
+    _create_pdf(file_p_from, "Hello streaming")
+    ConvertToMd._convert_with_streaming(str(file_p_from), str(file_p_to))
+    assert "Hello streaming" in file_p_to.read_text(encoding="utf-8")
+    # 閾値以上の大きさのファイルだけを、ストリーミングで変換する
+    assert ConvertToMd._should_stream(str(file_p_from), 0)
+    assert not ConvertToMd._should_stream(str(file_p_from), 10**9)
+
+
+# テスト関数: 変換先のファイル名が重なるファイルが、別の回に分割されるかどうかを確認する
+def test_create_rounds():
+    obj: ConvertToMd = ConvertToMd(logging.getLogger(__name__))
+    obj.filtered_lst_of_f = ["a.pdf", "b.pdf", "A.docx", "c.csv", "a.csv"]
+    assert obj._create_rounds() == [["a.pdf", "b.pdf", "c.csv"], ["A.docx"], ["a.csv"]]
+
+
+# テスト関数: プロセスプールで一括変換して、成否を集計し、成功したファイルだけをマニフェストに記録するかどうかを確認する
+def test_convert_all(tmp_path):
+    folder_from: Path = tmp_path / "from"
+    folder_to: Path = tmp_path / "to"
+    folder_from.mkdir()
+    folder_to.mkdir()
+    (folder_from / "a.csv").write_text("x,y\n1,2\n", encoding="utf-8")
+    (folder_from / "a.json").write_text('{"key": "value"}', encoding="utf-8")
+    (folder_from / "b.html").write_text("<html><body><h1>Title</h1></body></html>", encoding="utf-8")
+    (folder_from / "broken.xlsx").write_text("not excel", encoding="utf-8")
+    obj: ConvertToMd = ConvertToMd(logging.getLogger(__name__))
+    obj.folder_path_from = str(folder_from)
+    obj.folder_path_to = str(folder_to)
+    obj.max_workers = 2
+    # 壊れたExcelを読み込めずに失敗させるため、ストリーミングで変換する
+    obj.streaming_threshold = 0
+    obj.create_file_lst()
+    lst_of_progress: list = []
+    with pytest.raises(Exception, match="一部のファイルの変換が失敗しました。"):
+        obj.convert_all(lambda count, total: lst_of_progress.append((count, total)))
+    assert (obj.count, obj.success) == (4, 3)
+    assert lst_of_progress == [(i, 4) for i in range(1, 5)]
+    assert [Path(f).name for f, _ in obj.lst_of_failure] == ["broken.xlsx"]
+    # 同じ名前になるファイルは順に変換するため、後に変換したファイルの内容だけが残る
+    text: str = (folder_to / "a.md").read_text(encoding="utf-8")
+    assert ("| x | y |" in text) != ("value" in text)
+    assert "# Title" in (folder_to / "b.md").read_text(encoding="utf-8")
+    # 失敗したファイルだけが、次の一括変換の対象になる
+    obj.create_file_lst()
+    assert [Path(f).name for f in obj.filtered_lst_of_f] == ["broken.xlsx"]
@@ -0,0 +1,182 @@
+import logging
+import os
+from pathlib import Path
+
+import pytest
+
+from source.get_file_list.gfl_class import FileQuery, GetFileList
+
+
+def _create_tree(folder_p: Path) -> set:
+    lst_of_files: list = ["a.txt", "b.csv", "sub/c.txt", "sub/sub2/d.md", "sub3/e.txt"]
+    for name in lst_of_files:
+        file_p: Path = folder_p / name
+        file_p.parent.mkdir(parents=True, exist_ok=True)
+        file_p.write_text(name, encoding="utf-8")
+    (folder_p / "empty").mkdir()
+    return {str(folder_p / name) for name in lst_of_files}
+
+
+# テスト関数: 直列と並列の走査で同じファイルが得られるかどうかを確認する
+def test_walk_files(tmp_path):
+    expected: set = _create_tree(tmp_path)
+    obj_of_cls: GetFileList = GetFileList(logging.getLogger(__name__))
+    obj_of_cls.folder_path = str(tmp_path)
+    obj_of_cls.recursive = True
+    for max_workers in [1, 4]:
+        obj_of_cls.max_workers = max_workers
+        assert {entry.path for entry in obj_of_cls.walk_files()} == expected
+        assert obj_of_cls.count_files() == len(expected)
+    obj_of_cls.recursive = False
+    assert {entry.path for entry in obj_of_cls.walk_files()} == {str(tmp_path / "a.txt"), str(tmp_path / "b.csv")}
+    assert obj_of_cls.count_files() == 2
+
+
+# テスト関数: インデックスが差分だけを再走査して、検索結果を返すかどうかを確認する
+def test_file_index(tmp_path):
+    folder_p: Path = tmp_path / "root"
+    expected: set = _create_tree(folder_p)
+    obj_of_cls: GetFileList = GetFileList(logging.getLogger(__name__))
+    obj_of_cls.folder_path = str(folder_p)
+    obj_of_cls.folder_path_of_index = str(tmp_path / "__index__")
+    obj_of_cls.recursive = True
+    obj_of_cls.use_index = True
+    obj_of_cls.search_directly_under_folder()
+    assert set(obj_of_cls.lst_file_before) == expected
+    # 変更がなければ、再走査しない
+    obj_of_cls.search_directly_under_folder()
+    assert obj_of_cls.obj_of_fi.number_of_scanned == 0
+    # 変更したフォルダだけを再走査する
+    (folder_p / "sub" / "sub2" / "f.txt").write_text("f", encoding="utf-8")
+    (folder_p / "sub3" / "e.txt").unlink()
+    obj_of_cls.search_directly_under_folder()
+    assert obj_of_cls.obj_of_fi.number_of_scanned == 2
+    obj_of_cls.pattern = ".txt"
+    obj_of_cls.extract_by_pattern()
+    assert set(obj_of_cls.lst_file_after) == {str(folder_p / "a.txt"), str(folder_p / "sub" / "c.txt"), str(folder_p / "sub" / "sub2" / "f.txt")}
+
+
+# テスト関数: 詳細な検索条件で、走査しながら抽出できるかどうかを確認する
+def test_file_query(tmp_path):
+    _create_tree(tmp_path)
+    (tmp_path / "sub" / "big.txt").write_bytes(b"0" * 1000)
+    obj_of_cls: GetFileList = GetFileList(logging.getLogger(__name__))
+    obj_of_cls.folder_path = str(tmp_path)
+    obj_of_cls.recursive = True
+    obj_of_cls.obj_of_fq = FileQuery(exts=["TXT"], glob="*/sub/*", min_size=100)
+    obj_of_cls.extract_by_pattern()
+    assert obj_of_cls.lst_file_after == [str(tmp_path / "sub" / "big.txt")]
+    obj_of_cls.obj_of_fq = FileQuery(regex=r"[cd]\.(txt|md)$", max_size=100)
+    obj_of_cls.extract_by_pattern()
+    assert sorted(obj_of_cls.lst_file_after) == [str(tmp_path / "sub" / "c.txt"), str(tmp_path / "sub" / "sub2" / "d.md")]
+    with pytest.raises(Exception):
+        FileQuery(regex="(")
+
+
+# テスト関数: 検索で走査したファイルを使い回して、抽出で走査し直さないかどうかを確認する
+def test_file_query_without_rescan(tmp_path, monkeypatch):
+    _create_tree(tmp_path)
+    obj_of_cls: GetFileList = GetFileList(logging.getLogger(__name__))
+    obj_of_cls.folder_path = str(tmp_path)
+    obj_of_cls.recursive = True
+    obj_of_cls.search_directly_under_folder()
+
+    def fake_walk_files():
+        raise AssertionError("走査し直しました。")
+
+    monkeypatch.setattr(obj_of_cls, "walk_files", fake_walk_files)
+    obj_of_cls.obj_of_fq = FileQuery(exts=["md"])
+    obj_of_cls.extract_by_pattern()
+    assert obj_of_cls.lst_file_after == [str(tmp_path / "sub" / "sub2" / "d.md")]
+    # 検索の後に書き換えたファイルも、サイズの条件はstatし直して判定する
+    (tmp_path / "sub" / "c.txt").write_bytes(b"0" * 1000)
+    obj_of_cls.obj_of_fq = FileQuery(min_size=100)
+    obj_of_cls.extract_by_pattern()
+    assert obj_of_cls.lst_file_after == [str(tmp_path / "sub" / "c.txt")]
+
+
+# テスト関数: インデックスの作成後にその場で書き換えたファイルが、サイズの条件で抽出されるかどうかを確認する
+def test_file_query_with_index(tmp_path):
+    folder_p: Path = tmp_path / "root"
+    _create_tree(folder_p)
+    obj_of_cls: GetFileList = GetFileList(logging.getLogger(__name__))
+    obj_of_cls.folder_path = str(folder_p)
+    obj_of_cls.folder_path_of_index = str(tmp_path / "__index__")
+    obj_of_cls.recursive = True
+    obj_of_cls.use_index = True
+    obj_of_cls.search_directly_under_folder()
+    (folder_p / "sub" / "c.txt").write_bytes(b"0" * 1000)
+    obj_of_cls.search_directly_under_folder()
+    # フォルダの更新日時は変わらないため、再走査されない
+    assert obj_of_cls.obj_of_fi.number_of_scanned == 0
+    obj_of_cls.obj_of_fq = FileQuery(min_size=100)
+    obj_of_cls.extract_by_pattern()
+    assert obj_of_cls.lst_file_after == [str(folder_p / "sub" / "c.txt")]
+
+
+# テスト関数: 段階的なハッシュ値の比較で、重複したファイルだけを検出できるかどうかを確認する
+def test_find_duplicates(tmp_path):
+    content: bytes = bytes(range(256)) * 1000
+    (tmp_path / "a.bin").write_bytes(content)
+    (tmp_path / "b.bin").write_bytes(content)
+    # 先頭と末尾だけが同じファイル
+    (tmp_path / "c.bin").write_bytes(content[:1000] + b"x" + content[1001:])
+    (tmp_path / "d.txt").write_text("same", encoding="utf-8")
+    (tmp_path / "e.txt").write_text("same", encoding="utf-8")
+    (tmp_path / "f.txt").write_text("diff", encoding="utf-8")
+    obj_of_cls: GetFileList = GetFileList(logging.getLogger(__name__))
+    obj_of_cls.folder_path = str(tmp_path)
+    obj_of_cls.head_tail_size = 100
+    obj_of_cls.search_directly_under_folder()
+    obj_of_cls.find_duplicates()
+    assert [d["files"] for d in obj_of_cls.lst_of_duplicates] == [
+        [str(tmp_path / "a.bin"), str(tmp_path / "b.bin")],
+        [str(tmp_path / "d.txt"), str(tmp_path / "e.txt")],
+    ]
+    assert obj_of_cls.wasted_bytes == len(content) + 4
+
+
+# テスト関数: 同じ実体を指すハードリンクが、重複したファイルとして数えられないかどうかを確認する
+def test_find_duplicates_with_hardlink(tmp_path):
+    (tmp_path / "a.txt").write_text("same", encoding="utf-8")
+    os.link(tmp_path / "a.txt", tmp_path / "link.txt")
+    obj_of_cls: GetFileList = GetFileList(logging.getLogger(__name__))
+    obj_of_cls.folder_path = str(tmp_path)
+    obj_of_cls.search_directly_under_folder()
+    obj_of_cls.find_duplicates()
+    assert obj_of_cls.lst_of_duplicates == []
+    assert obj_of_cls.wasted_bytes == 0
+    # 別の実体の重複があれば、ハードリンクのうち1件だけが含まれる
+    (tmp_path / "b.txt").write_text("same", encoding="utf-8")
+    obj_of_cls.search_directly_under_folder()
+    obj_of_cls.find_duplicates()
+    assert len(obj_of_cls.lst_of_duplicates) == 1
+    assert len(obj_of_cls.lst_of_duplicates[0]["files"]) == 2
+    assert str(tmp_path / "b.txt") in obj_of_cls.lst_of_duplicates[0]["files"]
+    assert obj_of_cls.wasted_bytes == 4
+
+
+# テスト関数: キャンセルされた検索が成功として扱われず、インデックスの更新も打ち切られるかどうかを確認する
+def test_search_in_batches_with_cancel(tmp_path):
+    folder_p: Path = tmp_path / "root"
+    _create_tree(folder_p)
+    obj_of_cls: GetFileList = GetFileList(logging.getLogger(__name__))
+    obj_of_cls.folder_path = str(folder_p)
+    obj_of_cls.recursive = True
+    obj_of_cls.max_workers = 1
+    lst_of_batches: list = []
+
+    def callback(lst_of_rows: list):
+        lst_of_batches.append(lst_of_rows)
+        obj_of_cls.cancel = True
+
+    assert not obj_of_cls.search_in_batches(callback, batch_size=1)
+    assert len(lst_of_batches) == 1
+    assert obj_of_cls.num_of_f_after == len(lst_of_batches[0])
+    # キャンセルされたら、インデックスの更新を途中で打ち切る
+    obj_of_cls.folder_path_of_index = str(tmp_path / "__index__")
+    obj_of_cls.use_index = True
+    assert obj_of_cls._setup_index(lambda: True)
+    assert obj_of_cls.obj_of_fi.number_of_scanned == 0
+    assert obj_of_cls.search_in_batches(lambda lst_of_rows: None)
+    assert obj_of_cls.num_of_f_after == 5
@@ -0,0 +1,63 @@
+"""
+filter_dfの速度を、行ごとに判定していた以前の実装と比較します
+pytestでは実行されないため、リポジトリの直下で以下のように実行します
+
+python -m tests.get_government_statistics.bench_of_filter_df [行数]
+"""
+
+import logging
+import sys
+import time
+
+import numpy
+import pandas
+
+from source.get_government_statistics.g2s_class import GetGovernmentStatistics
+from tests.get_government_statistics.test_of_g2s_class import _filter_df_by_row
+
+
+def _create_df(number_of_rows: int) -> pandas.DataFrame:
+    """統計表に似たデータフレームを作成します"""
+    rng: numpy.random.Generator = numpy.random.default_rng(0)
+    return pandas.DataFrame(
+        {
+            "表章項目": rng.choice(["人口", "世帯数"], number_of_rows),
+            "地域": rng.choice(["東京都", "大阪府", "北海道", "沖縄県", "福岡県"], number_of_rows),
+            "時間軸": rng.choice([f"{y}年" for y in range(2000, 2024)], number_of_rows),
+            "単位": "人",
+            "値": rng.integers(0, 100000, number_of_rows),
+        }
+    )
+
+
+def main() -> bool:
+    """主要関数"""
+    number_of_rows: int = int(sys.argv[1]) if len(sys.argv) > 1 else 1_000_000
+    df: pandas.DataFrame = _create_df(number_of_rows)
+    obj_of_cls: GetGovernmentStatistics = GetGovernmentStatistics(logging.getLogger(__name__))
+    print(f"行数: {number_of_rows:,}")
+    for match_type, lst_of_keyword, logic_type in [
+        ("部分一致", ["東京"], "OR抽出"),
+        ("部分一致", ["東京", "2020"], "AND抽出"),
+        ("完全一致", ["東京都", "北海道"], "OR抽出"),
+    ]:
+        obj_of_cls.lst_of_match_type = [match_type]
+        obj_of_cls.lst_of_keyword = lst_of_keyword
+        obj_of_cls.lst_of_logic_type = [logic_type]
+        start: float = time.perf_counter()
+        new_df: pandas.DataFrame = obj_of_cls.filter_df(df)
+        seconds_of_new: float = time.perf_counter() - start
+        start = time.perf_counter()
+        old_df: pandas.DataFrame = _filter_df_by_row(df, match_type, lst_of_keyword, logic_type)
+        seconds_of_old: float = time.perf_counter() - start
+        # 結果が同じであることも確認する
+        pandas.testing.assert_frame_equal(new_df, old_df)
+        print(
+            f"{match_type} {logic_type} {lst_of_keyword}: 抽出 {len(new_df):,}行, "
+            f"以前 {seconds_of_old:.2f}秒, 現在 {seconds_of_new:.2f}秒, {seconds_of_old / seconds_of_new:.0f}倍"
+        )
+    return True
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,732 @@
+import asyncio
+import json
+import logging
+import random
+import sqlite3
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from pathlib import Path
+from typing import Iterator
+from urllib.parse import parse_qs, urlparse
+from xml.etree import ElementTree
+
+import numpy
+import pandas
+import pytest
+
+from source.get_government_statistics.g2s_class import GetGovernmentStatistics, ResponseCache, StatsDataIdsIndex
+
+
+def _filter_df_by_row(df: pandas.DataFrame, match_type: str, lst_of_keyword: list, logic_type: str) -> pandas.DataFrame:
+    """行ごとに判定していた以前の実装"""
+    if match_type == "部分一致":
+        if len(lst_of_keyword) == 1:
+            return df[df.apply(lambda row: row.astype(str).str.contains(str(lst_of_keyword[0]), case=False, na=False).any(), axis=1)]
+        if logic_type == "OR抽出":
+            pattern: str = "|".join(map(str, lst_of_keyword))
+            return df[df.apply(lambda row: row.astype(str).str.contains(pattern, case=False, na=False).any(), axis=1)]
+        return df[df.apply(lambda row: all(row.astype(str).str.contains(k, case=False, na=False).any() for k in lst_of_keyword), axis=1)]
+    if len(lst_of_keyword) == 1:
+        return df[df.apply(lambda row: row.astype(str).eq(str(lst_of_keyword[0])).any(), axis=1)]
+    if logic_type == "OR抽出":
+        return df[df.apply(lambda row: row.astype(str).isin(lst_of_keyword).any(), axis=1)]
+    return df[df.apply(lambda row: all(row.astype(str).eq(k).any() for k in lst_of_keyword), axis=1)]
+
+
+# テスト関数: 列ごとに判定するfilter_dfが、行ごとに判定する以前の実装と同じ結果になるかどうかを確認する
+@pytest.mark.parametrize("match_type", ["部分一致", "完全一致"])
+@pytest.mark.parametrize("logic_type", ["OR抽出", "AND抽出"])
+@pytest.mark.parametrize("lst_of_keyword", [["東京"], ["1.0"], ["nan"], ["tokyo", "2020"], ["東京都", "1"], ["a.c", "True"], ["2020-01-01"]])
+def test_filter_df(match_type, logic_type, lst_of_keyword):
+    df: pandas.DataFrame = pandas.DataFrame(
+        {
+            "地域": ["東京都", "大阪府", None, "Tokyo", "東京"],
+            "コード": [1, 2, 3, 2020, 13],
+            "値": [1.0, numpy.nan, 2.5, 10.0, 1.0],
+            "日付": pandas.to_datetime(["2020-01-01", "2021-02-03", None, "2020-01-01", "2022-12-31"]),
+            "フラグ": [True, False, True, False, True],
+            "混在": ["abc", 1, numpy.nan, "a.c", "TOKYO 2020"],
+            "分類": pandas.Categorical(["1.0", "東京都", None, "2020年", "a.c"], categories=["東京都", "1.0", "2020年", "a.c", "未使用"]),
+        }
+    )
+    obj_of_cls: GetGovernmentStatistics = GetGovernmentStatistics(logging.getLogger(__name__))
+    obj_of_cls.lst_of_match_type = [match_type]
+    obj_of_cls.lst_of_keyword = lst_of_keyword
+    obj_of_cls.lst_of_logic_type = [logic_type]
+    expected: pandas.DataFrame = _filter_df_by_row(df, match_type, lst_of_keyword, logic_type)
+    pandas.testing.assert_frame_equal(obj_of_cls.filter_df(df), expected)
+    assert obj_of_cls.DATA_COUNT == len(expected)
+
+
+# テスト関数: 全てのファイルの統計表IDの一覧を、まとめて検索できるかどうかを確認する
+def test_search_lst_of_ids(tmp_path):
+    obj_of_cls: GetGovernmentStatistics = GetGovernmentStatistics(logging.getLogger(__name__))
+    obj_of_cls.folder_p_of_ids = tmp_path
+    for i in [1, 2, 10]:
+        lines: list = [obj_of_cls.header_of_ids_s, f"{i:010d},国勢調査,人口 東京都 {i}", f"{i + 100:010d},家計調査,世帯 大阪府 {i}"]
+        (tmp_path / f"list_of_stats_data_ids_{i}.csv").write_text("\n".join(lines), encoding="utf-8")
+    # 統計名にカンマが含まれる行
+    lines = [obj_of_cls.header_of_ids_s, "0000000003,{'@code', '$'},人口 東京都 3"]
+    (tmp_path / "list_of_stats_data_ids_3.csv").write_text("\n".join(lines), encoding="utf-8")
+    assert obj_of_cls.load_lst_of_ids()["統計表ID"].tolist() == [
+        "0000000001",
+        "0000000101",
+        "0000000002",
+        "0000000102",
+        "0000000003",
+        "0000000010",
+        "0000000110",
+    ]
+    obj_of_cls.lst_of_match_type = ["部分一致"]
+    obj_of_cls.lst_of_keyword = ["東京"]
+    df: pandas.DataFrame = obj_of_cls.search_lst_of_ids()
+    assert df["統計表ID"].tolist() == ["0000000001", "0000000002", "0000000003", "0000000010"]
+    assert df.loc[df["統計表ID"] == "0000000003", "統計名"].item() == "{'@code', '$'}"
+
+
+# テスト関数: 全文検索のインデックスで検索した結果が、データフレームで検索した結果と同じになるかどうかを確認する
+@pytest.mark.parametrize("match_type", ["部分一致", "完全一致"])
+@pytest.mark.parametrize("logic_type", ["OR抽出", "AND抽出"])
+@pytest.mark.parametrize("lst_of_keyword", [["東京"], ["国勢調査"], ["census"], ["人口 東京都", "2020"], ["家計調査", "大阪"], ["100%"], ["a_b"]])
+def test_search_lst_of_ids_with_index(tmp_path, match_type, logic_type, lst_of_keyword):
+    obj_of_cls: GetGovernmentStatistics = GetGovernmentStatistics(logging.getLogger(__name__))
+    obj_of_cls.folder_p_of_ids = tmp_path
+    rows: list = [
+        "0000000001,国勢調査,人口 東京都 2020",
+        "0000000002,Census 2020,人口 大阪府",
+        "0000000003,家計調査,大阪府 100%",
+        "0000000004,家計調査,東京都 a_b",
+        "0000000005,国勢調査,axb 2020",
+    ]
+    (tmp_path / "list_of_stats_data_ids_1.csv").write_text("\n".join([obj_of_cls.header_of_ids_s] + rows), encoding="utf-8")
+    obj_of_cls.lst_of_match_type = [match_type]
+    obj_of_cls.lst_of_keyword = lst_of_keyword
+    obj_of_cls.lst_of_logic_type = [logic_type]
+    expected: pandas.DataFrame = obj_of_cls.filter_df(obj_of_cls.load_lst_of_ids()).reset_index(drop=True)
+    df: pandas.DataFrame = obj_of_cls.search_lst_of_ids()
+    assert (tmp_path / obj_of_cls.file_name_of_index_of_ids).exists()
+    pandas.testing.assert_frame_equal(df, expected)
+    assert obj_of_cls.DATA_COUNT == len(expected)
+    # 一覧が変わった場合は、インデックスを作り直す
+    lines: list = [obj_of_cls.header_of_ids_s, "0000000006,国勢調査,東京都 大阪 2020"]
+    (tmp_path / "list_of_stats_data_ids_2.csv").write_text("\n".join(lines), encoding="utf-8")
+    expected = obj_of_cls.filter_df(obj_of_cls.load_lst_of_ids()).reset_index(drop=True)
+    pandas.testing.assert_frame_equal(obj_of_cls.search_lst_of_ids(), expected)
+
+
+class ConnectionWithoutFts5(sqlite3.Connection):
+    """FTS5が使えない環境のSQLiteの接続"""
+
+    def execute(self, sql: str, *args):
+        if "fts5" in sql:
+            raise sqlite3.OperationalError("no such module: fts5")
+        return super().execute(sql, *args)
+
+
+# テスト関数: 全文検索のインデックスを作成できない環境では、データフレームで検索するかどうかを確認する
+def test_search_lst_of_ids_without_fts5(tmp_path, monkeypatch):
+    monkeypatch.setattr(StatsDataIdsIndex, "_connect", lambda self, file_path: sqlite3.connect(file_path, factory=ConnectionWithoutFts5))
+    obj_of_cls: GetGovernmentStatistics = GetGovernmentStatistics(logging.getLogger(__name__))
+    obj_of_cls.folder_p_of_ids = tmp_path
+    lines: list = [obj_of_cls.header_of_ids_s, "0000000001,国勢調査,人口 東京都 2020", "0000000002,家計調査,大阪府"]
+    (tmp_path / "list_of_stats_data_ids_1.csv").write_text("\n".join(lines), encoding="utf-8")
+    assert not obj_of_cls.build_index_of_ids()
+    # 作成途中のファイルは残さない
+    assert not any(tmp_path.glob(f"{obj_of_cls.file_name_of_index_of_ids}*"))
+    obj_of_cls.lst_of_match_type = ["部分一致"]
+    obj_of_cls.lst_of_keyword = ["東京都"]
+    assert obj_of_cls.search_lst_of_ids()["統計表ID"].tolist() == ["0000000001"]
+
+
+class MockStatsListHandler(BaseHTTPRequestHandler):
+    """getStatsListの応答を返すモックサーバーのハンドラ"""
+
+    TOTAL: int = 1234
+    lst_of_requests: list = []
+    set_of_failed: set = set()
+    lock: threading.Lock = threading.Lock()
+    # 更新日付を指定した場合に返す、統計表IDと表題
+    dct_of_updated: dict = {}
+    lst_of_updated_dates: list = []
+
+    def do_GET(self):
+        params: dict = {k: v[0] for k, v in parse_qs(urlparse(self.path).query).items()}
+        start: int = int(params["startPosition"])
+        limit: int = int(params["limit"])
+        if "updatedDate" in params:
+            self._send_updated(params["updatedDate"])
+            return
+        with self.lock:
+            self.lst_of_requests.append(start)
+            # 3ページ目は、1回だけ一時的なエラーを返す
+            fail: bool = start == 2 * limit + 1 and start not in self.set_of_failed
+            self.set_of_failed.add(start)
+        if fail:
+            self.send_response(503)
+            self.end_headers()
+            return
+        # 応答の順番がばらばらになるように待つ
+        time.sleep(random.uniform(0, 0.02))
+        lst_of_tables: list = [
+            {"@id": f"{i:010d}", "STATISTICS_NAME": "統計", "TITLE": f"表題{i}"} for i in range(start, min(start + limit, self.TOTAL + 1))
+        ]
+        self._send_tables(self.TOTAL, lst_of_tables)
+
+    def _send_updated(self, updated_date: str):
+        self.lst_of_updated_dates.append(updated_date)
+        if not self.dct_of_updated:
+            # 該当する統計表がない場合は、TABLE_INFを返さない
+            self._send({"GET_STATS_LIST": {"RESULT": {"STATUS": 1, "ERROR_MSG": "正常に終了しましたが、該当データはありませんでした。"}}})
+            return
+        lst_of_tables: list = [{"@id": k, "STATISTICS_NAME": "統計", "TITLE": v} for k, v in self.dct_of_updated.items()]
+        self._send_tables(len(lst_of_tables), lst_of_tables)
+
+    def _send_tables(self, total: int, lst_of_tables: list):
+        self._send({"GET_STATS_LIST": {"RESULT": {"STATUS": 0}, "DATALIST_INF": {"NUMBER": total, "TABLE_INF": lst_of_tables}}})
+
+    def _send(self, data: dict):
+        body: bytes = json.dumps(data).encode("utf-8")
+        self.send_response(200)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def log_message(self, format, *args):
+        pass
+
+
+# テスト関数: 統計表IDの一覧を同時に取得しても、順番どおりに全件を返すかどうかを確認する
+def test_get_stats_data_ids_with_async(tmp_path):
+    server: ThreadingHTTPServer = ThreadingHTTPServer(("127.0.0.1", 0), MockStatsListHandler)
+    thread: threading.Thread = threading.Thread(target=server.serve_forever, daemon=True)
+    thread.start()
+    try:
+        obj_of_cls: GetGovernmentStatistics = GetGovernmentStatistics(logging.getLogger(__name__))
+        obj_of_cls.BASE_URL = f"http://127.0.0.1:{server.server_address[1]}/rest"
+        obj_of_cls.folder_p_of_cache = tmp_path
+        obj_of_cls.lst_of_data_type = ["json"]
+        obj_of_cls.max_concurrency = 4
+        obj_of_cls.requests_per_second = 0
+        obj_of_cls.backoff_factor = 0.01
+
+        async def _collect() -> list:
+            lst_of_ids: list = []
+            async for page in obj_of_cls._get_stats_data_ids_with_async():
+                lst_of_ids.extend(page.keys())
+            return lst_of_ids
+
+        assert asyncio.run(_collect()) == [f"{i:010d}" for i in range(1, MockStatsListHandler.TOTAL + 1)]
+        # リトライした3ページ目以外は、1回ずつ取得する
+        assert sorted(MockStatsListHandler.lst_of_requests) == sorted(list(range(1, MockStatsListHandler.TOTAL + 1, 100)) + [201])
+    finally:
+        server.shutdown()
+        server.server_close()
+
+
+# テスト関数: 統計表IDの一覧を1つの圧縮したファイルに書き出し、以前の形式のファイルと置き換えるかどうかを確認する
+def test_write_stats_data_ids_to_file(tmp_path):
+    server: ThreadingHTTPServer = ThreadingHTTPServer(("127.0.0.1", 0), MockStatsListHandler)
+    thread: threading.Thread = threading.Thread(target=server.serve_forever, daemon=True)
+    thread.start()
+    try:
+        obj_of_cls: GetGovernmentStatistics = GetGovernmentStatistics(logging.getLogger(__name__))
+        obj_of_cls.BASE_URL = f"http://127.0.0.1:{server.server_address[1]}/rest"
+        obj_of_cls.folder_p_of_cache = tmp_path / "cache"
+        obj_of_cls.folder_p_of_ids = tmp_path / "ids"
+        obj_of_cls.lst_of_data_type = ["json"]
+        obj_of_cls.requests_per_second = 0
+        obj_of_cls.backoff_factor = 0.01
+        # 以前の形式のファイルは、そのまま読み込める
+        obj_of_cls.folder_p_of_ids.mkdir()
+        lines: list = [obj_of_cls.header_of_ids_s, "0000000001,統計,古い表題"]
+        (obj_of_cls.folder_p_of_ids / "list_of_stats_data_ids_1.csv").write_text("\n".join(lines), encoding="utf-8")
+        assert obj_of_cls.load_lst_of_ids()["表題"].tolist() == ["古い表題"]
+        assert asyncio.run(obj_of_cls.write_stats_data_ids_to_file())
+        # 全件の取得では、キャッシュを使わない
+        assert not any((tmp_path / "cache").glob("*.gz"))
+        assert {e.name for e in obj_of_cls.folder_p_of_ids.iterdir()} == {
+            obj_of_cls.file_name_of_ids,
+            obj_of_cls.file_name_of_index_of_ids,
+            obj_of_cls.file_name_of_sync_state,
+        }
+        df: pandas.DataFrame = obj_of_cls.load_lst_of_ids()
+        assert df["統計表ID"].tolist() == [f"{i:010d}" for i in range(1, MockStatsListHandler.TOTAL + 1)]
+        assert df["表題"].iloc[-1] == f"表題{MockStatsListHandler.TOTAL}"
+        obj_of_cls.lst_of_match_type = ["完全一致"]
+        obj_of_cls.lst_of_keyword = ["表題1000"]
+        assert obj_of_cls.search_lst_of_ids()["統計表ID"].tolist() == ["0000001000"]
+    finally:
+        server.shutdown()
+        server.server_close()
+
+
+# テスト関数: 統計表IDの一覧の書き出しを中止した場合に、以前の一覧が残るかどうかを確認する
+def test_write_stats_data_ids_to_file_with_cancel(tmp_path, monkeypatch):
+    obj_of_cls: GetGovernmentStatistics = GetGovernmentStatistics(logging.getLogger(__name__))
+    obj_of_cls.folder_p_of_ids = tmp_path
+    lines: list = [obj_of_cls.header_of_ids_s, "0000000001,統計,古い表題"]
+    (tmp_path / "list_of_stats_data_ids_1.csv").write_text("\n".join(lines), encoding="utf-8")
+
+    async def _get_first_page(*args, **kwargs):
+        yield {"0000000002": {"stat_name": "統計", "title": "途中の表題"}}
+        obj_of_cls.cancel = True
+
+    monkeypatch.setattr(obj_of_cls, "_get_stats_data_ids_with_async", _get_first_page)
+    assert asyncio.run(obj_of_cls.write_stats_data_ids_to_file())
+    assert {e.name for e in tmp_path.iterdir()} == {"list_of_stats_data_ids_1.csv"}
+    assert obj_of_cls.load_lst_of_ids()["表題"].tolist() == ["古い表題"]
+
+
+# テスト関数: 前回の同期以降に更新された統計表IDだけを取得して、一覧に反映するかどうかを確認する
+def test_sync_stats_data_ids(tmp_path):
+    server: ThreadingHTTPServer = ThreadingHTTPServer(("127.0.0.1", 0), MockStatsListHandler)
+    thread: threading.Thread = threading.Thread(target=server.serve_forever, daemon=True)
+    thread.start()
+    try:
+        obj_of_cls: GetGovernmentStatistics = GetGovernmentStatistics(logging.getLogger(__name__))
+        obj_of_cls.BASE_URL = f"http://127.0.0.1:{server.server_address[1]}/rest"
+        obj_of_cls.folder_p_of_cache = tmp_path / "cache"
+        obj_of_cls.folder_p_of_ids = tmp_path / "ids"
+        obj_of_cls.lst_of_data_type = ["json"]
+        obj_of_cls.requests_per_second = 0
+        obj_of_cls.backoff_factor = 0.01
+        # 同期の記録がない場合は、全件を取得する
+        MockStatsListHandler.lst_of_updated_dates = []
+        assert asyncio.run(obj_of_cls.sync_stats_data_ids())
+        assert MockStatsListHandler.lst_of_updated_dates == []
+        assert len(obj_of_cls.load_lst_of_ids()) == MockStatsListHandler.TOTAL
+        # 2回目以降は、更新された統計表だけを取得する
+        state: dict = json.loads((obj_of_cls.folder_p_of_ids / obj_of_cls.file_name_of_sync_state).read_text(encoding="utf-8"))
+        state["last_synced_at"] = "2020-01-02T03:04:05"
+        (obj_of_cls.folder_p_of_ids / obj_of_cls.file_name_of_sync_state).write_text(json.dumps(state), encoding="utf-8")
+        MockStatsListHandler.dct_of_updated = {"0000000005": "更新した表題", "0000009999": "新しい表題"}
+        assert asyncio.run(obj_of_cls.sync_stats_data_ids())
+        assert MockStatsListHandler.lst_of_updated_dates == [f"20200102-{time.strftime('%Y%m%d')}"]
+        df: pandas.DataFrame = obj_of_cls.load_lst_of_ids()
+        assert len(df) == MockStatsListHandler.TOTAL + 1
+        assert df["表題"].iloc[4] == "更新した表題"
+        assert df.iloc[-1].tolist() == ["0000009999", "統計", "新しい表題"]
+        # インデックスにも反映される
+        obj_of_cls.lst_of_match_type = ["部分一致"]
+        obj_of_cls.lst_of_keyword = ["新しい表題"]
+        assert obj_of_cls.search_lst_of_ids()["統計表ID"].tolist() == ["0000009999"]
+        # 更新された統計表がない場合は、一覧とインデックスを書き換えずに、同期した日時だけを記録する
+        MockStatsListHandler.dct_of_updated = {}
+        MockStatsListHandler.lst_of_updated_dates = []
+        file_p_of_ids: Path = obj_of_cls.folder_p_of_ids / obj_of_cls.file_name_of_ids
+        file_p_of_index: Path = obj_of_cls.folder_p_of_ids / obj_of_cls.file_name_of_index_of_ids
+        mtime_of_ids: int = file_p_of_ids.stat().st_mtime_ns
+        mtime_of_index: int = file_p_of_index.stat().st_mtime_ns
+        state["last_synced_at"] = "2020-01-02T03:04:05"
+        (obj_of_cls.folder_p_of_ids / obj_of_cls.file_name_of_sync_state).write_text(json.dumps(state), encoding="utf-8")
+        assert asyncio.run(obj_of_cls.sync_stats_data_ids())
+        assert len(MockStatsListHandler.lst_of_updated_dates) == 1
+        assert file_p_of_ids.stat().st_mtime_ns == mtime_of_ids
+        assert file_p_of_index.stat().st_mtime_ns == mtime_of_index
+        state = json.loads((obj_of_cls.folder_p_of_ids / obj_of_cls.file_name_of_sync_state).read_text(encoding="utf-8"))
+        assert state["last_synced_at"] != "2020-01-02T03:04:05"
+        assert len(obj_of_cls.load_lst_of_ids()) == MockStatsListHandler.TOTAL + 1
+    finally:
+        MockStatsListHandler.dct_of_updated = {}
+        server.shutdown()
+        server.server_close()
+
+
+class MockStatsDataHandler(BaseHTTPRequestHandler):
+    """getStatsDataの応答をNEXT_KEYで分けて返すモックサーバーのハンドラ"""
+
+    TOTAL: int = 25
+    # エラーを返す統計表ID
+    FAILED_ID: str = "9999999999"
+    # 正常な応答で、APIのエラーを返す統計表ID
+    INVALID_ID: str = "8888888888"
+
+    def do_GET(self):
+        params: dict = {k: v[0] for k, v in parse_qs(urlparse(self.path).query).items()}
+        if params.get("statsDataId") == self.FAILED_ID:
+            self.send_response(400)
+            self.end_headers()
+            return
+        if params.get("statsDataId") == self.INVALID_ID:
+            self._send({"GET_STATS_DATA": {"RESULT": {"STATUS": 100, "ERROR_MSG": "正しい統計表IDを指定してください。"}}})
+            return
+        start: int = int(params.get("startPosition", 1))
+        end: int = min(start + int(params["limit"]), self.TOTAL + 1)
+        result_inf: dict = {"TOTAL_NUMBER": self.TOTAL, "FROM_NUMBER": start, "TO_NUMBER": end - 1}
+        if end <= self.TOTAL:
+            result_inf["NEXT_KEY"] = end
+        values: list = [{"@area": f"{i % 2:05d}", "@unit": "人", "$": str(i)} for i in range(start, end)]
+        class_obj: list = [{"@id": "area", "@name": "地域", "CLASS": [{"@code": "00000", "@name": "全国"}, {"@code": "00001", "@name": "北海道"}]}]
+        data: dict = {
+            "GET_STATS_DATA": {
+                "RESULT": {"STATUS": 0, "ERROR_MSG": "正常に終了しました。"},
+                "STATISTICAL_DATA": {
+                    "RESULT_INF": result_inf,
+                    "CLASS_INF": {"CLASS_OBJ": class_obj},
+                    "DATA_INF": {"VALUE": values[0] if len(values) == 1 else values},
+                },
+            }
+        }
+        self._send(data)
+
+    def _send(self, data: dict):
+        body: bytes = json.dumps(data).encode("utf-8")
+        self.send_response(200)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def log_message(self, format, *args):
+        pass
+
+
+# テスト関数: NEXT_KEYをたどって、統計表の全件を取得できるかどうかを確認する
+def test_get_table_from_api(monkeypatch, tmp_path):
+    monkeypatch.setattr("source.get_government_statistics.g2s_class.clipboard.copy", lambda text: None)
+    server: ThreadingHTTPServer = ThreadingHTTPServer(("127.0.0.1", 0), MockStatsDataHandler)
+    thread: threading.Thread = threading.Thread(target=server.serve_forever, daemon=True)
+    thread.start()
+    try:
+        obj_of_cls: GetGovernmentStatistics = GetGovernmentStatistics(logging.getLogger(__name__))
+        obj_of_cls.BASE_URL = f"http://127.0.0.1:{server.server_address[1]}/rest"
+        obj_of_cls.folder_p_of_cache = tmp_path
+        obj_of_cls.lst_of_data_type = ["json"]
+        obj_of_cls.STATS_DATA_ID = "0000000001"
+        # 最後のページが1件になるようにする
+        obj_of_cls.limit_of_table = 12
+        obj_of_cls.get_table_from_api()
+        assert obj_of_cls.DATA_COUNT == MockStatsDataHandler.TOTAL
+        assert obj_of_cls.df["値"].tolist() == list(range(1, MockStatsDataHandler.TOTAL + 1))
+        assert obj_of_cls.df["地域"].tolist()[:2] == ["北海道", "全国"]
+        # ページを結合しても、カテゴリー型のままになる
+        assert isinstance(obj_of_cls.df["地域"].dtype, pandas.CategoricalDtype)
+        assert obj_of_cls.df["値"].dtype == "float64"
+        obj_of_cls.limit_of_table = obj_of_cls.MAX_LIMIT + 1
+        with pytest.raises(Exception):
+            obj_of_cls.get_table_from_api()
+    finally:
+        server.shutdown()
+        server.server_close()
+
+
+# テスト関数: 複数の統計表を同時に取得して、1つずつcsvファイルに出力し、結果をまとめるかどうかを確認する
+def test_get_tables_from_api(tmp_path):
+    server: ThreadingHTTPServer = ThreadingHTTPServer(("127.0.0.1", 0), MockStatsDataHandler)
+    thread: threading.Thread = threading.Thread(target=server.serve_forever, daemon=True)
+    thread.start()
+    try:
+        obj_of_cls: GetGovernmentStatistics = GetGovernmentStatistics(logging.getLogger(__name__))
+        obj_of_cls.BASE_URL = f"http://127.0.0.1:{server.server_address[1]}/rest"
+        obj_of_cls.folder_p_of_cache = tmp_path / "cache"
+        obj_of_cls.folder_p_of_table = tmp_path / "output"
+        obj_of_cls.lst_of_data_type = ["json"]
+        obj_of_cls.limit_of_table = 10
+        obj_of_cls.requests_per_second = 0
+        obj_of_cls.max_concurrency = 2
+        lst_of_ids: list = [f"{i:010d}" for i in range(1, 6)] + [MockStatsDataHandler.FAILED_ID, MockStatsDataHandler.INVALID_ID, "0000000001"]
+        assert asyncio.run(obj_of_cls.get_tables_from_api(lst_of_ids))
+        df: pandas.DataFrame = obj_of_cls.df_of_summary
+        # 重複を除き、指定の順に結果をまとめる
+        assert df["統計表ID"].tolist() == lst_of_ids[:-1]
+        assert df["結果"].tolist() == ["成功"] * 5 + ["失敗"] * 2
+        assert df["件数"].tolist() == [MockStatsDataHandler.TOTAL] * 5 + [0] * 2
+        assert "400" in df["内容"].iloc[-2]
+        # APIのエラーは、空の表として出力しない
+        assert "正しい統計表IDを指定してください。" in df["内容"].iloc[-1]
+        assert len(list((tmp_path / "output").glob("stats_table_*.csv"))) == 5
+        df_of_table: pandas.DataFrame = pandas.read_csv(df["内容"].iloc[0])
+        assert df_of_table["値"].tolist() == list(range(1, MockStatsDataHandler.TOTAL + 1))
+    finally:
+        server.shutdown()
+        server.server_close()
+
+
+class MockNarrowingHandler(BaseHTTPRequestHandler):
+    """メタ情報と、cdArea・cdTime・lvAreaで絞り込んだgetStatsDataの応答を返すモックサーバーのハンドラ"""
+
+    AREAS: list = [("00000", "全国", "1"), ("13000", "東京都", "2"), ("27000", "大阪府", "2"), ("13100", "特別区部", "3")]
+    TIMES: list = [("2020000000", "2020年", "1"), ("2015000000", "2015年", "1")]
+    lst_of_params: list = []
+
+    def do_GET(self):
+        params: dict = {k: v[0] for k, v in parse_qs(urlparse(self.path).query).items()}
+        if self.path.split("?")[0].endswith("getMetaInfo"):
+            class_obj: list = [
+                {"@id": cid, "@name": name, "CLASS": [{"@code": c, "@name": n, "@level": lv} for c, n, lv in lst]}
+                for cid, name, lst in [("area", "地域", self.AREAS), ("time", "時間軸", self.TIMES)]
+            ]
+            data: dict = {"GET_META_INFO": {"RESULT": {"STATUS": 0}, "METADATA_INF": {"CLASS_INF": {"CLASS_OBJ": class_obj}}}}
+        else:
+            self.lst_of_params.append(params)
+            areas: list = [a for a in self.AREAS if a[0] in params.get("cdArea", a[0]).split(",") and a[2] == params.get("lvArea", a[2])]
+            times: list = [t for t in self.TIMES if t[0] in params.get("cdTime", t[0]).split(",")]
+            values: list = [{"@area": a[0], "@time": t[0], "$": str(i)} for i, (a, t) in enumerate((a, t) for a in areas for t in times)]
+            class_obj = [
+                {"@id": "area", "@name": "地域", "CLASS": [{"@code": c, "@name": n} for c, n, _ in self.AREAS]},
+                {"@id": "time", "@name": "時間軸", "CLASS": [{"@code": c, "@name": n} for c, n, _ in self.TIMES]},
+            ]
+            statistical_data: dict = {"RESULT_INF": {"TOTAL_NUMBER": len(values)}, "CLASS_INF": {"CLASS_OBJ": class_obj}}
+            if values:
+                statistical_data["DATA_INF"] = {"VALUE": values}
+            # 該当するデータがない場合は、STATUSが1になる
+            result: dict = {"STATUS": 0 if values else 1}
+            data = {"GET_STATS_DATA": {"RESULT": result, "STATISTICAL_DATA": statistical_data}}
+        body: bytes = json.dumps(data).encode("utf-8")
+        self.send_response(200)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def log_message(self, format, *args):
+        pass
+
+
+# テスト関数: 分類の名称やコードで指定した条件を、APIのパラメータにして絞り込めるかどうかを確認する
+def test_get_table_from_api_with_filters(monkeypatch, tmp_path):
+    monkeypatch.setattr("source.get_government_statistics.g2s_class.clipboard.copy", lambda text: None)
+    MockNarrowingHandler.lst_of_params = []
+    server: ThreadingHTTPServer = ThreadingHTTPServer(("127.0.0.1", 0), MockNarrowingHandler)
+    thread: threading.Thread = threading.Thread(target=server.serve_forever, daemon=True)
+    thread.start()
+    try:
+        obj_of_cls: GetGovernmentStatistics = GetGovernmentStatistics(logging.getLogger(__name__))
+        obj_of_cls.BASE_URL = f"http://127.0.0.1:{server.server_address[1]}/rest"
+        obj_of_cls.folder_p_of_cache = tmp_path
+        obj_of_cls.lst_of_data_type = ["json"]
+        obj_of_cls.STATS_DATA_ID = "0000000001"
+        obj_of_cls.set_filters("地域 = 東京都, 27000\ntime=2020年\n\nlvarea=2")
+        assert obj_of_cls.dct_of_filters == {"地域": ["東京都", "27000"], "time": ["2020年"]}
+        assert obj_of_cls.dct_of_levels == {"area": "2"}
+        obj_of_cls.get_table_from_api()
+        params: dict = MockNarrowingHandler.lst_of_params[-1]
+        assert (params["cdArea"], params["cdTime"], params["lvArea"]) == ("13000,27000", "2020000000", "2")
+        assert obj_of_cls.df["地域"].tolist() == ["東京都", "大阪府"]
+        assert obj_of_cls.df["時間軸"].tolist() == ["2020年", "2020年"]
+        # 該当するデータがない場合は、空の表になる
+        obj_of_cls.set_filters("地域=特別区部\nlv地域=2")
+        obj_of_cls.get_table_from_api()
+        assert obj_of_cls.DATA_COUNT == 0
+        # メタ情報にない分類や値は、エラーになる
+        for text in ["地域=京都府", "産業=製造業", "地域"]:
+            with pytest.raises(Exception):
+                obj_of_cls.set_filters(text)
+                obj_of_cls.get_table_from_api()
+    finally:
+        server.shutdown()
+        server.server_close()
+
+
+def _parse_stats_data_xml_at_once(text: str) -> pandas.DataFrame:
+    """全体を読み込んでから解析していた以前の実装"""
+    root: ElementTree.Element = ElementTree.fromstring(text)
+    mapping: dict = {}
+    for obj in root.findall(".//CLASS_OBJ"):
+        mapping[obj.attrib["id"]] = {cls.attrib["code"]: cls.attrib.get("name", cls.attrib["code"]) for cls in obj.findall("CLASS")}
+    rows: list = []
+    for element in root.findall(".//VALUE"):
+        row: dict = {key: mapping[key].get(value, value) if key in mapping else value for key, value in element.attrib.items()}
+        row["値"] = (element.text or "").strip()
+        rows.append(row)
+    df: pandas.DataFrame = pandas.DataFrame(rows)
+    id2name: dict = {obj.attrib["id"]: obj.attrib.get("name", obj.attrib["id"]) for obj in root.findall(".//CLASS_OBJ")}
+    id2name["unit"] = "単位"
+    df.rename(columns=id2name, inplace=True)
+    df["値"] = pandas.to_numeric(df["値"], errors="coerce")
+    return df
+
+
+# テスト関数: 少しずつ解析した統計データが、全体を解析した場合と同じになるかどうかを確認する
+def test_parse_stats_data_xml():
+    text: str = """<?xml version="1.0" encoding="utf-8"?>
+<GET_STATS_DATA><STATISTICAL_DATA>
+<RESULT_INF><TOTAL_NUMBER>4</TOTAL_NUMBER><NEXT_KEY>5</NEXT_KEY></RESULT_INF>
+<CLASS_INF>
+<CLASS_OBJ id="area" name="地域"><CLASS code="00000" name="全国"/><CLASS code="13000" name="東京都"/></CLASS_OBJ>
+<CLASS_OBJ id="time" name="時間軸"><CLASS code="2020000000" name="2020年"/></CLASS_OBJ>
+</CLASS_INF>
+<DATA_INF><NOTE char="-">該当なし</NOTE>
+<VALUE area="00000" time="2020000000" unit="人">126146099</VALUE>
+<VALUE area="13000" time="2020000000" unit="人">14047594</VALUE>
+<VALUE area="99999" time="2020000000">-</VALUE>
+<VALUE area="13000" time="2020000000" unit="人" tab="001"> 3 </VALUE>
+</DATA_INF>
+</STATISTICAL_DATA></GET_STATS_DATA>"""
+    obj_of_cls: GetGovernmentStatistics = GetGovernmentStatistics(logging.getLogger(__name__))
+    data: bytes = text.encode("utf-8")
+    df, next_key = obj_of_cls._parse_stats_data_xml(data[i : i + 7] for i in range(0, len(data), 7))
+    assert next_key == "5"
+    # 次元はカテゴリー型、値はfloat64型になる
+    assert all(isinstance(df[c].dtype, pandas.CategoricalDtype) for c in df.columns if c != "値")
+    assert df["値"].dtype == "float64"
+    assert df["地域"].cat.categories.tolist() == ["全国", "東京都", "99999"]
+    expected: pandas.DataFrame = _parse_stats_data_xml_at_once(text)
+    pandas.testing.assert_frame_equal(df.astype(object), expected.astype(object))
+
+
+class MockCachedStatsDataHandler(BaseHTTPRequestHandler):
+    """ETagで更新の有無を返すgetStatsDataのモックサーバーのハンドラ"""
+
+    ETAG: str = '"v1"'
+    lst_of_requests: list = []
+
+    def do_GET(self):
+        not_modified: bool = self.headers.get("If-None-Match") == self.ETAG
+        self.lst_of_requests.append(304 if not_modified else 200)
+        if not_modified:
+            self.send_response(304)
+            self.send_header("ETag", self.ETAG)
+            self.end_headers()
+            return
+        body: bytes = """<GET_STATS_DATA><STATISTICAL_DATA><RESULT_INF><TOTAL_NUMBER>2</TOTAL_NUMBER></RESULT_INF>
+<CLASS_INF><CLASS_OBJ id="area" name="地域"><CLASS code="00000" name="全国"/></CLASS_OBJ></CLASS_INF>
+<DATA_INF><VALUE area="00000">1</VALUE><VALUE area="00000">2</VALUE></DATA_INF>
+</STATISTICAL_DATA></GET_STATS_DATA>""".encode("utf-8")
+        self.send_response(200)
+        self.send_header("Content-Type", "application/xml")
+        self.send_header("Content-Length", str(len(body)))
+        self.send_header("ETag", self.ETAG)
+        self.end_headers()
+        self.wfile.write(body)
+
+    def log_message(self, format, *args):
+        pass
+
+
+# テスト関数: 同じ統計表を、キャッシュや更新の確認で取得できるかどうかを確認する
+def test_get_table_from_api_with_cache(tmp_path):
+    MockCachedStatsDataHandler.lst_of_requests = []
+    server: ThreadingHTTPServer = ThreadingHTTPServer(("127.0.0.1", 0), MockCachedStatsDataHandler)
+    thread: threading.Thread = threading.Thread(target=server.serve_forever, daemon=True)
+    thread.start()
+    try:
+        obj_of_cls: GetGovernmentStatistics = GetGovernmentStatistics(logging.getLogger(__name__))
+        obj_of_cls.BASE_URL = f"http://127.0.0.1:{server.server_address[1]}/rest"
+        obj_of_cls.folder_p_of_cache = tmp_path
+        obj_of_cls.lst_of_data_type = ["xml"]
+        obj_of_cls.STATS_DATA_ID = "0000000001"
+        obj_of_cls.APP_ID = "app1"
+        obj_of_cls.get_table_from_api()
+        assert obj_of_cls.df["値"].tolist() == [1.0, 2.0]
+        # 有効期限内は、アプリケーションIDが違ってもリクエストを送らない
+        obj_of_cls.APP_ID = "app2"
+        obj_of_cls.get_table_from_api()
+        assert MockCachedStatsDataHandler.lst_of_requests == [200]
+        assert obj_of_cls.df["地域"].tolist() == ["全国", "全国"]
+        # 期限切れの場合は、ETagで更新の有無を確認する
+        obj_of_cls.cache_ttl = 0
+        obj_of_cls.get_table_from_api()
+        assert MockCachedStatsDataHandler.lst_of_requests == [200, 304]
+        assert obj_of_cls.df["値"].tolist() == [1.0, 2.0]
+        assert len(list(tmp_path.glob("*.gz"))) == 1
+    finally:
+        server.shutdown()
+        server.server_close()
+
+
+# テスト関数: 形式ごとに、APIのエラーの応答をキャッシュしないように判定できるかどうかを確認する
+@pytest.mark.parametrize(
+    "head, expected",
+    [
+        (b"<GET_STATS_DATA><RESULT><STATUS>100</STATUS><ERROR_MSG>err</ERROR_MSG></RESULT>", True),
+        (b"<GET_STATS_DATA><RESULT><STATUS>0</STATUS><ERROR_MSG>ok</ERROR_MSG></RESULT>", False),
+        (b'{"GET_STATS_DATA":{"RESULT":{"STATUS":100,"ERROR_MSG":"err"}}}', True),
+        (b'{"GET_STATS_DATA":{"RESULT":{"STATUS": "1","ERROR_MSG":"ok"}}}', False),
+        ('"RESULT"\r\n"STATUS","ERROR_MSG","DATE"\r\n"100","エラー","2024-01-01"\r\n'.encode("utf-8"), True),
+        ('"RESULT"\n"STATUS","ERROR_MSG","DATE"\n"0","正常に終了しました。","2024-01-01"\n"VALUE"\n'.encode("utf-8"), False),
+        (b'"tab_code","value"\n"100","1"\n', False),
+    ],
+)
+def test_response_cache_is_error(tmp_path, head, expected):
+    assert ResponseCache(str(tmp_path), 60)._is_error(head) == expected
+
+
+# テスト関数: 保存してから期間が経ちすぎたキャッシュと、残ったファイルが削除されるかどうかを確認する
+def test_response_cache_prune(tmp_path):
+    obj_of_rc: ResponseCache = ResponseCache(str(tmp_path), 60)
+    headers: dict = {"ETag": "abc"}
+    obj_of_rc.store_bytes("http://example.com/old", {}, headers, b"old")
+    obj_of_rc.store_bytes("http://example.com/expired", {}, headers, b"expired")
+    meta_of_old: dict = obj_of_rc.load("http://example.com/old", {})
+    meta_of_expired: dict = obj_of_rc.load("http://example.com/expired", {})
+    meta_of_old["stored_at"] = time.time() - obj_of_rc.max_age - 1
+    meta_of_expired["stored_at"] = time.time() - obj_of_rc.ttl - 1
+    obj_of_rc._write_meta(meta_of_old["key"], meta_of_old)
+    obj_of_rc._write_meta(meta_of_expired["key"], meta_of_expired)
+    (tmp_path / "orphan.gz").write_bytes(b"")
+    # 一定の間隔が経つまでは、削除しない
+    obj_of_rc.store_bytes("http://example.com/new", {}, headers, b"new")
+    assert obj_of_rc.load("http://example.com/old", {}) is not None
+    obj_of_rc.last_pruned_at = 0.0
+    obj_of_rc.store_bytes("http://example.com/new", {}, headers, b"new")
+    assert obj_of_rc.load("http://example.com/old", {}) is None
+    assert not (tmp_path / "orphan.gz").exists()
+    # 期限切れでも、更新の有無の確認に使うために残す
+    assert obj_of_rc.load("http://example.com/expired", {}) is not None
+    assert obj_of_rc.load("http://example.com/new", {}) is not None
+    assert len(list(tmp_path.glob("*.gz"))) == len(list(tmp_path.glob("*.json"))) == 2
+
+
+# テスト関数: 形式ごとに、APIのエラーを例外に、該当するデータがないことを空の表にするかどうかを確認する
+@pytest.mark.parametrize(
+    "data_type, error, no_data",
+    [
+        (
+            "xml",
+            "<GET_STATS_DATA><RESULT><STATUS>100</STATUS><ERROR_MSG>認証に失敗しました。</ERROR_MSG></RESULT></GET_STATS_DATA>",
+            "<GET_STATS_DATA><RESULT><STATUS>1</STATUS><ERROR_MSG>該当データはありません。</ERROR_MSG></RESULT>"
+            "<STATISTICAL_DATA><RESULT_INF><TOTAL_NUMBER>0</TOTAL_NUMBER></RESULT_INF></STATISTICAL_DATA></GET_STATS_DATA>",
+        ),
+        (
+            "json",
+            '{"GET_STATS_DATA": {"RESULT": {"STATUS": 100, "ERROR_MSG": "認証に失敗しました。"}}}',
+            '{"GET_STATS_DATA": {"RESULT": {"STATUS": 1, "ERROR_MSG": "該当データはありません。"}, "STATISTICAL_DATA": {}}}',
+        ),
+        (
+            "csv",
+            '"RESULT"\n"STATUS","ERROR_MSG","DATE"\n"100","認証に失敗しました。","2024-01-01T00:00:00.000+09:00"\n',
+            '"RESULT"\n"STATUS","ERROR_MSG","DATE"\n"1","該当データはありません。","2024-01-01T00:00:00.000+09:00"\n',
+        ),
+    ],
+)
+def test_parse_stats_data_with_status(data_type, error, no_data):
+    obj_of_cls: GetGovernmentStatistics = GetGovernmentStatistics(logging.getLogger(__name__))
+    dct_of_parser: dict = {
+        "xml": lambda text: obj_of_cls._parse_stats_data_xml([text.encode("utf-8")]),
+        "json": obj_of_cls._parse_stats_data_json,
+        "csv": obj_of_cls._parse_stats_data_csv,
+    }
+    with pytest.raises(Exception, match="認証に失敗しました。"):
+        dct_of_parser[data_type](error)
+    df, next_key = dct_of_parser[data_type](no_data)
+    assert df.empty
+    assert next_key == ""
+
+
+# テスト関数: 続けて保存しても、古いキャッシュの削除は一定の間隔でしか行わないかどうかを確認する
+def test_response_cache_prune_once(tmp_path, monkeypatch):
+    lst_of_pruned: list = []
+    prune = ResponseCache.prune
+    monkeypatch.setattr(ResponseCache, "prune", lambda self: lst_of_pruned.append(self) or prune(self))
+    obj_of_cls: GetGovernmentStatistics = GetGovernmentStatistics(logging.getLogger(__name__))
+    obj_of_cls.folder_p_of_cache = tmp_path
+    obj_of_cls._get_cache().store_bytes("http://example.com/a", {}, {}, b"a")
+    obj_of_cls._get_cache().store_bytes("http://example.com/b", {}, {}, b"b")
+    assert len(lst_of_pruned) == 1
+
+
+# テスト関数: 同じキーを同時に保存しても、一時ファイルが重ならないかどうかを確認する
+def test_response_cache_store_same_key(tmp_path):
+    obj_of_rc: ResponseCache = ResponseCache(str(tmp_path), 60)
+    first: Iterator = obj_of_rc.store("http://example.com", {}, {}, [b"first-1", b"first-2"])
+    second: Iterator = obj_of_rc.store("http://example.com", {}, {}, [b"second-1", b"second-2"])
+    # 交互に書き込む
+    assert next(first) == b"first-1"
+    assert next(second) == b"second-1"
+    assert list(first) == [b"first-2"]
+    assert list(second) == [b"second-2"]
+    assert obj_of_rc.read_bytes(obj_of_rc.load("http://example.com", {})) == b"second-1second-2"
+    assert not any(tmp_path.glob("*.tmp"))